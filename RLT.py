@@ -38,11 +38,36 @@
 
 import os
 import io
+import re
 import sys
 import json
+import copy
+import pickle
+import time
+import mmap
+import zlib
 import random
+import heapq
+import fnmatch
+import itertools
+import operator
+import array
+import struct
+import sqlite3
+import argparse
+import hashlib
+import shutil
+import tempfile
+import platform
+import threading
 import zipfile
+import contextlib
+import collections
+import tracemalloc
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs, quote
 
 
 ################################################################################
@@ -87,29 +112,21 @@ datapack_format = 10
 
 loot_tables_folder = 'loot_tables'
 
-# Error check: Test whether the loot_tables_folder exists and
-# is accessible; if not, report error and exit.
-
-if os.path.isdir(loot_tables_folder) == False:
-    print(f"The loot tables folder '{loot_tables_folder}' is not accessible or does not exist in the current folder.")
-    print("The default loot tables folder and all of its contents (including sub-folders) must be extracted (copied)")
-    print(f"from the Java Minecraft {Minecraft_version} game installation files and must be located in the current working folder")
-    print("where this RLT application is running.\n")
-    print()
-    print(f"To extract the loot tables folder: in %AppData%, go to: \\.minecraft\\versions\\{Minecraft_version} and open {Minecraft_version}.jar")
-    print("using 7zip or another file compression utility.  (This may require opening the .jar file from within the")
-    print("unzip utility or renaming a copy of the .jar file to give it the .zip extension.)  Then in the .jar file,")
-    print("navigate to the data/minecraft/loot_tables folder and extract the folder, copying it to the RLT working folder.")
-    print("See the documentation for Memetics' RLT for more details.\n")
-    print()
-    print("Exiting...\n")
-    os.system('pause')
-    sys.exit()
-
 # Set the RLT datapacks output folder as a subfolder of the current folder.
 
 datapack_folder = os.path.join(os.getcwd(), 'RLT datapacks')
 
+# Set the RLT cache folder as a subfolder of the current folder.  The parsed
+# loot tables are cached here between runs (see LootTableCache).
+
+cache_folder = os.path.join(os.getcwd(), 'RLT cache')
+
+# Set the default forensics database location, in the RLT datapacks folder.
+# The assignments of each datapack made can be added to it (see
+# ForensicsStore).
+
+forensics_database = os.path.join(datapack_folder, 'RLT forensics.sqlite')
+
 
 ################################################################################
 # (Config) File locations
@@ -121,73 +138,161 @@ two_block_objectsconfig = os.path.join(os.getcwd(), '2-block_objects.config')
 
 
 ################################################################################
-# Declare list & dictionary variables for handling loot tables file names
-# and assignments
+# Errors
+
+class RLTError(Exception):
+    """Raised when a datapack cannot be generated.  The message is the text
+    that the interactive application prints before exiting.
+    """
+
+
+################################################################################
+# Functions - JSON file handling; loot table conditional altering; etc.
 
-# Non-blocker loot tables file names (including relative paths).
-table_names = []
+    # --> Future plan: Convert more of the main UI section into functions.
 
-# Non-bottleneck loot table file names (drops that have not yet been assigned).
-unassigned = []
+    # The "conditions_surgeon": loot tables are revised by a declarative list
+    #   of rules (revision_rules), compiled into a single tree visitor per
+    #   kind of revision (revision_classes), so that each loot table is walked
+    #   exactly once no matter how many rules apply to it.  To add a fix, add
+    #   a rule and list it under the revision classes that need it.
 
-# Loot table names we don't want included in the datapack at all.
-exclusions = []
 
-# Loot table names we don't want assigned to drop any of the blockers tables.
-# These are assigned before the main unasssigned set.
-bottlenecks = []
+# The rules for revising loot tables.  Each rule names a dict key to search for
+# ('key') and says when a match is removed:
+#
+#   - With 'value': remove the key: value pair if the value matches.
+#   - With 'subkey' and/or 'subvalue': remove the key if its value is a list
+#     holding a dict with a matching sub-key (and / or sub-value).
+#   - With neither: remove every occurrence of the key.
+#   - With 'whole_item': True (and 'value'): instead of removing just the key,
+#     remove the whole dict that holds it from its list.  (For conditions that
+#     carry other keys besides "condition", which would be left broken if only
+#     the "condition" key were removed.)
+
+revision_rules = {
+
+    # "minecraft:killed_by_player" can't be met unless a player kills a mob.
+    'killed_by_player': {'key': 'condition', 'value': 'minecraft:killed_by_player'},
+
+    # The armor stand is "killed" without a tool, so tool checks can't be met.
+    'match_tool': {'key': 'condition', 'value': 'minecraft:match_tool',
+                   'whole_item': True},
+
+    # Two-block objects (beds, doors, tall flowers) check that the block
+    # broken is the object itself (so that only one half drops).
+    'block_self_check': {'key': 'conditions', 'subkey': 'block'},
+
+    # Fishing treasure checks that the bobber ("this" entity) is in open water.
+    'fishing_hook_check': {'key': 'conditions', 'subkey': 'entity', 'subvalue': 'this'},
+
+    # Glow lichen checks itself for each of its six orientations.
+    'glow_lichen_functions': {'key': 'functions'},
+}
+
+# The kinds of revisions, each the list of rules (from revision_rules) that it
+# applies.  Revision classes with no rules return the loot table as-is.  See
+# classify_revision for which class applies to which pair of loot tables.
+
+revision_classes = {
+    'self': (),
+    'entity_to_entity': (),
+    'armor_stand': ('killed_by_player', 'match_tool'),
+    'non_entity_to_entity': ('killed_by_player',),
+    'two_block': ('block_self_check',),
+    'fishing': ('fishing_hook_check',),
+    'glow_lichen': ('glow_lichen_functions',),
+    'passthrough': (),
+}
+
+
+def compile_rules(rules):
+    """Compiles a list of revision rules (dicts as in revision_rules) into a
+        function that takes a JSON tree and returns a revised copy of it.  The
+        returned function walks the tree once, removing the matches of every
+        rule and also all of the empty list and dict elements (and empty
+        values) left behind.  The passed tree is left untouched.
+
+    :param rules: The rules to apply (dicts with 'key' and, optionally,
+        'value', 'subkey', 'subvalue', and 'whole_item')
+    """
 
-# Loot table names we don't want assigned to drop from bottlenecks objects.
-# Added to table_names only after bottlenecks are assigned.
-    # --> Later, we may expand to enable selectable degrees of difficulty:
-    #   multiple "frustrater" levels (selectable at runtime).
-blockers = []
+    def empty(x):
+        return x is None or x == {} or x == [] or x == ''
 
-# These are assigned to random table_names before other assignments are made.
-unassigned_bottlenecks = []
+    # Sort the rules into the keys to kill (with the test each value must
+    # pass for the key to be killed) and the list items to kill (by key and
+    # value).
+
+    kill_tests = {}
+    item_tests = []
+
+    for rule in rules:
+        key = rule['key']
+        value = rule.get('value')
+        subkey = rule.get('subkey')
+        subvalue = rule.get('subvalue')
+
+        if rule.get('whole_item'):
+            item_tests.append((key, value))
+            continue
+
+        if not empty(subkey) or not empty(subvalue):
+            def test(v, subkey=subkey, subvalue=subvalue):
+                if isinstance(v, list):
+                    for item in v:
+                        if isinstance(item, dict):
+                            for sk, sv in item.items():
+                                if ((sk == subkey and sv == subvalue) or (
+                                        sk == subkey and empty(subvalue)) or (
+                                        empty(subkey) and sv == subvalue)):
+                                    return True
+                return False
+        elif not empty(value):
+            def test(v, value=value):
+                return v == value
+        else:
+            def test(v):
+                return True
+        kill_tests.setdefault(key, []).append(test)
 
-# These are added to table_names after the bottlenecks files have been assigned.
-table_names_blockers = []
+    def killed(k, v):
+        tests = kill_tests.get(k)
+        return tests is not None and any(test(v) for test in tests)
 
-# Used to build the RLT datapack .zip file: A dictionary of randomized pairs
-# of loot table file names with path.
-assignments = {}
+    def killed_item(v):
+        return isinstance(v, dict) and any(
+                key in v and v[key] == value for key, value in item_tests)
 
-# The file name - table contents assignments with the loot tables cleaned up.
-# This is the list used for data pack .zip file creation.  The code takes the
-# file name listed in the key (the first loot table name) and assigns it the
-# file contents from the file in the value (the second loot table name).
-new_tables = {}
+    def visit(obj):
+        """Recursively revise a complex JSON tree, returning the revised
+        copy.
+        """
 
-# Lists of table names in each sub-folder of the loot tables root folder.
-# Doesn't (yet) include sub-sub-folders (villagers, sheep, etc.).
-    # --> Instead of determining these from the folder tree, maybe we could
-    #   read the "type" key's value from each file and use that info instead.
-blocks_table_names = []
-# chests_table_names = []   # Not implemented yet.
-entity_table_names = []
-# gameplay_table_names = [] # Not implemented yet.
+        # If obj is not a list or dict (typically where we've hit a leaf -
+        # no further nested levels of dict or list), return the obj
+        # unchanged.
 
-# Doors, beds, and tall flowers.  Need this list to clean their loot tables of
-# problematic conditions checks.
-two_block_objects = []
+        if not isinstance(obj, (dict, list)):
+            return obj
 
-    # --> Future plan: Convert config files into one JSON file with sections
-    #   (nested lists), and write a separate tool or add code here to enable
-    #   config content manipulation programmatically.  Could even error-check
-    #   by checking the file name selections against the current loot tables
-    #   set's file names.
+        # If obj is a list, revise each element (leaving out the killed
+        # items), and return a list without the empty list elements.
 
+        elif isinstance(obj, list):
+            return [v for v in (visit(v) for v in obj
+                                if not (item_tests and killed_item(v)))
+                    if not empty(v)]
 
-################################################################################
-# Functions - JSON file handling; loot table conditional altering; etc.
+        # If this is reached, obj is a dict.  Leave out each killed key, and
+        # return a dict of the remaining key: (revised) value pairs, except
+        # leave out any keys with empty values.
 
-    # --> Future plan: Convert more of the main UI section into functions.
+        else:   # obj is a dict
+            return {k: v for k, v in ((k, visit(v)) for k, v in obj.items()
+                                      if not killed(k, v)) if not empty(v)}
 
-    # --> Implement another fuction, conditions_surgeon or something, that will
-    #   search all "conditions" blocks for a specific sub-key or sub-value,
-    #   killing the entire block when found.  For example,
-    #   "minecraft:block_state_property."
+    return visit
 
 
 def kill_keys(obj, key, subkey=None, subval=None):
@@ -198,184 +303,291 @@ def kill_keys(obj, key, subkey=None, subval=None):
     both are passed to the function.  If subkey and subval are not provided,
     all matches of key are deleted.  Returns the modified obj.
 
+    The passed obj is left untouched (a pruned copy is returned), so the same
+    parsed loot table can be reused for any number of datapacks.
+
     :param obj: A JSON tree object of nested iterables (dicts and/or lists).
     :param key: The key to search for and remove.
     :param subkey: (Optional) The sub-key to search for.
     :param subval: (Optional) The sub-value to search for.
     """
 
-    def empty(x):
-        return x is None or x == {} or x == [] or x == ''
+    return compile_rules([{'key': key, 'subkey': subkey, 'subvalue': subval}])(obj)
 
-    def search_branch(obj, key, subkey, subval):
-        """Recursively search a complex JSON tree for empty list and dict
-        entries and key (with required subkey and subval, if provided) and
-        remove all instances found.
-        """
 
-        # If obj is not a list or dict (typically where we've hit a
-        # leaf - no further nested levels of dict or list), return
-        # the obj unchanged.
+def prune_json_tree(obj, kill_key=None, kill_val=None):
+    """Searches a JSON tree of nested list and dict elements for occurrences
+    of empty list and dict elements and removes them.  Also removes dict keys
+    that match key and val (if both are passed to the function), or key, or val.
+    If neither key nor val are passed, function simply prunes all empty branches
+    found in obj.  Returns the pruned obj.
 
-        if not isinstance(obj, (dict, list)):
-            return obj
+    The passed obj is left untouched (a pruned copy is returned), so the same
+    parsed loot table can be reused for any number of datapacks.
 
-        # If obj is a list, prune each element, and return a pruned
-        # list without the empty list elements.
+    :param obj: A JSON tree object of nested iterables (dicts and/or lists).
+    :param key: (Optional) The key to search for.
+    :param val: (Optional) The value to search for.
+    """
 
-        elif isinstance(obj, list):
-            return [v for v in (search_branch(v, key, subkey, subval)
-                                    for v in obj) if not empty(v)]
+    # A val without a key can't be expressed as a revision rule (which is
+    # always keyed), so that rare case is handled here directly.
 
-        # If this is reached, obj is a dict.  For each key in the dict,
-        # if it matches key, and no subkey and subval were provided,
-        # delete the key.  Or if the key's value is a list of dicts,
-        # search for a match of subkey or subval (or subkey and subval
-        # if both are provided), and if found, delete key.  Then return
-        # a pruned dict of the key: (pruned) value pairs, including all
-        # of the remaining ones except any empty ones.
+    if kill_key is None and kill_val is not None:
+        def empty(x):
+            return x is None or x == {} or x == [] or x == ''
 
-        else:   # obj is a dict
-            for k, v in list(obj.items()):
+        def prune_branch(obj):
+            if isinstance(obj, list):
+                return [v for v in (prune_branch(v) for v in obj) if not empty(v)]
+            elif isinstance(obj, dict):
+                return {k: v for k, v in ((k, prune_branch(v))
+                                        for k, v in obj.items()
+                                        if v != kill_val) if not empty(v)}
+            return obj
 
-                # If no subkey & subval, delete key if found.
+        return prune_branch(obj)
 
-                if k == key:
-                    if empty(subkey) and empty(subval):
-                        obj.pop(k)
+    rules = [] if kill_key is None else [{'key': kill_key, 'value': kill_val}]
+    return compile_rules(rules)(obj)
 
-                    # Search for subkey and subval in the sub-dicts.
-                    # If sub-dicts have subkey and subval (or one, if
-                    # the other wasn't provided), delete key.
-                    
-                    else:
-                        if isinstance(v, list):
-                            for item in v:
-                                if isinstance(item, dict):
-                                    for sk, sv in list(item.items()):
-                                        if ((sk == subkey and sv == subval) or (
-                                                sk == subkey and empty(subval)) or (
-                                                empty(subkey) and sv == subval)):
-                                            obj.pop(k)
 
-            # Whether or not we've killed any keys, next iterate through
-            # any remaining keys, returning a dict of k: v pairs for all
-            # of the (pruned) values in the dict, except leave out any
-            # keys with empty values.
+def checkcollisions(a, b, aname, bname):
+    """Test to see whether loot tables are included on more than one config
+        list.  If so, raises RLTError reporting the conflicting entries.
 
-            return {k: v for k, v in ((k, search_branch(v, key, subkey, subval))
-                                    for k, v in obj.items()) if not empty(v)}
+    :param a: First list of loot tables to be compared
+    :param b: Second list of loot tables to be compared
+    :param aname: Name of first list of loot tables
+    :param bname: Name of second list of loot tables
+    """
 
-    # The call that starts the recursion through the tree, ultimately
-    # returning the fully pruned object (the result of the prune_branch
-    # function call).
+    collisions = sorted(set(a).intersection(b))
+    if len(collisions) > 0:
 
-    return search_branch(obj, key, subkey, subval)
+        # Joining the collisions with newlines, so that each loot table is
+        # listed on its own line.
 
+        raise RLTError(
+            "\nThe datapack cannot be generated because of conflicting\n\n"
+            "entries in the config lists.  The following loot tables are\n\n"
+            f"listed on both {aname} and {bname} lists:\n\n"
+            + "\n".join(collisions) + "\n"
+            "\nEach loot table can be on only one list at most.  Please\n"
+            "update the config lists to remove duplicates and then run the\n"
+            "application again.\n")
 
-def prune_json_tree(obj, kill_key=None, kill_val=None):
-    """Searches a JSON tree of nested list and dict elements for occurrences
-    of empty list and dict elements and removes them.  Also removes dict keys
-    that match key and val (if both are passed to the function), or key, or val.
-    If neither key nor val are passed, function simply prunes all empty branches
-    found in obj.  Returns the pruned obj.
 
-    :param obj: A JSON tree object of nested iterables (dicts and/or lists).
-    :param key: (Optional) The key to search for.
-    :param val: (Optional) The value to search for.
+def config_location(configpath, config_folder=None):
+    """Returns the location of a config file: in config_folder, if one is
+        given, or else the default location (the current folder).
+
+    :param configpath: The default path of the config file
+    :param config_folder: (Optional) The folder holding the config files
     """
 
-    def empty(x):
-        return x is None or x == {} or x == [] or x == ''
+    if config_folder is None:
+        return configpath
+    return os.path.join(config_folder, os.path.basename(configpath))
 
-    def prune_branch(obj, kill_key, kill_val):
-        """Recursively search a complex JSON tree for empty list and dict
-        entries (and key / val if given) and remove all instances found.
-        """
 
-        # If obj is not a list or dict (typically where we've hit a
-        # leaf - no further nested levels of dict or list), return
-        # the obj unchanged.
+def config_hash(configpath):
+    """Returns the SHA-1 hash of a config file's contents, or None if the
+        config file does not exist.
 
-        if not isinstance(obj, (dict, list)):
-            return obj
+    :param configpath: The path of the config file
+    """
 
-        # If obj is a list, prune each element, and return a pruned
-        # list without the empty list elements.
+    try:
+        with open(configpath, 'rb') as configfile:
+            return hashlib.sha1(configfile.read()).hexdigest()
+    except FileNotFoundError:
+        return None
 
-        elif isinstance(obj, list):
-            return [v for v in (prune_branch(v, kill_key, kill_val)
-                                    for v in obj) if not empty(v)]
 
-        # If this is reached, obj is a dict.  For each key and value
-        # pair in the dict, delete the pair if it matches kill_key
-        # or kill_val (or both, if both were given).  Then return a
-        # pruned dict of the key: (pruned) value pairs, including
-        # all of the remaining ones except any empty ones.
+def load_config_list(configpath):
+    """Reads a config file and returns its list of loot table names, with
+        blank lines and comment lines removed.  Returns None if the config
+        file does not exist.
 
-        else:   # obj is a dict
-            for k, v in list(obj.items()):
-                if ((k == kill_key and v == kill_val)
-                        or (k == kill_key and empty(kill_val))
-                        or (empty(kill_key) and v == kill_val)):
-                    obj.pop(k)
+    :param configpath: The path of the config file
+    """
+
+    if not os.path.isfile(configpath):
+        return None
+    with open(configpath, 'r') as configfile:
+        entries = configfile.read().split('\n')
+    return [x for x in entries if not (
+                x.lstrip() == '' or x.lstrip().startswith('#'))]
+
+
+class ConfigIndex:
+    """A config list compiled for matching loot tables.  Each entry in the
+        list is one of:
+
+        - a file name (oak_door.json), matching the tables of that name in
+          any sub-folder, as in earlier RLT versions;
+        - a path under the loot tables folder (blocks/oak_door.json),
+          matching only that table (with the namespace in front, for a
+          table outside of minecraft: mymod:blocks/oak_door.json);
+        - a glob pattern (blocks/*_door.json, or *_bed.json for any
+          sub-folder), matching every table it fits.
+
+        File names and paths are matched with set lookups, and all of the
+        patterns together with a single regular expression.  A file name is
+        matched exactly as it is written, as in earlier RLT versions (so an
+        entry with a stray space matches nothing, and a seed keeps making the
+        same datapack); paths and patterns are trimmed of surrounding spaces.
+
+    :param entries: The list of entries (from load_config_list)
+    """
 
-            # Whether or not we've killed any keys, next iterate through
-            # any remaining keys, returning a dict of k: v pairs for all
-            # of the (pruned) values in the dict, except leave out any
-            # keys with empty values.
+    def __init__(self, entries):
+        self.entries = list(entries)
+        self.names = set()
+        self.paths = set()
+        self.globs = []
+        name_globs = []
+        path_globs = []
+        for entry in self.entries:
+            if not any(char in entry for char in '/\\*?['):
+                self.names.add(entry)
+                continue
+            entry = entry.strip().replace('\\', '/')
+            if entry.startswith(loot_tables_folder + '/'):
+                entry = entry[len(loot_tables_folder) + 1:]
+            if any(char in entry for char in '*?['):
+                self.globs.append(entry)
+                (path_globs if '/' in entry else name_globs).append(fnmatch.translate(entry))
+            elif '/' in entry:
+                self.paths.add(entry)
+            else:
+                self.names.add(entry)
+        self.name_pattern = re.compile('|'.join(name_globs)) if name_globs else None
+        self.path_pattern = re.compile('|'.join(path_globs)) if path_globs else None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def match(self, relpath):
+        """Returns True if a loot table is on the list.
+
+        :param relpath: The loot table's path under the loot tables folder,
+            with forward slashes (such as 'blocks/oak_door.json')
+        """
 
-            return {k: v for k, v in ((k, prune_branch(v, kill_key, kill_val))
-                                    for k, v in obj.items()) if not empty(v)}
+        name = relpath[relpath.rfind('/') + 1:]
+        return (name in self.names or relpath in self.paths
+                or (self.name_pattern is not None and self.name_pattern.match(name) is not None)
+                or (self.path_pattern is not None and self.path_pattern.match(relpath) is not None))
 
-    # The call that starts the recursion through the tree, ultimately
-    # returning the fully pruned object (the result of the prune_branch
-    # function call).
+    def unknown(self, relpaths):
+        """Returns the entries on the list that match none of the loot
+        tables.
 
-    return prune_branch(obj, kill_key, kill_val)
+        :param relpaths: The paths of all of the loot tables under the loot
+            tables folder (as for match)
+        """
 
+        relpaths = set(relpaths)
+        names = {relpath[relpath.rfind('/') + 1:] for relpath in relpaths}
+        unknown = sorted(self.names - names) + sorted(self.paths - relpaths)
+        for glob in self.globs:
+            pattern = re.compile(fnmatch.translate(glob))
+            candidates = relpaths if '/' in glob else names
+            if not any(pattern.match(candidate) for candidate in candidates):
+                unknown.append(glob)
+        return unknown
 
-def checkcollisions(a, b, aname, bname):
-    """Test to see whether loot tables are included on more than one config
-        list.  If so, reports the error, then exits.
 
-    :param a: First list of loot tables to be compared
-    :param b: Second list of loot tables to be compared
-    :param aname: Name of first list of loot tables
-    :param bname: Name of second list of loot tables
-    """
+# The compiled config lists are kept in this file (in the config files'
+# folder), so the config files are only read and compiled again when one of
+# them changes.
+config_index_filename = 'RLT config index.pickle'
 
-    collisions = sorted(set(a).intersection(b))
-    if len(collisions) > 0:
-        print("\nThe datapack cannot be generated because of conflicting\n")
-        print("entries in the config lists.  The following loot tables are\n")
-        print(f"listed on both {aname} and {bname} lists:\n")
+# Increase this whenever the way the config lists are compiled changes.
+config_index_format = 2
 
-        # Using the "unpacking" operator (*) to unpack the list and then
-        # changing the separator from space to newline:
 
-        print(*collisions, sep="\n")
-        print("\nEach loot table can be on only one list at most.  Please")
-        print("update the config lists to remove duplicates and then run the")
-        print("application again.\n")
-        print("Exiting...\n")
-        os.system('pause')
-        sys.exit()
+def load_config_indexes(config_folder=None):
+    """Returns the four config lists as a dict of config file path (the
+        default path, as in exclusionsconfig): (entries, ConfigIndex, SHA-1
+        hash), with entries None (and an empty ConfigIndex) for a config file
+        that does not exist.  The lists come from the compiled config index
+        file, unless any of the config files has changed since it was saved.
 
+    :param config_folder: (Optional) The folder holding the config files
+    """
+
+    configpaths = (exclusionsconfig, bottlenecksconfig, blockersconfig, two_block_objectsconfig)
+    stamp = []
+    for configpath in configpaths:
+        try:
+            stat = os.stat(config_location(configpath, config_folder))
+            stamp.append((configpath, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            stamp.append((configpath, None, None))
+    key = (config_index_format, RLT_version, tuple(stamp))
+    indexpath = os.path.join(os.path.dirname(config_location(exclusionsconfig, config_folder)),
+                             config_index_filename)
+    try:
+        with open(indexpath, 'rb') as file:
+            cached = pickle.load(file)
+        if cached['key'] == key:
+            return cached['configs']
+    except Exception:
+        pass
+
+    configs = {}
+    for configpath in configpaths:
+        entries = load_config_list(config_location(configpath, config_folder))
+        configs[configpath] = (entries, ConfigIndex(entries or []),
+                               config_hash(config_location(configpath, config_folder)))
+    try:
+        with open(indexpath + '.tmp', 'wb') as file:
+            pickle.dump({'key': key, 'configs': configs}, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(indexpath + '.tmp', indexpath)
+    except OSError:
+        pass
+    return configs
 
-def revise_contents(dropperfilepath, lootfilepath, loottable):
-    """Examines each entry in the assignments dict and returns each loot table
-        with revisions to correct issues if certain conditions are met.
+
+def classify_revision(dropperfilepath, lootfilepath,
+                      entity_table_names=(), two_block_objects=()):
+    """Returns the name of the revision class (in revision_classes) for a
+        pair of loot tables: which revisions the loot table needs, if any,
+        when it is dropped by the dropper.
 
     :param dropperfilepath: The file name of the object doing the dropping
-    :param key: The file name of the new loot table to be dropped
-    :param value: The loot table (the file contents)
+    :param lootfilepath: The file name of the new loot table to be dropped
+    :param entity_table_names: The file names (or the file names with paths)
+        of the entities tables
+    :param two_block_objects: The file names (or the file names with paths)
+        of the two-block objects tables
     """
 
     # For clarity and simplicity, extract the file names from the paths.
 
     dropperfile = os.path.basename(dropperfilepath)
     lootfile = os.path.basename(lootfilepath)
+    return revision_class(dropperfile, lootfile,
+                          dropperfile in entity_table_names or dropperfilepath in entity_table_names,
+                          lootfile in entity_table_names or lootfilepath in entity_table_names,
+                          lootfile in two_block_objects or lootfilepath in two_block_objects)
+
+
+def revision_class(dropperfile, lootfile, dropper_entity, loot_entity, two_block):
+    """Returns the name of the revision class (in revision_classes) for a
+        pair of loot tables, given their file names and categories (see
+        classify_revision, and the TableRecords, which have the categories
+        worked out already).
+
+    :param dropperfile: The file name (without path) of the dropper
+    :param lootfile: The file name (without path) of the loot table
+    :param dropper_entity: True if the dropper is an entities table
+    :param loot_entity: True if the loot table is an entities table
+    :param two_block: True if the loot table is a two-block objects table
+    """
 
 ##    print(f"Examining lootfile: {lootfile}...\n") # <-- For testing only
 
@@ -383,21 +595,20 @@ def revise_contents(dropperfilepath, lootfilepath, loottable):
     # was assigned to drop itself), keep the loot table as-is.
 
     if dropperfile == lootfile:
-        return loottable
+        return 'self'
 
     # Because "minecraft:killed_by_player" is the only condition that can
     # cause an entity drop to fail: If an entity is assigned to drop another
     # entity's drops, no changes are made (the new entity can still be killed),
     # unless the dropper is the armor stand - a non-killable entity, in which
-    # case the killed_by_player condition is removed.
+    # case the killed_by_player condition is removed (as are any match_tool
+    # conditions, since no tool is involved either).
 
-    elif dropperfile in entity_table_names and lootfile in entity_table_names:
+    elif dropper_entity and loot_entity:
         if dropperfile == 'armor_stand.json':
-            pruned = prune_json_tree(loottable, 'condition', 'minecraft:killed_by_player')
-            pruned2 = prune_json_tree(pruned, 'condition' 'minecraft:match_tool')
-            return pruned2
+            return 'armor_stand'
         else:
-            return loottable
+            return 'entity_to_entity'
 
     # If the dropper is not an entity but the lootfile is, remove the
     # impossible-to-meet condition "killed_by_player".
@@ -405,12 +616,8 @@ def revise_contents(dropperfilepath, lootfilepath, loottable):
     # --> We may need to further test the condition(s) relating to non-entity
     # objects being assigned to drop entity tables.
     #
-    # * Testing note: If prune_json_tree would return the killed key's value,
-    # we could wrap the prune_json_tree call in a print statement for testing
-    # and confirmation.
-
-    elif dropperfile not in entity_table_names and lootfile in entity_table_names:
-        return prune_json_tree(loottable, 'condition', 'minecraft:killed_by_player')
+    elif not dropper_entity and loot_entity:
+        return 'non_entity_to_entity'
 
     # If the lootfile is one of the two-block objects, we remove the
     # self-check condition that prevents drops from any non-self object.
@@ -436,8 +643,8 @@ def revise_contents(dropperfilepath, lootfilepath, loottable):
     # the correct conditions key/section, searching deeper to ensure that it
     # is indeed the correct one before completing the operation.
 
-    elif lootfile in two_block_objects:
-        return kill_keys(loottable, 'conditions', 'block')
+    elif two_block:
+        return 'two_block'
 
     # If the lootfile is fishing.json (and it wasn't assigned to drop itself),
     # remove the impossible-to-meet condition of the object having a bobber and
@@ -449,7 +656,7 @@ def revise_contents(dropperfilepath, lootfilepath, loottable):
     # or to delete only the (a) sub-key under it.  (See two-block objects note.)
 
     elif lootfile == 'fishing.json':
-        return kill_keys(loottable, 'conditions', 'entity', 'this')
+        return 'fishing'
 
     # The glow lichen table checks self for each of its six orientations to
     # prevent double drops.  But like the two-block objects, this check will
@@ -461,398 +668,4047 @@ def revise_contents(dropperfilepath, lootfilepath, loottable):
     # glow lichen functions to whatever table it is assigned.
 
     elif lootfile == 'glow_lichen.json':
-        return kill_keys(loottable, 'functions')
+        return 'glow_lichen'
 
     # If none of the other checks passed, it means that (hopefully) there are
     # no other conditions in which the drop will be broken or otherwise
-    # problematic, so we return loottable as-is.
+    # problematic, so the loottable is passed through as-is.
 
     else:
+        return 'passthrough'
+
+
+# The compiled revision for each revision class (None where the class has no
+# rules, and the loot table is used as-is).
+
+revisers = {name: compile_rules([revision_rules[rule] for rule in rules]) if rules else None
+            for name, rules in revision_classes.items()}
+
+# How the loot tables are sorted into blocks and entities tables (for the
+# revisions): 'legacy' takes the tables right in the blocks and entities
+# folders, known by file name, as earlier RLT versions did (so a seed makes the
+# same datapack as ever); 'folder' takes every table anywhere under those
+# folders (entities/sheep/ as well), and 'type' goes by each table's own
+# "type" (or by its folder, for a table without one).  Those two know the
+# tables by file name with path, so tables of the same name in other folders
+# or namespaces aren't taken for one another.
+
+classify_modes = ('legacy', 'folder', 'type')
+
+# The category of the tables in each loot tables sub-folder, and of each loot
+# table type.
+folder_categories = {'blocks': 'block', 'entities': 'entity'}
+type_categories = {'minecraft:block': 'block', 'minecraft:entity': 'entity'}
+
+
+def revise_contents(dropperfilepath, lootfilepath, loottable,
+                    entity_table_names=(), two_block_objects=()):
+    """Examines each entry in the assignments dict and returns each loot table
+        with revisions to correct issues if certain conditions are met.  The
+        passed loottable is left untouched; it is returned as-is if no
+        revisions are needed, or else a revised copy is returned.
+
+    :param dropperfilepath: The file name of the object doing the dropping
+    :param lootfilepath: The file name of the new loot table to be dropped
+    :param loottable: The loot table (the file contents)
+    :param entity_table_names: The file names of the entities tables
+    :param two_block_objects: The file names of the two-block objects tables
+    """
+
+    return revise_table(classify_revision(dropperfilepath, lootfilepath,
+                                          entity_table_names, two_block_objects), loottable)
+
+
+def revise_table(revision, loottable):
+    """Returns a loot table with the revisions of a revision class (see
+        classify_revision).  The passed loottable is left untouched; it is
+        returned as-is if the class has no revisions, or else a revised copy
+        is returned.
+
+    :param revision: The name of the revision class
+    :param loottable: The loot table (the file contents)
+    """
+
+    reviser = revisers[revision]
+    if reviser is None:
         return loottable
+    return reviser(loottable)
 
 
 ################################################################################
-# Begin UI output
+# Randomization procedures
+#
+# Two assignment modes are available.  The 'legacy' mode makes exactly the same
+# random draws, in the same order, as all earlier RLT versions, so a seed still
+# produces the same assignments it always has (given the same loot tables and
+# config files).  Those draws pick the i-th remaining table from a list, which
+# used to mean deleting from the middle of a Python list (O(n) per deletion,
+# O(n^2) overall); the IndexedPool finds and removes the i-th remaining table
+# in O(log n) instead.  The 'fast' mode makes different draws (so it produces
+# different assignments for the same seed): swap-removals for the bottlenecks
+# and a single shuffle for everything else, O(n) overall.
+
+assignment_modes = ('legacy', 'fast')
 
 
-print(f"\nMemetics\' Random Loot Tables {RLT_version} for (Java) Minecraft {Minecraft_version}")
-print("(should work with Minecraft 1.14 or later).")
-print("Copyright (c) 2021-2023 Memetics (GNU General Public License version 3)")
-print()
-print("For the latest source code and documentation, visit https://github.com/MemeticsX/RLT .")
-print("\n")
-print("This application randomizes the default loot tables for Minecraft.  It generates a datapack that the user then")
-print("places in a savegame\'s datapacks folder.  In Minecraft 1.17 and later, the datapacks folder can be accessed")
-print("before world creation on the Create New World page using the Data Packs button.  The datapacks folder for an")
-print("existing savegame can be found in the savegame\'s root folder, which can be opened from within Minecraft by")
-print("clicking Singleplayer, then on the Select World page, selecting the savegame, clicking the Edit button, and then")
-print("on the Edit World page clicking the Open World Folder button.")
-print()
-print("Before running this application, you must extract the loot tables from the current Minecraft version (the folder")
-print("called 'loot_tables' and all of its sub-folders and files).  The loot_tables folder must be in the same folder as")
-print("this application for the application to locate the loot tables and generate the data pack correctly.  In addition,")
-print("the blockers.config, bottlenecks.config, and exclusions.config files must be in the current folder if customization")
-print("is being used.\n\n")
+class IndexedPool:
+    """A fixed list of items from which the i-th remaining item can be removed
+        in O(log n) time, using a Fenwick (binary indexed) tree of the counts
+        of remaining items.
 
+    :param items: The items, in order
+    """
 
-# Prompt user for a PRNG seed
+    def __init__(self, items):
+        self.items = list(items)
+        self.alive = bytearray(b'\x01') * len(self.items)
+        self.size = len(self.items)
 
-seed = input("Enter a seed (a number or text string). Leave blank for a system-generated random seed: ")
-print()
+        # Build the Fenwick tree in O(n): each node holds the count of the
+        # items in its range, all of which are present to begin with.
 
+        n = len(self.items)
+        tree = [0] * (n + 1)
+        for i in range(1, n + 1):
+            tree[i] += 1
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self.tree = tree
 
+        # The largest power of two not above n, where the tree search starts.
+        self.top = 1 << (n.bit_length() - 1) if n > 0 else 0
 
-# Set PRNG seed & datapack name based on user input.
+    def __len__(self):
+        return self.size
 
-if len(seed) > 0:
-    print(f"Creating RLT datapack using the seed '{seed}'.")
-    random.seed(seed)       # This seeds the PRNG with the input seed.
-    datapack_name = 'RLT_{}'.format(seed)
-    datapack_description = 'Memetics\' Random Loot Tables: seed = {}'.format(seed)
-    datapack_filename = 'RLT (seed = ' + seed + ') for Minecraft ' + Minecraft_version + '.zip'
-else:
-    print("Creating RLT datapack using a random, system-generated seed (different for each run).\n")
+    def __iter__(self):
+        """Iterates over the remaining items, in their original order."""
 
-    # The PRNG is already seeded with a system-determined random seed upon
-    # import of the random module, so no need to call random.seed() here.
-    # If in the future we allow multiple runs of system-determined
-    # random seeds, though, we'll need to re-initialize with random.seed()
-    # for each run.
+        return (item for item, alive in zip(self.items, self.alive) if alive)
 
-    datapack_name = 'RLT_random_seed'
-    datapack_description = 'Memetics\' Random Loot Tables: random seed'
-    datapack_filename = 'RLT (random seed) for Minecraft ' + Minecraft_version + '.zip'
+    def pop(self, index):
+        """Removes and returns the index-th remaining item (counting from 0,
+        as with list indexes).
 
-# If the data pack already exists, confirm over-writing it.
+        :param index: The position of the item among the remaining items
+        """
 
-if os.path.isfile(os.path.join(datapack_folder, datapack_filename)):
-    if len(seed) > 0:
-        print(f"Warning: A datapack for seed '{seed}' already exists.")
-        print("Making a new datapack with that seed will over-write the existing one.\n")
+        if not 0 <= index < self.size:
+            raise IndexError('pool index out of range')
+
+        # Walk down the tree to the last position whose count of remaining
+        # items (up to and including it) is still below index + 1; the item
+        # wanted is the next one.
+
+        tree = self.tree
+        n = len(self.items)
+        pos = 0
+        remaining = index + 1
+        step = self.top
+        while step:
+            nextpos = pos + step
+            if nextpos <= n and tree[nextpos] < remaining:
+                pos = nextpos
+                remaining -= tree[nextpos]
+            step >>= 1
+
+        # pos is now the (0-based) list index of the item.  Update the counts
+        # of every tree node covering it.
+
+        i = pos + 1
+        while i <= n:
+            tree[i] -= 1
+            i += i & -i
+        self.alive[pos] = 0
+        self.size -= 1
+        return self.items[pos]
+
+
+def assign_tables(rng, table_names, unassigned, unassigned_bottlenecks,
+                  table_names_blockers, mode='legacy', log=print):
+    """Randomly assigns the loot tables to each other, returning the
+        assignments dict of (dropper) table name: (loot) table name pairs.
+        None of the passed lists is changed.
+
+    :param rng: The seeded random.Random instance to draw from
+    :param table_names: The non-blocker loot tables file names
+    :param unassigned: The non-bottleneck loot table file names
+    :param unassigned_bottlenecks: The bottleneck loot table file names
+    :param table_names_blockers: The blocker loot table file names
+    :param mode: (Optional) 'legacy' (the default) for the same assignments
+        as earlier RLT versions, or 'fast'
+    :param log: (Optional) The function that reports progress messages
+    """
+
+    if mode not in assignment_modes:
+        raise RLTError(f"Unknown assignment mode '{mode}'; choose one of: {', '.join(assignment_modes)}.")
+
+    # Used to build the RLT datapack .zip file: A dictionary of randomized
+    # pairs of loot table file names with path.
+    assignments = {}
+
+    # Assign the bottlenecks drops to random, non-blocker table_names:
+    # Go through the table_names list and give each a random drops
+    # assignment from the unassigned list.  Pick random loot table file
+    # name from table_names for each unassigned_bottlenecks drop, and
+    # assign them to the assignments dictionary as key(table_names):
+    # value(unassigned_bottlenecks).  Then remove the table_names entry
+    # for each: This way we don't later try to assign a different
+    # unassigned drop value to a previously assigned table_names key.
+    #
+    # In legacy mode the entry is removed from the pool, keeping the order
+    # of the rest; in fast mode, the last entry is moved into its place.
+
+    if mode == 'legacy':
+        table_names = IndexedPool(table_names)
+    else:
+        table_names = list(table_names)
+
+    if len(unassigned_bottlenecks) > 0:
+        log("Assigning bottleneck drops to random non-blocker tables")
+        if len(unassigned_bottlenecks) > len(table_names):
+            raise RLTError("Error: There are more bottlenecks than non-blocker tables to assign them to.")
+        for drop in unassigned_bottlenecks:
+            if mode == 'legacy':
+                assignments[table_names.pop(rng.randint(0, len(table_names)-1))] = drop
+            else:
+                i = rng.randrange(len(table_names))
+                assignments[table_names[i]] = drop
+                table_names[i] = table_names[-1]
+                table_names.pop()
+
+    # Now that the bottlenecks have been taken care of, add
+    # table_names_blockers to the main table_names list.  Then all the
+    # remaining table_names names and unassigned drops will be ready for
+    # assignment.
+
+    table_names = list(table_names)
+    if len(table_names_blockers) > 0:
+        log("Moving blockers to main tables list")
+        table_names.extend(table_names_blockers)
+
+    # About to complete remaining assignments: Report status (varying by
+    # whether or not there were bottlenecks assignments).
+
+    if len(assignments) > 0:
+        log("Assigning random drops for remaining loot tables")
+    else:
+        log("Assigning random drops for all loot tables")
+
+    # Make sure table_names and unassigned lists have same number of
+    # elements.  (Note: We probably don't need this error check.)
+
+    if len(table_names) != len(unassigned):
+        raise RLTError("Error: table_names list and unassigned list contain different items or different numbers of elements.")
+
+    # Complete all of the remaining table --> drop assignments: For each
+    # table_names name, assign a random unassigned drop (add as key:value
+    # to the assignments dictionary).  In fast mode, a shuffled copy of the
+    # unassigned list gives the same kind of random pairing in one pass.
+
+    if mode == 'legacy':
+        unassigned = IndexedPool(unassigned)
+        for name in table_names:
+            assignments[name] = unassigned.pop(rng.randint(0, len(unassigned)-1))
     else:
-        print("Warning: A datapack for a system-generated random seed already exists.")
-        print("Making a new random-seed datapack will over-write the existing one.\n")
-    print("Do you wish to proceed?\n")
-    choice = 'x'
-    while choice[0].lower() != 'y':
-        print("Enter 'Y' (yes) to generate a new datapack, over-writing the current datapack.")
-        choice = input("Enter 'N' (no) to abort and exit the application: ")
-        if choice[0].lower() == 'n':
-            print("\nData pack generation canceled.  Exiting...")
-            os.system('pause')
-            sys.exit()
-        if choice[0].lower() != 'y':
-            print("\nPlease choose a valid option: (Y) to proceed or (N) to abort and exit.\n")
-
-print("\nGenerating datapack.  This may take a moment, depending on the size of the loot table set...\n")
-
-
-# Load exclusions list; remove blank lines and comment lines.
-
-if os.path.isfile(exclusionsconfig):
-    with open(exclusionsconfig, 'r') as exclusionsfile:
-        print("Loading exclusions list")
-        exclusions = exclusionsfile.read().split('\n')
-        exclusions[:] = [x for x in exclusions if not (
-                        x.lstrip() == '' or x.lstrip().startswith('#'))]
-else:
-    print(f"Warning: No exclusions list; '{exclusionsconfig}' file not found).")
-
-# Load bottlenecks list; remove blank lines and comment lines.
-
-if os.path.isfile(bottlenecksconfig):
-    with open(bottlenecksconfig, 'r') as bottlenecksfile:
-        print("Loading bottlenecks list")
-        bottlenecks = bottlenecksfile.read().split('\n')
-        bottlenecks[:] = [x for x in bottlenecks if not (
-                        x.lstrip() == '' or x.lstrip().startswith('#'))]
-else:
-    print(f"Warning: No bottlenecks list; '{bottlenecksconfig}' file not found).")
-
-# Load blockers list; remove blank lines and comment lines.
-
-if os.path.isfile(blockersconfig):
-    with open(blockersconfig, 'r') as blockersfile:
-        print("Loading blockers list")
-        blockers = blockersfile.read().split('\n')
-        blockers[:] = [x for x in blockers if not (
-                    x.lstrip() == '' or x.lstrip().startswith('#'))]
-else:
-    print(f"Warning: No blockers list; '{blockersconfig}' file not found).")
-
-# Check for tables that appear on more than one config list.  (If there are
-# duplicates, report them and then exit.)
-
-checkcollisions(exclusions, bottlenecks, 'exclusions', 'bottlenecks')
-checkcollisions(exclusions, blockers, 'exclusions', 'blockers')
-checkcollisions(bottlenecks, blockers, 'bottlenecks', 'blockers')
-
-# Load two-block objects list; remove blank lines and comment lines.
-
-if os.path.isfile(two_block_objectsconfig):
-    with open(two_block_objectsconfig, 'r') as two_block_objectsfile:
-        print("Loading two-block objects list")
-        two_block_objects = two_block_objectsfile.read().split('\n')
-        two_block_objects[:] = [x for x in two_block_objects if not (
-                            x.lstrip() == '' or x.lstrip().startswith('#'))]
-else:
-    print(f"Warning: '{two_block_objectsconfig}' file not found).")
-
-
-###################################################################################
-# Load loot tables file names from the loot_tables folder tree (including local
-# relative paths), sorting them to table_names and table_names_blockers lists.
-
-print(f"Scanning local {loot_tables_folder} folder tree for loot table files")
-
-# Read the loot tables directory:
-# First, add all of the blocks tables and entities tables to lists for use
-# later when revising the tables (stripping out "killed by player" conditions,
-# or etc.).  Next, build the preliminary sorted lists of loot tables.  Ignore
-# file names that appear on the exclusions list, and then assign all remaining
-# file names to the table_names lists (filtered by blockers) and also to the
-# unassigned lists (filtered by bottlenecks).
-    # Filtered file names get assigned to either the table_names_blockers list
-    # or the unassigned_bottlenecks list.
-
-# Load the file names and relative paths for each loot tables sub-folder
-# into their respective lists.  (Only doing blocks & entities for now, so
-# we know which tables are in those categories for the table revision /
-# clean-up step.)  Skip the loot tables in the exclusions list.  (Report
-# each skipped file to print output.)
+        unassigned = list(unassigned)
+        rng.shuffle(unassigned)
+        assignments.update(zip(table_names, unassigned))
+
+    return assignments
+
+
+################################################################################
+# Loot table sources
 #
-# Add bottlenecks files to table_names (allow bottleneck names to have
-# bottleneck drops), but instead of adding them to unassigned, put them in
-# the special unassigned_bottlenecks list for priority assignment.
+# The loot tables can be read from an extracted loot_tables folder (the
+# LootTableFolder) or straight from a Minecraft client .jar file, or any other
+# .zip file holding the loot tables (the LootTableArchive), so the loot_tables
+# folder doesn't have to be extracted by hand first.  Either way, each loot
+# table is known by the same file name (with path) as it would have in the
+# extracted folder, for example 'loot_tables/blocks/stone.json', so the
+# datapack and its forensics files come out the same from both.
 #
-# Add blockers files to the unassigned list but not the main table_names
-# list: keep them in the separate table_names_blockers list until the
-# bottlenecks drops have been assigned.  Then later we'll return them to
-# the main table_names list for assignment with the rest.
+# Either source may also hold the loot tables of several namespaces (a modpack's
+# data folder, or a mod .jar), laid out as in a datapack:
+# data/<namespace>/loot_tables/.  Each namespace's loot tables folder is then a
+# root of its own (see namespaces), and the tables keep their namespaces in the
+# datapack.
+
+
+def read_member_data(read_at, info, archivepath):
+    """Returns a .zip file member's data as stored in the .zip file (that is,
+        still compressed).
+
+    :param read_at: A function returning (length) bytes of the .zip file,
+        starting at (offset)
+    :param info: The member's ZipInfo
+    :param archivepath: The .zip file's path (for error messages)
+    """
+
+    # The member data follows the local file header, whose file name and extra
+    # field lengths can differ from the central directory's.
+
+    header = read_at(info.header_offset, 30)
+    if header[:4] != b'PK\003\004':
+        raise RLTError(f"Bad zip member header for '{info.filename}' in '{archivepath}'.")
+    namelength, extralength = struct.unpack('<2H', header[26:30])
+    return read_at(info.header_offset + 30 + namelength + extralength, info.compress_size)
+
+
+# The number of threads scan_folder lists folders in.
+scan_threads = 8
+
+
+def scan_folder(roots, threads=scan_threads):
+    """Returns the folder trees under one or more folders as a list of
+        (folder path, file names) pairs, in os.walk order (each tree top-down,
+        with each folder's files and sub-folders in os.scandir order), just as
+        os.walk would list them one after another.  The folders are listed
+        with os.scandir, a whole level of the trees at a time, in a pool of
+        threads, so a large tree (or one on a slow drive) is listed several
+        folders at once.  As with os.walk, folders that can't be listed are
+        left out, and linked folders aren't followed.
+
+    :param roots: The folders to list
+    :param threads: (Optional) The number of threads to list folders in
+    """
+
+    def list_folder(dirpath):
+        filenames = []
+        subfolders = []
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir:
+                        filenames.append(entry.name)
+                    elif not entry.is_symlink():
+                        subfolders.append(entry.path)
+        except OSError:
+            return None
+        return filenames, subfolders
+
+    # List the trees a level at a time...
+
+    listings = {}
+    with ThreadPoolExecutor(threads) as pool:
+        level = list(roots)
+        while level:
+            listed = list(pool.map(list_folder, level))
+            listings.update(zip(level, listed))
+            level = [subfolder for listing in listed if listing is not None for subfolder in listing[1]]
+
+    # ...then put the folders in os.walk order.
+
+    walk = []
+    pending = list(reversed(roots))
+    while pending:
+        dirpath = pending.pop()
+        listing = listings[dirpath]
+        if listing is not None:
+            walk.append((dirpath, listing[0]))
+            pending.extend(reversed(listing[1]))
+    return walk
+
+
+def folder_namespaces(folder):
+    """Returns the (namespace, loot tables folder) pairs for a loot tables
+        folder tree, sorted by namespace.  A folder laid out like a datapack
+        (data/<namespace>/loot_tables/), or like its data folder
+        (<namespace>/loot_tables/), has a loot tables folder for each
+        namespace; any other folder is taken to be the minecraft loot tables
+        folder itself.
+
+    :param folder: The loot tables folder (or datapack, or data folder)
+    """
+
+    for datafolder in (os.path.join(folder, 'data'), folder):
+        try:
+            with os.scandir(datafolder) as entries:
+                namespaces = sorted((entry.name, os.path.join(entry.path, 'loot_tables'))
+                                    for entry in entries
+                                    if entry.is_dir() and os.path.isdir(os.path.join(entry.path, 'loot_tables')))
+        except OSError:
+            continue
+        if namespaces:
+            return namespaces
+    return [('minecraft', folder)]
+
+
+class LootTableFolder:
+    """The loot tables in an (extracted) loot tables folder tree, or in a
+        folder of namespaces laid out like a datapack (see
+        folder_namespaces).
+
+    :param folder: The loot tables folder
+    :param threads: (Optional) The number of threads to scan the folder tree
+        in (see scan_folder)
+    """
+
+    def __init__(self, folder, threads=scan_threads):
+        self.path = folder
+        self.root = folder
+        self.threads = threads
+
+        # The (namespace, loot tables folder) of each namespace, and (for
+        # namespaces laid out like a datapack) the folders holding them,
+        # which change when a namespace is added or removed.
+        self.namespaces = folder_namespaces(folder)
+        self.containers = []
+        if self.namespaces != [('minecraft', folder)]:
+            self.containers = ([os.path.dirname(os.path.dirname(self.namespaces[0][1]))]
+                               + [os.path.dirname(root) for namespace, root in self.namespaces])
+
+    def walk(self):
+        """Returns the folder tree (of each namespace) as a list of (folder
+        path, file names) pairs in os.walk order.
+        """
+
+        return scan_folder([root for namespace, root in self.namespaces], self.threads)
+
+    def walk_stamp(self, walk):
+        """Returns the modification time of each folder in the tree.  (Adding,
+        removing, or renaming a file changes its folder's modification time.)
+        """
+
+        stamp = {dirpath: os.stat(dirpath).st_mtime_ns for dirpath, filenames in walk}
+        for folder in self.containers:
+            stamp[folder] = os.stat(folder).st_mtime_ns
+        return stamp
+
+    def check_stamp(self, stamp):
+        """Returns True if none of the folders has changed since stamp."""
+
+        try:
+            return all(os.stat(dirpath).st_mtime_ns == mtime for dirpath, mtime in stamp.items())
+        except OSError:
+            return False
+
+    def fingerprint(self, lootfilepath):
+        """Returns the (modification time, size) of a loot table file."""
+
+        stat = os.stat(lootfilepath)
+        return stat.st_mtime_ns, stat.st_size
+
+    def read(self, lootfilepath):
+        """Returns the contents (bytes) of a loot table file."""
+
+        with open(lootfilepath, 'rb') as file:
+            return file.read()
+
+    def read_entry(self, lootfilepath, compress_type=zipfile.ZIP_DEFLATED, compresslevel=None):
+        """Returns a loot table file, exactly as it is, as a compressed zip
+        entry (see compress_entry).
+        """
+
+        return compress_entry(self.read(lootfilepath), compress_type, compresslevel)
+
+    def file_path(self, lootfilepath):
+        """Returns the path of a loot table file, for placing it in a
+        datapack folder as it is (see FolderWriter).
+        """
+
+        return lootfilepath
+
+    def close(self):
+        pass
+
+
+class LootTableArchive:
+    """The loot tables in a Minecraft client .jar file (under
+        data/minecraft/loot_tables), or a mod .jar file (under
+        data/<namespace>/loot_tables, for any number of namespaces), or in a
+        .zip file of the loot_tables folder.  Only the archive's central
+        directory is read up front; each loot table is read (and
+        decompressed) when it is needed, from a memory map of the archive
+        where possible.
+
+    :param path: The .jar (or .zip) file
+    """
+
+    # Where the loot tables may be found in the archive: in each namespace's
+    # data folder, or failing that, in a loot_tables folder (for minecraft).
+    prefixes = ('data/<namespace>/loot_tables/', 'loot_tables/')
+
+    def __init__(self, path):
+        self.path = path
+
+        # The minecraft loot tables get the file names they would have in an
+        # extracted loot_tables folder, and those of other namespaces the
+        # names they would have in an extracted data folder.
+        self.root = 'loot_tables'
+
+        with zipfile.ZipFile(path) as zf:
+            infolist = zf.infolist()
+        infos = {}
+        for info in infolist:
+            parts = info.filename.split('/', 3)
+            if (len(parts) == 4 and parts[0] == 'data' and parts[1] and parts[2] == 'loot_tables'
+                    and parts[3] and not info.is_dir()):
+                infos.setdefault(parts[1], []).append((parts[3], info))
+        if not infos:
+            prefix = self.prefixes[-1]
+            tables = [(info.filename[len(prefix):], info) for info in infolist
+                      if info.filename.startswith(prefix) and not info.is_dir()
+                      and len(info.filename) > len(prefix)]
+            if tables:
+                infos['minecraft'] = tables
+        if not infos:
+            raise RLTError(f"No loot tables were found in '{path}' (looked for {' or '.join(self.prefixes)}).")
+
+        # The (namespace, loot tables folder) of each namespace, and the
+        # archive members, by loot table file name (with path).
+        self.namespaces = [(namespace, self.root if namespace == 'minecraft'
+                            else os.path.join('data', namespace, 'loot_tables'))
+                           for namespace in sorted(infos)]
+        self.members = {os.path.join(root, *name.split('/')): info
+                        for namespace, root in self.namespaces
+                        for name, info in infos[namespace]}
+
+        # Memory-map the archive if possible; otherwise read the members with
+        # ordinary (locked, since the file position is shared) reads.
+
+        self.file = open(path, 'rb')
+        self.lock = threading.Lock()
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.map = None
+
+    def walk(self):
+        """Returns the loot tables tree as a list of (folder path, file names)
+        pairs in os.walk order.  Each folder's files and sub-folders are listed
+        in the order Windows lists them (by upper-cased name), so a seed gives
+        the same datapack from the archive as from the folder extracted on
+        Windows.
+        """
+
+        # Gather the files and sub-folders of each folder.
+
+        roots = [root for namespace, root in self.namespaces]
+        folders = {root: ([], []) for root in roots}
+        for lootfilepath in self.members:
+            dirpath, filename = os.path.split(lootfilepath)
+            folders.setdefault(dirpath, ([], []))[1].append(filename)
+            while dirpath not in roots and dirpath not in folders.get(os.path.dirname(dirpath), ((), ()))[0]:
+                parent = os.path.dirname(dirpath)
+                folders.setdefault(parent, ([], []))[0].append(dirpath)
+                folders.setdefault(dirpath, ([], []))
+                dirpath = parent
+
+        # Then list them top-down (each namespace in turn), as os.walk does.
+
+        walk = []
+        pending = list(reversed(roots))
+        while pending:
+            dirpath = pending.pop()
+            subfolders, filenames = folders[dirpath]
+            walk.append((dirpath, sorted(filenames, key=str.upper)))
+            pending.extend(sorted(subfolders, key=lambda d: os.path.basename(d).upper(), reverse=True))
+        return walk
+
+    def walk_stamp(self, walk):
+        """Returns the archive's (modification time, size)."""
+
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def check_stamp(self, stamp):
+        """Returns True if the archive hasn't changed since stamp."""
+
+        try:
+            return self.walk_stamp(None) == stamp
+        except OSError:
+            return False
+
+    def fingerprint(self, lootfilepath):
+        """Returns the (CRC-32, size) of a loot table, from the archive's
+        central directory (without reading the table).
+        """
+
+        info = self.members[lootfilepath]
+        return info.CRC, info.file_size
+
+    def read_raw(self, lootfilepath):
+        """Returns a loot table's member data as stored in the archive (that
+        is, still compressed), along with its ZipInfo.
+        """
+
+        info = self.members[lootfilepath]
+        return read_member_data(self.read_at, info, self.path), info
+
+    def read_at(self, offset, length):
+        """Returns length bytes of the archive, starting at offset."""
+
+        if self.map is not None:
+            return self.map[offset:offset + length]
+        with self.lock:
+            self.file.seek(offset)
+            return self.file.read(length)
+
+    def read(self, lootfilepath):
+        """Returns the contents (bytes) of a loot table."""
+
+        data, info = self.read_raw(lootfilepath)
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            data = zlib.decompress(data, -15)
+        elif info.compress_type != zipfile.ZIP_STORED:
+            with zipfile.ZipFile(self.path) as zf:
+                data = zf.read(info)
+        if zlib.crc32(data) != info.CRC:
+            raise RLTError(f"Bad CRC-32 for '{info.filename}' in '{self.path}'.")
+        return data
+
+    def read_entry(self, lootfilepath, compress_type=zipfile.ZIP_DEFLATED, compresslevel=None):
+        """Returns a loot table, exactly as it is, as a compressed zip entry
+        (see compress_entry).  A member already compressed the same way is
+        returned as stored in the archive, without decompressing it.
+        """
+
+        if compress_type == zipfile.ZIP_DEFLATED or compress_type == zipfile.ZIP_STORED:
+            data, info = self.read_raw(lootfilepath)
+            if info.compress_type == compress_type:
+                return data, info.CRC, info.file_size, info.compress_type
+        return compress_entry(self.read(lootfilepath), compress_type, compresslevel)
+
+    def file_path(self, lootfilepath):
+        """Returns None: the archive members aren't files that can be placed
+        in a datapack folder as they are.
+        """
+
+        return None
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+
+def open_loot_tables(path, threads=scan_threads):
+    """Returns the loot table source for path: a LootTableArchive if path is
+        a .jar or .zip file, or else a LootTableFolder.  Raises RLTError if
+        path is neither a folder nor a readable archive.
+
+    :param path: The loot tables folder, or the .jar or .zip file
+    :param threads: (Optional) The number of threads to scan a folder tree in
+    """
+
+    if os.path.isdir(path):
+        return LootTableFolder(path, threads)
+    if os.path.isfile(path):
+        try:
+            return LootTableArchive(path)
+        except (zipfile.BadZipFile, OSError) as ex:
+            raise RLTError(f"The loot tables file '{path}' could not be read as a .jar or .zip file: {ex}") from ex
+    raise RLTError(f"The loot tables folder '{path}' is not accessible or does not exist.")
+
+
+################################################################################
+# JSON codecs
 #
-# Add all other (non-special) tables to both table_names and unassigned.
-
-for dirpath, dirnames, filenames in os.walk(loot_tables_folder):
-    for filename in filenames:
-        if dirpath == os.path.join(loot_tables_folder, 'blocks'):
-            blocks_table_names.append(filename)
-        if dirpath == os.path.join(loot_tables_folder, 'entities'):
-            entity_table_names.append(filename)
-        if filename in exclusions:
-            print(f"  Skipping excluded loot table: {filename}")
-        elif filename in bottlenecks:
-            table_names.append(os.path.join(dirpath, filename))
-            unassigned_bottlenecks.append(os.path.join(dirpath, filename))
-        elif filename in blockers:
-            table_names_blockers.append(os.path.join(dirpath, filename))
-            unassigned.append(os.path.join(dirpath, filename))
+# Parsing the loot tables and writing them back out as JSON takes a large
+# share of the time it takes to make a datapack.  The standard library json
+# module (the JSONCodec) always works; orjson, if it is installed, does the
+# same work several times faster (the OrjsonCodec).  A seed has to make the
+# same datapack on any computer, though, and orjson does a few things
+# differently from json: it reads integers too big for 64 bits as floats, and
+# writes characters outside ASCII (and DEL) as they are instead of as \u
+# escapes, floats in exponent form as 1e16 rather than 1e+16 (and some, such
+# as 1e-05, as 0.00001), and NaN and infinities as null; and it only indents
+# by two spaces.  So the OrjsonCodec reads a table with orjson only if it has
+# no run of 19 or more digits in it, and writes a table with orjson only when
+# the settings are ones orjson supports and the output has none of those
+# things in it (a false alarm, such as "1e" or "null" in a string, only costs
+# the time); otherwise, and for anything orjson won't read or write at all,
+# it hands the work to json, so the datapack comes out byte for byte the same
+# with either codec (for a given output profile).
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONCodec:
+    """Parses and writes JSON with the standard library json module."""
+
+    name = 'json'
+
+    def loads(self, data):
+        """Returns the parsed contents of a JSON document (bytes)."""
+
+        return json.loads(data)
+
+    def dumps(self, obj, indent=None, separators=None):
+        """Returns obj as a JSON document (a string, or UTF-8 bytes), written
+        exactly as json.dumps writes it with the same indent and separators.
+        """
+
+        return json.dumps(obj, indent=indent, separators=separators)
+
+
+class OrjsonCodec(JSONCodec):
+    """Parses and writes JSON with orjson, falling back to json wherever the
+        results could differ (see above).
+    """
+
+    name = 'orjson'
+
+    # The documents are checked with bytes.translate and substring searches
+    # (much faster than a regular expression): with every digit turned into
+    # 0, a long number shows up as a run of 0s, and an exponent as 0e.
+    digits = bytes.maketrans(b'123456789', b'000000000')
+    long_number = b'0' * 19
+
+    def loads(self, data):
+        if self.long_number in data.translate(self.digits):
+            return json.loads(data)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)
+
+    def dumps(self, obj, indent=None, separators=None):
+        if indent == 2 and separators in (None, (',', ': ')):
+            option = orjson.OPT_INDENT_2
+        elif indent is None and separators is not None and tuple(separators) == (',', ':'):
+            option = 0
         else:
-            table_names.append(os.path.join(dirpath, filename))
-            unassigned.append(os.path.join(dirpath, filename))
+            return json.dumps(obj, indent=indent, separators=separators)
+        try:
+            data = orjson.dumps(obj, option=option)
+        except orjson.JSONEncodeError:
+            return json.dumps(obj, indent=indent, separators=separators)
+        if (not data.isascii() or b'\x7f' in data or b'null' in data or b'0.0000' in data
+                or b'0e' in data.translate(self.digits)):
+            return json.dumps(obj, indent=indent, separators=separators)
+        return data
 
 
-###################################################################################
-# Randomization procedures
+# The JSON codecs, by name; 'auto' picks the fastest one installed.
+json_codecs = {'json': JSONCodec, 'orjson': OrjsonCodec}
 
-# Assign the bottlenecks drops to random, non-blocker table_names:
-# Go through the table_names list and give each a random drops assignment from
-# the unassigned list.  Pick random loot table file name from table_names for
-# each unassigned_bottlenecks drop, and assign them to the assignments
-# dictionary as key(table_names): value(unassigned_bottlenecks).  Then delete
-# the table_names entry for each: This way we don't later try to assign a
-# different unassigned drop value to a previously assigned table_names key.
-
-if len(unassigned_bottlenecks) > 0:
-    print("Assigning bottleneck drops to random non-blocker tables")
-    for drop in unassigned_bottlenecks:
-        i = random.randint(0, len(table_names)-1)
-        assignments[table_names[i]] = drop
-        del table_names[i]
-
-# Now that the bottlenecks have been taken care of, add table_names_blockers
-# to the main table_names list.  Then all the remaining table_names names and
-# unassigned drops will be ready for assignment.
-
-if len(table_names_blockers) > 0:
-    print("Moving blockers to main tables list")
-    for blockername in table_names_blockers:
-        table_names.append(blockername)
-
-# About to complete remaining assignments: Report status (varying by whether
-# or not there were bottlenecks assignments).
-
-if len(assignments) > 0:
-    print("Assigning random drops for remaining loot tables")
-else:
-    print("Assigning random drops for all loot tables")
-
-# Make sure table_names and unassigned lists have same number of elements.
-# (Note: We probably don't need this error check.)
-
-if len(table_names) != len(unassigned):
-    print("Error: table_names list and unassigned list contain different items or different numbers of elements.")
-    os.system('pause')
-    sys.exit()
 
-# Complete all of the remaining table --> drop assignments: For each
-# table_names name, assign a random unassigned drop (add as key:value
-# to the assignments dictionary).
+def json_codec(name='auto'):
+    """Returns the JSON codec with the name (see json_codecs), or for 'auto',
+        orjson if it is installed and json otherwise.  Raises RLTError for an
+        unknown codec or one that isn't installed.
+
+    :param name: (Optional) The codec name, or 'auto' (the default)
+    """
 
-for name in table_names:
-    i = random.randint(0, len(unassigned)-1)
-    assignments[name] = unassigned[i]
-    del unassigned[i]
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'json'
+    if name not in json_codecs:
+        raise RLTError(f"Unknown JSON codec '{name}'; choose one of: auto, {', '.join(json_codecs)}.")
+    if name == 'orjson' and orjson is None:
+        raise RLTError("The orjson JSON codec is not installed (pip install orjson).")
+    return json_codecs[name]()
 
 
 ################################################################################
-# File contents prep
+# The loot tables cache
+#
+# The vanilla loot tables never change between runs, so reading the whole
+# folder tree and parsing every table again each time is wasted effort.  The
+# LootTableCache keeps the scanned folder tree and the parsed tables in a
+# pickle file in the RLT cache folder.  Each cached table is reused only while
+# its fingerprint is unchanged (its file's modification time and size, or for
+# a .jar, its CRC-32 and size; and optionally its SHA-1 hash), and the folder
+# tree is rescanned only if one of its folders has changed (had files added,
+# removed, or renamed) or the .jar has changed.  The whole cache is dropped if
+# the RLT version, the Minecraft version, or the loot tables location differ.
+
+
+class LootTableCache:
+    """The on-disk cache of the scanned loot tables folder tree and the parsed
+        loot tables.
+
+    :param folder: The folder holding the cache file
+    :param source: The LootTableFolder or LootTableArchive being cached
+    :param verify_hashes: (Optional) Set to True to also check each cached
+        table's SHA-1 hash (this reads every file, but still skips parsing)
+    :param codec: (Optional) The JSONCodec to parse the tables with; by
+        default, the fastest one installed (see json_codec)
+    """
 
-# Load the default loot tables (the actual JSON content of each table) from
-# the default files.  Call the function 'revise_contents' to conditionally
-# alter the loot tables, correcting problems such as removing checks for
-# certain impossible drop conditions.
+    # Increase this whenever the layout of the cache file changes.
+    cache_format = 2
 
-# For each key in the assignments dict, load the file contents as JSON,
-# revise those contents as needed, and then convert back to JSON and store
-# in new_tables dict (the newly revised version of the assignments dict).
+    def __init__(self, folder, source, verify_hashes=False, codec=None):
+        self.folder = folder
+        self.source = source
+        self.verify_hashes = verify_hashes
+        self.codec = codec if codec is not None else json_codec()
+        self.path = os.path.join(folder, '{} ({}).pickle'.format(
+                os.path.basename(os.path.abspath(source.path)), Minecraft_version))
 
-print("Updating the tables to correct broken drop conditions")
-for filename in assignments:
-    try:
-        with open(assignments[filename],'r') as file:
-            new_tables[filename] = json.dumps(revise_contents(filename, assignments[filename], json.loads(file.read())), indent = 2)
-    except Exception as ex:
-        print(f"An error occurred with creating new_tables list: {ex}\n")
-        print("Exiting...")
-        os.system('pause')
-        sys.exit()
+        # The key identifying what the cache was built for.  If any of it
+        # differs, none of the cached contents can be trusted.
+        self.key = (self.cache_format, RLT_version, Minecraft_version,
+                    os.path.abspath(source.path))
 
+        # The folder tree listing, in os.walk order: (folder path, file names)
+        # pairs, along with the source's stamp (see walk_stamp) when listed.
+        self.walk = None
+        self.stamp = None
 
-################################################################################
-# RLT post-game forensics info prep
+        # The cached tables: file path: (fingerprint, SHA-1 hash, parsed
+        # table).
+        self.files = {}
+
+        self.hits = 0
+        self.misses = 0
+
+        self.load()
+
+    def load(self):
+        """Reads the cache file, if there is one and it was built for the
+        same RLT version, Minecraft version, and loot tables location.
+        """
+
+        try:
+            with open(self.path, 'rb') as file:
+                cached = pickle.load(file)
+        except Exception:
+            return
+        if not isinstance(cached, dict) or cached.get('key') != self.key:
+            return
+        self.walk = cached['walk']
+        self.stamp = cached['stamp']
+        self.files = cached['files']
+
+    def walk_tree(self):
+        """Returns the loot tables folder tree as a list of (folder path, file
+        names) pairs in os.walk order.  The cached listing is returned as long
+        as the tree hasn't changed; otherwise the tree is walked again.
+        """
+
+        if self.walk is not None and self.source.check_stamp(self.stamp):
+            return self.walk
 
-# Create new dictionary of assignments by file names only (strip out the
-# path elements) using a dictionary comprehension.  This will be used to
-# create a text file with a listing of all assignments sorted by file name
-# for game post-mortem analysis.
+        self.walk = self.source.walk()
+        self.stamp = self.source.walk_stamp(self.walk)
+        return self.walk
 
-basename_assignments = {os.path.basename(key): os.path.basename(assignments[key]) for key in assignments}
+    def load_table(self, lootfilepath):
+        """Returns the parsed contents of a loot table and its SHA-1 hash,
+        from the cache if the file is unchanged, or else from the file.
+
+        :param lootfilepath: The loot table file name (with path)
+        """
+
+        fingerprint = self.source.fingerprint(lootfilepath)
+        cached = self.files.get(lootfilepath)
+        if (cached is not None and cached[0] == fingerprint
+                and not self.verify_hashes):
+            self.hits += 1
+            return cached[2], cached[1]
+
+        contents = self.source.read(lootfilepath)
+        sha1 = hashlib.sha1(contents).hexdigest()
+        if cached is not None and cached[1] == sha1:
+            self.hits += 1
+            loottable = cached[2]
+        else:
+            self.misses += 1
+            loottable = self.codec.loads(contents)
+        self.files[lootfilepath] = (fingerprint, sha1, loottable)
+        return loottable, sha1
+
+    def save(self):
+        """Writes the cache file, leaving out any tables that are no longer in
+        the folder tree.  The file is written under a temporary name and then
+        renamed, so an interrupted run can't leave a broken cache behind.
+        """
+
+        current = {os.path.join(dirpath, filename)
+                        for dirpath, filenames in self.walk
+                        for filename in filenames}
+        files = {path: entry for path, entry in self.files.items() if path in current}
+        os.makedirs(self.folder, exist_ok=True)
+        temppath = self.path + '.tmp'
+        with open(temppath, 'wb') as file:
+            pickle.dump({'key': self.key, 'walk': self.walk, 'stamp': self.stamp,
+                         'files': files}, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temppath, self.path)
 
 
 ################################################################################
-# Build the datapack .zip file.
+# The loot table registry
+#
+# Each scanned loot table gets a TableRecord, numbered in scan order, with what
+# is known about the table before the config lists come into it: its file name
+# (with path), its path for the config lists, its namespace, and whether it is
+# a blocks or an entities table.  From there on the tables are known by their
+# numbers: the table lists are arrays of them, and the assignments an array
+# giving each dropper's loot table (see Generator.assign_ids), so each list
+# takes four bytes per table, and the worker processes of a seed search get
+# the lists without a single path string.  The datapack entry names and the
+# forensics files' names are worked out from the records as they are written.
+# The flags from the config lists are kept apart from the records, in a
+# bytearray (see Generator.table_flags), as Generators with different config
+# lists (see Generator.configured) share the same records.
+
+# The flags of each table in Generator.table_flags.
+two_block_flag = 1
+bottleneck_flag = 2
+blocker_flag = 4
+excluded_flag = 8
+
+
+class TableRecord:
+    """A scanned loot table (see TableRegistry).
+
+    :param id: The table's number
+    :param path: The loot table file name (with path)
+    :param relpath: The table's path for the config lists (see
+        Generator.index_tables)
+    :param namespace: The table's namespace
+    :param category: (Optional) 'block', 'entity', or None
+    """
 
+    __slots__ = ('id', 'path', 'relpath', 'namespace', 'block', 'entity')
 
-print("Building datapack zip file\n")
+    def __init__(self, id, path, relpath, namespace, category=None):
+        self.id = id
+        self.path = path
+        self.relpath = relpath
+        self.namespace = namespace
+        self.block = category == 'block'
+        self.entity = category == 'entity'
 
-# Build the zip file contents.
+    def __repr__(self):
+        return f'TableRecord({self.id}, {self.path!r})'
 
-# Assign zipdata as a file-like object which will be the container for the
-# binary stream data that follows.  Then assign zf as a zipfile object,
-# which will handle operations for writing zipfile contents to zipdata in
-# memory prior to the file write operation.
+    @property
+    def name(self):
+        """The loot table file name, without path."""
 
-zipdata = io.BytesIO()
-with zipfile.ZipFile(zipdata, 'w', zipfile.ZIP_DEFLATED, False) as zf:
+        return os.path.basename(self.path)
 
-    # Write the loot tables assignments to two text files (sorted by loot
-    # tables tree; sorted by table file name) for post-game analysis and
-    # troubleshooting (add both to zf).
+    @property
+    def arcname(self):
+        """The table's datapack entry name (under
+        data/<namespace>/loot_tables/).
+        """
 
-    # Create fc as a text stream to contain the following text (in the "with"
-    # block), which is stored in a variable and then written to the text file.
+        relpath = self.relpath
+        if self.namespace != 'minecraft':
+            relpath = relpath[len(self.namespace) + 1:]
+        return f'data/{self.namespace}/loot_tables/{relpath}'
 
-    with io.StringIO() as fc:
 
-        # Write this content at the start of fc (= top of the text file).
+class TableRegistry:
+    """The TableRecords of the scanned loot tables, by number, and the
+        number of each table by file name (with path).
 
-        fc.write(f"RLT datapack: {datapack_name}\n")
-        fc.write(f"Datapack file name: {datapack_filename}\n\n")
-        fc.write("Loot table assignments sorted by loot table tree path:\n\n")
+    :param records: (Optional) The records, numbered 0, 1, 2, ...
+    """
 
-        # For each dictionary entry in assignments, sorted by key (path +
-        # filename), add each key (path + filename) and its value (filename
-        # only) to fc. (The file=fc element makes it print to the file.)
+    def __init__(self, records=()):
+        self.records = list(records)
+        self.ids = {record.path: record.id for record in self.records}
 
-        for key, value in sorted(assignments.items()): print(
-                f"{key} --> {os.path.basename(value)}", file=fc)
+    def __len__(self):
+        return len(self.records)
 
-        # Assign the value of fc to a variable, so we can write the file
-        # from there.
+    def __iter__(self):
+        return iter(self.records)
 
-        assignments_by_tree = fc.getvalue()
+    def __getitem__(self, id):
+        return self.records[id]
 
-    # Write the text file into the .zip file.
+    def __contains__(self, path):
+        return path in self.ids
 
-    zf.writestr("RLT_info/Loot table assignments by tree.txt", assignments_by_tree)
+    def record(self, path):
+        """Returns the record of a loot table, given its file name (with
+        path).
+        """
 
-    # Create fc as a text stream to contain the following text (in the "with"
-    # block), which is stored in a variable and then written to the text file.
+        return self.records[self.ids[path]]
 
-    with io.StringIO() as fc:
+    def paths(self, ids):
+        """Returns the file names (with paths) of the tables with the given
+        numbers.
+        """
 
-        # Write this content at the start of fc (= top of the text file).
+        records = self.records
+        return [records[id].path for id in ids]
 
-        fc.write(f"RLT datapack: {datapack_name}\n")
-        fc.write(f"Datapack file name: {datapack_filename}\n\n")
-        fc.write("Loot table assignments by file:\n\n")
 
-        # For each dictionary entry in basename_assignments, sorted by key
-        # (filename): add each key (filename only) and its value (filename
-        # only) to fc. (The file=fc element makes it print to the file.)
+################################################################################
+# The datapack zip writer
+#
+# The PackWriter writes the datapack .zip file in a single forward pass (so it
+# can write to any binary stream), and it can take entries that are already
+# compressed.  That lets the Generator compress each revised loot table once and
+# copy the same compressed bytes into every datapack that uses it.  Entries are
+# compressed exactly as zipfile.ZipFile would compress them (raw deflate, at the
+# same default level), so the datapacks read the same in any unzip tool.
+
+
+def compress_entry(data, compress_type=zipfile.ZIP_DEFLATED, compresslevel=None):
+    """Compresses the contents of a zip entry, returning the entry as a tuple
+        of (compressed data, CRC-32, uncompressed size, compression type), as
+        taken by PackWriter.write_entry.
+
+    :param data: The entry contents (bytes, or a string to encode as UTF-8)
+    :param compress_type: (Optional) zipfile.ZIP_DEFLATED (the default) or
+        zipfile.ZIP_STORED
+    :param compresslevel: (Optional) The zlib compression level (0-9); by
+        default, zlib's default level
+    """
 
-        for key, value in sorted(basename_assignments.items()): print(
-                f"{key} --> {value}", file=fc)
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    if compress_type == zipfile.ZIP_DEFLATED:
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION if compresslevel is None
+                                      else compresslevel, zlib.DEFLATED, -15)
+        compressed = compressor.compress(data) + compressor.flush()
+    elif compress_type == zipfile.ZIP_STORED:
+        compressed = data
+    else:
+        raise ValueError(f"Unsupported compression type: {compress_type}")
+    return compressed, zlib.crc32(data), len(data), compress_type
 
-        # Assign the value of fc to a variable, so we can write the file
-        # from there.
 
-        assignments_by_file = fc.getvalue()
+class PackWriter:
+    """Writes a .zip file, one entry at a time, to a binary file object.  Use
+        as a context manager (or call close()) to finish the .zip file.
 
-    # Write the text file, adding it to the .zip file object.
+    :param file: A binary file object, open for writing
+    :param compress_type: (Optional) The compression for writestr entries
+    :param compresslevel: (Optional) The zlib level for writestr entries
+    :param date_time: (Optional) The (year, month, day, hour, minute, second)
+        timestamp for the entries; by default, the current local time
+    """
 
-    zf.writestr('RLT_info/Loot table assignments by file.txt', assignments_by_file)
+    def __init__(self, file, compress_type=zipfile.ZIP_DEFLATED,
+                 compresslevel=None, date_time=None):
+        self.file = file
+        self.compress_type = compress_type
+        self.compresslevel = compresslevel
+        if date_time is None:
+            date_time = time.localtime(time.time())[:6]
+        year, month, day, hour, minute, second = date_time
+        self.dosdate = (year - 1980) << 9 | month << 5 | day
+        self.dostime = hour << 11 | minute << 5 | (second // 2)
+
+        # The central directory records (already packed, to keep them small
+        # for datapacks with a great many entries), written out by close().
+        self.central = bytearray()
+        self.count = 0
+        self.offset = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+    def _write(self, data):
+        self.file.write(data)
+        self.offset += len(data)
+
+    def writestr(self, name, data):
+        """Compresses data and adds it to the .zip file as name.
+
+        :param name: The entry name (path) in the .zip file
+        :param data: The entry contents (bytes, or a string)
+        """
 
-    # For each "key" (loot table file name) in new_tables, add to the zip file
-    # a file with that name but with the "value" loot table file's contents.
+        self.write_entry(name, compress_entry(data, self.compress_type, self.compresslevel))
 
-    for lootfile, contents in new_tables.items():
-        zf.writestr(os.path.join('data/minecraft/', lootfile), contents)
+    def write_entry(self, name, entry):
+        """Adds an already compressed entry (from compress_entry) to the .zip
+        file as name.
 
-    # Write the rest of the Minecraft-required datapack files.
+        :param name: The entry name (path) in the .zip file
+        :param entry: The (compressed data, CRC-32, size, compression type)
+            tuple
+        """
 
-    zf.writestr('pack.mcmeta', json.dumps({'pack':{'pack_format':datapack_format, 'description':datapack_description}}, indent=4))
-    zf.writestr('data/minecraft/tags/functions/load.json', json.dumps({'values':['{}:reset'.format(datapack_name.lower())]}))
-    zf.writestr('data/{}/functions/reset.mcfunction'.format(datapack_name.lower()), 'tellraw @a ["",{"text":"Memetics\' RLT: Random Loot Tables","color":"green"}]')
+        compressed, crc, size, compress_type = entry
+        if size > 0xFFFFFFFF or len(compressed) > 0xFFFFFFFF:
+            raise ValueError(f"Zip entry too large: {name}")
+
+        # As with zipfile, entry names always use forward slashes, and names
+        # that aren't plain ASCII are flagged as UTF-8.
+
+        if os.sep != '/':
+            name = name.replace(os.sep, '/')
+        try:
+            filename = name.encode('ascii')
+            flags = 0
+        except UnicodeEncodeError:
+            filename = name.encode('utf-8')
+            flags = 0x800
+
+        header_offset = self.offset
+        self._write(struct.pack('<4s2B4HL2L2H', b'PK\003\004', 20, 0, flags,
+                                compress_type, self.dostime, self.dosdate, crc,
+                                len(compressed), size, len(filename), 0))
+        self._write(filename)
+        self._write(compressed)
+
+        # The entry's central directory record.
+
+        extra = b''
+        if header_offset > 0xFFFFFFFF:
+            extra = struct.pack('<2HQ', 1, 8, header_offset)
+            header_offset = 0xFFFFFFFF
+        self.central += struct.pack('<4s4B4HL2L5H2L', b'PK\001\002', 20, 3 if os.sep == '/' else 0,
+                                    45 if extra else 20, 0, flags, compress_type,
+                                    self.dostime, self.dosdate, crc, len(compressed), size,
+                                    len(filename), len(extra), 0, 0, 0,
+                                    0o600 << 16, header_offset)
+        self.central += filename
+        self.central += extra
+        self.count += 1
+
+    def close(self):
+        """Writes the central directory, finishing the .zip file.  (Zip64
+        records are added if there are too many entries, or too much data,
+        for the standard records.)
+        """
 
-# Check the current folder for the RLT datapacks folder; if it does not
-# exist, create it.
+        central_offset = self.offset
+        self._write(self.central)
+        central_size = self.offset - central_offset
+        count = self.count
+
+        if count > 0xFFFF or central_offset > 0xFFFFFFFF or central_size > 0xFFFFFFFF:
+            zip64_offset = self.offset
+            self._write(struct.pack('<4sQ2H2L4Q', b'PK\006\006', 44, 45, 45, 0, 0,
+                                    count, count, central_size, central_offset))
+            self._write(struct.pack('<4sLQL', b'PK\006\007', 0, zip64_offset, 1))
+            count = min(count, 0xFFFF)
+            central_size = min(central_size, 0xFFFFFFFF)
+            central_offset = min(central_offset, 0xFFFFFFFF)
+        self._write(struct.pack('<4s4H2LH', b'PK\005\006', 0, 0, count, count,
+                                central_size, central_offset, 0))
+        self.central = bytearray()
+        self.count = 0
+
+
+class FolderWriter:
+    """Writes a datapack as an unpacked folder tree (which Minecraft loads as
+        well as a .zip file), with the same methods as PackWriter.  An entry
+        may also be given as the path of a file to place in the datapack as
+        it is, which is hard-linked where possible (or else copied).
+
+    :param folder: The datapack folder (created if needed)
+    """
 
-print(f"Writing datapack file to folder: {datapack_folder}\n")
-try:
-    if not os.path.isdir(datapack_folder):
-        os.mkdir(datapack_folder)
-except Exception as ex:
-    print(f"An error occurred.  Error message: {ex}\n")
-    print("Exiting...")
-    os.system('pause')
-    sys.exit()
+    def __init__(self, folder):
+        self.folder = folder
+        self.folders = set()
 
-# Now write the actual .zip file to the datapack folder using the zip file
-# contents we just created in the zipdata file-like object.
+    def __enter__(self):
+        return self
 
-try:
-    with open(os.path.join(datapack_folder, datapack_filename), 'wb') as file:
-        file.write(zipdata.getvalue())
-except Exception as ex:
-    print(f"An error occurred.  Error message: {ex}\n")
-    print("Exiting...")
-    os.system('pause')
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+    def path(self, name):
+        """Returns the path of the file for an entry name, creating its
+        folder if needed.
+        """
+
+        path = os.path.join(self.folder, *name.replace(os.sep, '/').split('/'))
+        folder = os.path.dirname(path)
+        if folder not in self.folders:
+            os.makedirs(folder, exist_ok=True)
+            self.folders.add(folder)
+        return path
+
+    def writestr(self, name, data):
+        """Writes data to the datapack as name.
+
+        :param name: The entry name (path) in the datapack
+        :param data: The entry contents (bytes, or a string)
+        """
+
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        with open(self.path(name), 'wb') as file:
+            file.write(data)
+
+    def write_entry(self, name, entry):
+        """Writes an entry (from compress_entry, uncompressing it if need
+        be) to the datapack as name, or places a file there, given its path.
+
+        :param name: The entry name (path) in the datapack
+        :param entry: The (compressed data, CRC-32, size, compression type)
+            tuple, or the path of a file to place as it is
+        """
+
+        if isinstance(entry, str):
+            path = self.path(name)
+            try:
+                os.link(entry, path)
+            except OSError:
+                shutil.copyfile(entry, path)
+            return
+        compressed, crc, size, compress_type = entry
+        if compress_type == zipfile.ZIP_DEFLATED:
+            compressed = zlib.decompress(compressed, -15)
+        self.writestr(name, compressed)
+
+    def close(self):
+        pass
+
+
+def replace_folder(temppath, path):
+    """Moves a newly written folder into place, replacing any earlier folder
+        (or file) there: the earlier one is renamed out of the way, the new
+        one renamed into its place, and only then the earlier one removed.
+    """
+
+    if not os.path.lexists(path):
+        os.replace(temppath, path)
+        return
+    oldpath = temppath + '.old'
+    os.replace(path, oldpath)
+    try:
+        os.replace(temppath, path)
+    except BaseException:
+        os.replace(oldpath, path)
+        raise
+    if os.path.isdir(oldpath) and not os.path.islink(oldpath):
+        shutil.rmtree(oldpath, ignore_errors=True)
+    else:
+        os.remove(oldpath)
+
+
+class PackReader:
+    """Reads the entries of an existing .zip file (such as an earlier datapack)
+        as compressed entries (see compress_entry), ready to be copied into a
+        new .zip file by PackWriter.write_entry without recompressing them.
+
+    :param path: The .zip file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with zipfile.ZipFile(path) as zf:
+            self.infos = {info.filename: info for info in zf.infolist()}
+        self.file = open(path, 'rb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __contains__(self, name):
+        return name.replace(os.sep, '/') in self.infos
+
+    def read_at(self, offset, length):
+        """Returns length bytes of the .zip file, starting at offset."""
+
+        self.file.seek(offset)
+        return self.file.read(length)
+
+    def read_entry(self, name):
+        """Returns the named entry as a (compressed data, CRC-32, size,
+        compression type) tuple.
+
+        :param name: The entry name (path) in the .zip file
+        """
+
+        info = self.infos[name.replace(os.sep, '/')]
+        return (read_member_data(self.read_at, info, self.path), info.CRC,
+                info.file_size, info.compress_type)
+
+    def close(self):
+        self.file.close()
+
+
+################################################################################
+# The datapack output cache
+#
+# A datapack depends only on its seed, the RLT and Minecraft versions, the
+# config lists, the loot tables, and the output profile and assignment mode.
+# The PackCache keeps finished datapacks in the RLT cache folder, each named by
+# a hash of all of those (see Generator.pack_key), so asking for the same
+# datapack again just copies the cached one, and a datapack made from
+# different inputs can never be mistaken for the current one.  The cache is
+# limited in size: once it grows too big, the least recently used datapacks
+# are removed.
+
+# The most space the cached datapacks may take (bytes).
+pack_cache_size = 512 * 1024 * 1024
+
+
+class PackCache:
+    """The on-disk cache of finished datapacks, by key (see Generator.pack_key).
+
+    :param folder: The folder holding the cached datapacks
+    :param max_size: (Optional) The most space the cached datapacks may take
+        (bytes); the least recently used ones are removed past that
+    """
+
+    def __init__(self, folder, max_size=pack_cache_size):
+        self.folder = folder
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        """Returns where the datapack for a key is cached."""
+
+        return os.path.join(self.folder, key + '.zip')
+
+    def get(self, key):
+        """Returns the path of the cached datapack for a key (marking it as
+        the most recently used), or None if it isn't cached.
+
+        :param key: The datapack's key
+        """
+
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put(self, key, file):
+        """Adds a datapack to the cache, then removes the least recently used
+        datapacks if the cache has grown too big.  The datapack is written
+        under a temporary name and then renamed, so a half-written datapack
+        is never found in the cache.
+
+        :param key: The datapack's key
+        :param file: The datapack .zip file, as a binary file object open for
+            reading (it is read from the start)
+        """
+
+        os.makedirs(self.folder, exist_ok=True)
+        path = self.path(key)
+        temppath = '{}.{}.tmp'.format(path, os.urandom(4).hex())
+        try:
+            file.seek(0)
+            with open(temppath, 'xb') as cached:
+                shutil.copyfileobj(file, cached, 1 << 20)
+            os.replace(temppath, path)
+        except BaseException:
+            try:
+                os.remove(temppath)
+            except OSError:
+                pass
+            raise
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used datapacks until the cache fits in
+        max_size.
+        """
+
+        packs = []
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.name.endswith('.zip'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    packs.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        size = sum(pack[1] for pack in packs)
+        for mtime, packsize, path in sorted(packs):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= packsize
+
+
+################################################################################
+# The forensics database
+#
+# Each datapack lists its assignments in its RLT_info text files, which is fine
+# for one game but means unzipping every datapack to find, say, which seeds
+# have elytra dropped by something easy to find.  With a forensics database,
+# the assignments of every datapack made are also added to an SQLite database,
+# indexed both ways (by dropper and by loot), so such questions are one query
+# (see ForensicsStore.find, and the --query-loot and --query-dropper options).
+#
+# The tables are known by their paths under the loot tables folder (such as
+# 'entities/blaze.json'), as on the config lists.  A datapack made again for
+# the same seed, config lists, and versions replaces the earlier record.
+
+class ForensicsStore:
+    """The forensics database: the assignments of the datapacks made, with the
+        seed, config lists hash, and versions of each.
+
+    :param path: The SQLite database file (created if needed)
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS datapacks (
+            id INTEGER PRIMARY KEY,
+            seed TEXT NOT NULL,
+            config_hash TEXT NOT NULL,
+            RLT_version TEXT NOT NULL,
+            Minecraft_version TEXT NOT NULL,
+            datapack_filename TEXT NOT NULL,
+            created REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS datapacks_seed ON datapacks (seed);
+        CREATE TABLE IF NOT EXISTS assignments (
+            datapack INTEGER NOT NULL REFERENCES datapacks (id) ON DELETE CASCADE,
+            dropper TEXT NOT NULL,
+            dropper_name TEXT NOT NULL,
+            loot TEXT NOT NULL,
+            loot_name TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS assignments_dropper ON assignments (dropper_name, datapack);
+        CREATE INDEX IF NOT EXISTS assignments_loot ON assignments (loot_name, datapack);
+        """
+
+    def __init__(self, path):
+        self.path = path
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+
+        # The datapack service builds its datapacks in its request threads
+        # (one at a time), so the connection may be used from any thread.
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.executescript(self.schema)
+
+    def has(self, seed, config_hash):
+        """Returns whether the database has the assignments of the datapack
+        for a seed and config lists hash (made with this RLT and Minecraft
+        version).
+        """
+
+        return self.connection.execute(
+                'SELECT 1 FROM datapacks WHERE seed = ? AND config_hash = ? AND RLT_version = ? '
+                'AND Minecraft_version = ?', (seed, config_hash, RLT_version, Minecraft_version)
+                ).fetchone() is not None
+
+    def record(self, seed, config_hash, datapack_filename, assignments):
+        """Adds a datapack's assignments to the database, replacing any earlier
+        record of the same datapack.  (Datapacks with a random seed are all
+        kept.)
+
+        :param seed: The seed ('' for a random seed)
+        :param config_hash: The hash of the config lists
+        :param datapack_filename: The datapack .zip file name
+        :param assignments: The (dropper, loot) table path pairs
+        """
+
+        with self.connection:
+            if len(seed) > 0:
+                self.connection.execute(
+                        'DELETE FROM datapacks WHERE seed = ? AND config_hash = ? AND RLT_version = ? '
+                        'AND Minecraft_version = ?', (seed, config_hash, RLT_version, Minecraft_version))
+            datapack = self.connection.execute(
+                    'INSERT INTO datapacks (seed, config_hash, RLT_version, Minecraft_version, '
+                    'datapack_filename, created) VALUES (?, ?, ?, ?, ?, ?)',
+                    (seed, config_hash, RLT_version, Minecraft_version, datapack_filename,
+                     time.time())).lastrowid
+            self.connection.executemany(
+                    'INSERT INTO assignments VALUES (?, ?, ?, ?, ?)',
+                    ((datapack, dropper, dropper.rpartition('/')[2], loot, loot.rpartition('/')[2])
+                     for dropper, loot in assignments))
+
+    def find(self, loot=None, dropper=None, seed=None):
+        """Returns the assignments matching a query, as (seed, config hash,
+        datapack file name, dropper, loot) tuples, by seed.  Each table is
+        given by its file name (such as 'blaze.json'), or by its path under the
+        loot tables folder (such as 'entities/blaze.json').
+
+        :param loot: (Optional) The table whose loot is dropped
+        :param dropper: (Optional) The table dropping the loot
+        :param seed: (Optional) The seed
+        """
+
+        conditions = []
+        parameters = []
+        for column, table in (('loot', loot), ('dropper', dropper)):
+            if table is not None:
+                table = table.replace('\\', '/').strip('/')
+                if table.startswith('loot_tables/'):
+                    table = table[len('loot_tables/'):]
+                conditions.append(f'a.{column}_name = ?')
+                parameters.append(table.rpartition('/')[2])
+                if '/' in table:
+                    conditions.append(f'a.{column} = ?')
+                    parameters.append(table)
+        if seed is not None:
+            conditions.append('d.seed = ?')
+            parameters.append(seed)
+        where = ' AND '.join(conditions) or '1'
+        return self.connection.execute(
+                'SELECT d.seed, d.config_hash, d.datapack_filename, a.dropper, a.loot '
+                'FROM assignments a JOIN datapacks d ON d.id = a.datapack '
+                f'WHERE {where} ORDER BY d.seed, d.id, a.dropper', parameters).fetchall()
+
+    def close(self):
+        self.connection.close()
+
+
+################################################################################
+# Worker processes
+#
+# With more than one worker, the Generator hands the tables to be made to a
+# pool of worker processes, in batches.  Each worker opens the loot tables
+# folder (or .jar file) itself, and gets only what it needs to revise the
+# tables: the entity table names and the two-block objects.  A worker makes
+# each table's finished (compressed) entry, or reports why the table couldn't
+# be made, so one bad table doesn't stop the rest.
+
+# The number of tables handed to a worker at a time.
+table_batch_size = 32
+
+# The loot tables folder (or .jar file), in a worker process.
+worker_source = None
+
+
+def init_worker(loot_tables_folder):
+    """Sets up a worker process: opens the loot tables folder (or .jar file).
+
+    :param loot_tables_folder: The loot tables folder (or .jar or .zip file)
+    """
+
+    global worker_source
+    worker_source = open_loot_tables(loot_tables_folder)
+
+
+def make_batch(items, output_profile, output_format='zip', codec='json'):
+    """Loads, revises, serializes, and compresses a batch of tables (in a
+        worker process), returning a list with either ('ok', entry) or
+        ('error', message) for each table.
+
+    :param items: The (loot table file name, revision class) of each table
+        (see classify_revision)
+    :param output_profile: The output profile (see output_profiles)
+    :param output_format: (Optional) The datapack format (see
+        entry_profile)
+    :param codec: (Optional) The JSON codec name (see json_codecs)
+    """
+
+    profile = entry_profile(output_profile, output_format)
+    codec = json_codec(codec)
+    results = []
+    for lootfilepath, revision in items:
+        try:
+            loottable = revise_table(revision, codec.loads(worker_source.read(lootfilepath)))
+            contents = codec.dumps(loottable, indent=profile['indent'],
+                                   separators=profile['separators'])
+            results.append(('ok', compress_entry(contents, profile['compress_type'],
+                                                 profile['compresslevel'])))
+        except Exception as ex:
+            results.append(('error', str(ex)))
+    return results
+
+
+class TableBatch:
+    """A batch of tables for a worker process, handed to the worker once the
+        batch is full (or once one of its tables is needed).
+
+    :param pool: The ProcessPoolExecutor
+    :param output_profile: The output profile (see output_profiles)
+    :param output_format: (Optional) The datapack format (see
+        entry_profile)
+    :param codec: (Optional) The JSON codec name (see json_codecs)
+    """
+
+    def __init__(self, pool, output_profile, output_format='zip', codec='json'):
+        self.pool = pool
+        self.args = (output_profile, output_format, codec)
+        self.items = []
+        self.future = None
+
+    def add(self, lootfilepath, revision):
+        """Adds a table to the batch, returning a function that waits for the
+        table's entry (revised for the revision class) and returns it.
+        """
+
+        index = len(self.items)
+        self.items.append((lootfilepath, revision))
+        if len(self.items) == table_batch_size:
+            self.submit()
+        return lambda: self.result(index)
+
+    def submit(self):
+        """Hands the batch to a worker (if it hasn't been already)."""
+
+        if self.future is None:
+            self.future = self.pool.submit(make_batch, self.items, *self.args)
+
+    def result(self, index):
+        """Returns the entry for the table at index, once the worker has made
+        it.  (Raises RLTError if the table couldn't be made.)
+        """
+
+        self.submit()
+        status, value = self.future.result()[index]
+        if status == 'error':
+            raise RLTError(value)
+        return value
+
+
+################################################################################
+# Profiling
+#
+# A Profiler passed to the Generator records where the time and memory go: for
+# each phase of the pipeline (loading the config lists, scanning the folder
+# tree, assigning, loading, revising, serializing, and compressing the tables,
+# and writing the .zip file), the wall clock and CPU time, the number of items
+# handled, and the peak memory use.  It also keeps the slowest tables in each
+# of the per-table phases.  The Generator calls only phase() and count() (and
+# report(), for the in_pack option), so any object with the same methods can
+# stand in for a Profiler as a hook.
+
+
+def peak_rss():
+    """Returns the peak resident set size (RSS) of this process so far, in
+    bytes, or None where it isn't available (on Windows).
+    """
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Profiler:
+    """Records the wall clock time, CPU time, item counts, and peak memory use
+        of each pipeline phase, and the slowest tables in the per-table
+        phases.
+
+    :param trace_memory: (Optional) Set to True to trace the memory allocated
+        in each phase with tracemalloc (slow, but shows each phase's own peak
+        memory use)
+    :param slowest: (Optional) How many of the slowest tables to keep for
+        each per-table phase
+    :param in_pack: (Optional) Set to True to have the Generator add the
+        report to each datapack, as RLT_info/Profile.json
+    """
+
+    def __init__(self, trace_memory=False, slowest=10, in_pack=False):
+        self.trace_memory = trace_memory
+        self.slowest = slowest
+        self.in_pack = in_pack
+        self.started = time.perf_counter()
+
+        # The JSON codec the loot tables were parsed and written with (set
+        # by the Generator; see json_codec).
+        self.json_codec = None
+
+        # The totals for each phase, by name: [wall time, CPU time, calls,
+        # items, peak traced memory, peak RSS].
+        self.phases = {}
+
+        # The slowest tables in each per-table phase, as a heap of (seconds,
+        # table) tuples.
+        self.tables = {}
+
+        # The peak traced memory of each phase in progress (innermost last),
+        # so that nested phases don't hide their memory use from the outer
+        # phases.
+        self.peaks = []
+        self.tracing = trace_memory and not tracemalloc.is_tracing()
+        if self.tracing:
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def phase(self, name, items=1, table=None):
+        """Times a phase (as a context manager), adding the time to the
+        phase's totals.
+
+        :param name: The phase name (such as 'revise')
+        :param items: (Optional) The number of items handled
+        :param table: (Optional) The loot table handled, for the list of the
+            slowest tables in the phase
+        """
+
+        if self.trace_memory:
+            if self.peaks:
+                self.peaks[-1] = max(self.peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self.peaks.append(0)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            totals = self.phases.get(name)
+            if totals is None:
+                totals = self.phases[name] = [0.0, 0.0, 0, 0, None, None]
+            totals[0] += wall
+            totals[1] += cpu
+            totals[2] += 1
+            totals[3] += items
+            if self.trace_memory:
+                peak = max(self.peaks.pop(), tracemalloc.get_traced_memory()[1])
+                if self.peaks:
+                    self.peaks[-1] = max(self.peaks[-1], peak)
+                totals[4] = max(totals[4] or 0, peak)
+            totals[5] = peak_rss()
+            if table is not None:
+                slowest = self.tables.setdefault(name, [])
+                if len(slowest) < self.slowest:
+                    heapq.heappush(slowest, (wall, table))
+                elif wall > slowest[0][0]:
+                    heapq.heapreplace(slowest, (wall, table))
+
+    def count(self, name, items):
+        """Adds to the number of items handled in a phase.
+
+        :param name: The phase name
+        :param items: The number of items
+        """
+
+        totals = self.phases.get(name)
+        if totals is None:
+            totals = self.phases[name] = [0.0, 0.0, 0, 0, None, None]
+        totals[3] += items
+
+    def report(self):
+        """Returns the profile so far, as a dict ready to be saved as JSON.
+        (Peak RSS is the peak for the whole process by the end of each phase.)
+        """
+
+        rss = peak_rss()
+        phases = {}
+        for name, (wall, cpu, calls, items, traced, phase_rss) in self.phases.items():
+            phases[name] = {'wall_seconds': round(wall, 6), 'cpu_seconds': round(cpu, 6),
+                            'calls': calls, 'items': items}
+            if traced is not None:
+                phases[name]['peak_traced_bytes'] = traced
+            if phase_rss is not None:
+                phases[name]['peak_rss_bytes'] = phase_rss
+        return {'RLT_version': RLT_version,
+                'Minecraft_version': Minecraft_version,
+                'python': platform.python_version(),
+                'json_codec': self.json_codec,
+                'wall_seconds': round(time.perf_counter() - self.started, 6),
+                'peak_rss_bytes': rss,
+                'memory_tracing': self.trace_memory,
+                'phases': phases,
+                'slowest_tables': {name: [{'table': table.replace(os.sep, '/'),
+                                           'seconds': round(seconds, 6)}
+                                          for seconds, table in sorted(slowest, reverse=True)]
+                                   for name, slowest in self.tables.items()}}
+
+    def save(self, path):
+        """Writes the profile report to a JSON file.
+
+        :param path: The report file
+        """
+
+        with open(path, 'w') as file:
+            json.dump(self.report(), file, indent=2)
+
+    def close(self):
+        """Stops tracing memory (if the Profiler started it)."""
+
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+
+
+################################################################################
+# The datapack generator
+#
+# The Generator loads the config lists and indexes the loot tables folder tree
+# once, when it is created.  Each call to generate() then only has to do the
+# randomization and write the datapack, so a script can produce any number of
+# datapacks (one per seed) from the same Generator without paying the loading
+# costs again.  Nothing here prompts the user or exits the application; errors
+# are raised as RLTError.
+
+# The output profiles: how the loot tables are formatted as JSON, and how the
+# datapack entries are compressed.  Minecraft reads them all the same; 'pretty'
+# (the default, as in earlier RLT versions) is the easiest to read when
+# debugging, 'compact' drops the indentation and spaces, 'fast' also uses the
+# fastest compression level, and 'small' the best (slowest) one.  With 'raw'
+# (passthrough), the tables that need no revision (see classify_revision) are
+# never parsed at all: their files are copied into the datapack byte for byte
+# (from a .jar file, even still compressed), and only the tables that need
+# revising are parsed and written as compact JSON.
+output_profiles = {
+    'pretty': {'indent': 2, 'separators': None,
+               'compress_type': zipfile.ZIP_DEFLATED, 'compresslevel': None,
+               'passthrough': False,
+               'description': "indented JSON, default compression"},
+    'compact': {'indent': None, 'separators': (',', ':'),
+                'compress_type': zipfile.ZIP_DEFLATED, 'compresslevel': None,
+                'passthrough': False,
+                'description': "compact JSON, default compression"},
+    'fast': {'indent': None, 'separators': (',', ':'),
+             'compress_type': zipfile.ZIP_DEFLATED, 'compresslevel': 1,
+             'passthrough': False,
+             'description': "compact JSON, fastest compression, level 1"},
+    'small': {'indent': None, 'separators': (',', ':'),
+              'compress_type': zipfile.ZIP_DEFLATED, 'compresslevel': 9,
+              'passthrough': False,
+              'description': "compact JSON, best compression, level 9"},
+    'raw': {'indent': None, 'separators': (',', ':'),
+            'compress_type': zipfile.ZIP_DEFLATED, 'compresslevel': None,
+            'passthrough': True,
+            'description': "tables needing no revision copied as they are, "
+                           "revised tables as compact JSON, default compression"},
+}
+
+
+# The datapack formats: a .zip file, or an unpacked folder tree (see
+# FolderWriter).
+output_formats = ('zip', 'folder')
+
+
+def entry_profile(output_profile, output_format='zip'):
+    """Returns the settings the datapack entries are made with: those of the
+        output profile, except that entries for a datapack folder are left
+        uncompressed (as they are written out uncompressed anyway).
+
+    :param output_profile: The output profile name (see output_profiles)
+    :param output_format: (Optional) 'zip' (the default) or 'folder'
+    """
+
+    profile = output_profiles[output_profile]
+    if output_format == 'folder':
+        profile = dict(profile, compress_type=zipfile.ZIP_STORED, compresslevel=None)
+    return profile
+
+
+def datapack_names(seed):
+    """Returns the datapack name, description, and .zip file name for a seed
+        (an empty seed meaning a random, system-generated seed).
+
+    :param seed: The seed (a number or text string) entered by the user
+    """
+
+    if len(seed) > 0:
+        datapack_name = 'RLT_{}'.format(seed)
+        datapack_description = 'Memetics\' Random Loot Tables: seed = {}'.format(seed)
+        datapack_filename = 'RLT (seed = ' + seed + ') for Minecraft ' + Minecraft_version + '.zip'
+    else:
+        datapack_name = 'RLT_random_seed'
+        datapack_description = 'Memetics\' Random Loot Tables: random seed'
+        datapack_filename = 'RLT (random seed) for Minecraft ' + Minecraft_version + '.zip'
+    return datapack_name, datapack_description, datapack_filename
+
+
+class Generator:
+    """Generates RLT datapacks from one loaded set of config lists and one
+        indexed loot tables folder tree.
+
+    :param loot_tables_folder: The loot tables folder to randomize, or a
+        Minecraft client .jar file (or a .zip file) to read them from
+    :param config_folder: (Optional) The folder holding the .config files;
+        defaults to the current folder
+    :param datapack_folder: (Optional) The folder the datapacks are written to;
+        defaults to the 'RLT datapacks' folder in the current folder
+    :param cache_folder: (Optional) The folder for the loot tables cache
+        (see LootTableCache), or None to load the tables without caching
+    :param verify_hashes: (Optional) Set to True to have the loot tables
+        cache check each cached table's SHA-1 hash too
+    :param assignment_mode: (Optional) 'legacy' (the default) to assign the
+        tables exactly as earlier RLT versions did for the same seed, or
+        'fast' (see assign_tables)
+    :param cache_entries: (Optional) Set to False to revise and compress
+        every table again for each datapack, instead of reusing the
+        compressed entries from earlier datapacks
+    :param verbose: (Optional) Set to False to silence the progress messages
+    :param profiler: (Optional) A Profiler to record the time and memory
+        taken by each phase of the pipeline
+    :param output_profile: (Optional) How the datapack entries are formatted
+        and compressed: 'pretty' (the default), 'compact', 'fast', 'small', or
+        'raw' (see output_profiles)
+    :param compress_threads: (Optional) The number of threads compressing
+        the datapack entries; by default, 1 (the entries are compressed one
+        at a time, between revising the tables)
+    :param workers: (Optional) The number of worker processes loading,
+        revising, serializing, and compressing the tables; by default, 1 (no
+        worker processes).  Takes the place of compress_threads.
+    :param pack_cache_size: (Optional) The most space the finished datapacks
+        kept in the RLT cache folder may take, in bytes (see PackCache); 0
+        turns off the datapack output cache
+    :param forensics_db: (Optional) The forensics database file to add the
+        assignments of each datapack to (see ForensicsStore); by default,
+        none
+    :param streaming: (Optional) Set to True to keep the memory use about the
+        same for any number of loot tables: each table is read, revised, and
+        written to the datapack in turn, and neither the parsed tables nor
+        the finished entries are kept (so the loot tables cache, which holds
+        every parsed table, isn't used either)
+    :param in_flight: (Optional) The most datapack entries being made at once
+        (see revise_tables); by default, 1, or 4 per compression thread, or
+        2 batches per worker process
+    :param output_format: (Optional) 'zip' (the default) to write datapack
+        .zip files, or 'folder' to write unpacked datapack folders (see
+        generate_folder)
+    :param classify: (Optional) How the tables are sorted into blocks and
+        entities tables: 'legacy' (the default), 'folder', or 'type' (see
+        classify_modes)
+    :param scan_threads: (Optional) The number of threads scanning the loot
+        tables folder tree (see scan_folder), and reading the tables' types
+        for classify='type'
+    :param codec: (Optional) The JSON codec the tables are parsed and
+        written with: 'auto' (the default; the fastest one installed),
+        'json', or 'orjson' (see json_codecs); the datapacks come out the
+        same with any of them
+    """
+
+    def __init__(self, loot_tables_folder=loot_tables_folder,
+                 config_folder=None, datapack_folder=datapack_folder,
+                 cache_folder=cache_folder, verify_hashes=False,
+                 assignment_mode='legacy', cache_entries=True, verbose=True,
+                 profiler=None, output_profile='pretty', compress_threads=1,
+                 workers=1, pack_cache_size=pack_cache_size, forensics_db=None,
+                 streaming=False, in_flight=None, output_format='zip',
+                 classify='legacy', scan_threads=scan_threads, codec='auto'):
+        self.loot_tables_folder = loot_tables_folder
+        self.config_folder = config_folder
+        self.datapack_folder = datapack_folder
+        self.cache_folder = cache_folder
+        self.verify_hashes = verify_hashes
+        self.assignment_mode = assignment_mode
+        self.cache_entries = cache_entries and not streaming
+        self.verbose = verbose
+        self.profiler = profiler
+        self.output_profile = output_profile
+        self.compress_threads = compress_threads
+        self.workers = workers
+        self.streaming = streaming
+        self.in_flight = in_flight
+        self.output_format = output_format
+        self.classify = classify
+        self.scan_threads = scan_threads
+
+        if assignment_mode not in assignment_modes:
+            raise RLTError(f"Unknown assignment mode '{assignment_mode}'; choose one of: {', '.join(assignment_modes)}.")
+        if output_profile not in output_profiles:
+            raise RLTError(f"Unknown output profile '{output_profile}'; choose one of: {', '.join(output_profiles)}.")
+        if classify not in classify_modes:
+            raise RLTError(f"Unknown classification '{classify}'; choose one of: {', '.join(classify_modes)}.")
+        if scan_threads < 1:
+            raise RLTError(f"The number of scanning threads must be at least 1 (not {scan_threads}).")
+        if output_format not in output_formats:
+            raise RLTError(f"Unknown output format '{output_format}'; choose one of: {', '.join(output_formats)}.")
+        if compress_threads < 1:
+            raise RLTError(f"The number of compression threads must be at least 1 (not {compress_threads}).")
+        if workers < 1:
+            raise RLTError(f"The number of worker processes must be at least 1 (not {workers}).")
+        if in_flight is not None and in_flight < 1:
+            raise RLTError(f"The number of entries in flight must be at least 1 (not {in_flight}).")
+        self.codec = json_codec(codec)
+        if profiler is not None:
+            profiler.json_codec = self.codec.name
+
+        # Error check: Test whether the loot_tables_folder exists and is
+        # accessible (as a folder, or as a .jar or .zip file); if not, there
+        # is nothing to randomize.
+
+        self.source = open_loot_tables(loot_tables_folder, scan_threads)
+
+        # Loot table names we don't want included in the datapack at all.
+        self.exclusions = []
+
+        # Loot table names we don't want assigned to drop any of the blockers
+        # tables.  These are assigned before the main unasssigned set.
+        self.bottlenecks = []
+
+        # Loot table names we don't want assigned to drop from bottlenecks
+        # objects.  Added to table_names only after bottlenecks are assigned.
+            # --> Later, we may expand to enable selectable degrees of
+            #   difficulty: multiple "frustrater" levels (selectable at
+            #   runtime).
+        self.blockers = []
+
+        # Doors, beds, and tall flowers.  Need this list to clean their loot
+        # tables of problematic conditions checks.
+        self.two_block_objects = []
+
+            # --> Future plan: Convert config files into one JSON file with
+            #   sections (nested lists), and write a separate tool or add code
+            #   here to enable config content manipulation programmatically.
+            #   Could even error-check by checking the file name selections
+            #   against the current loot tables set's file names.
+
+        # The table lists are arrays of table numbers (see TableRegistry).
+
+        # Non-blocker loot tables.
+        self.table_names = array.array('i')
+
+        # Non-bottleneck loot tables (drops that have not yet been assigned).
+        self.unassigned = array.array('i')
+
+        # These are assigned to random table_names before other assignments
+        # are made.
+        self.unassigned_bottlenecks = array.array('i')
+
+        # These are added to table_names after the bottlenecks files have been
+        # assigned.
+        self.table_names_blockers = array.array('i')
+
+        # Lists of the blocks and entities table names.  With the legacy
+        # classification, these are the file names of the tables right in the
+        # blocks and entities sub-folders of the loot tables root folder, not
+        # in sub-sub-folders (villagers, sheep, etc.); with classify='folder'
+        # or 'type', they are the file names with paths of the tables found
+        # anywhere under those sub-folders, or by the "type" key's value in
+        # each file (see classify_modes).
+        self.blocks_table_names = []
+        # self.chests_table_names = []   # Not implemented yet.
+        self.entity_table_names = []
+        # self.gameplay_table_names = [] # Not implemented yet.
+
+        # The compiled config lists (see ConfigIndex), by list name.
+        self.config_indexes = {}
+
+        # The scanned loot tables folder tree, as (folder path, file names).
+        self.walk = []
+
+        # The records of the scanned loot tables, numbered in walk order (see
+        # index_tables), and the flags each table gets from the config lists
+        # (two_block_flag and so on), by table number.
+        self.registry = TableRegistry()
+        self.table_flags = bytearray()
+
+        # The config list entries that match no loot table, by list name.
+        self.unknown_config_entries = {}
+
+        # The parsed contents of each loot table loaded so far, by loot table
+        # file name (with path).  Tables are loaded the first time they are
+        # needed and kept for the following datapacks.  (With the loot tables
+        # cache, all of the tables are loaded up front by scan().)
+        self.tables = {}
+
+        # The SHA-1 hash of each loot table file loaded so far.
+        self.table_hashes = {}
+
+        # The record of the last datapack built for an incremental rebuild
+        # (see write_datapack).
+        self.build_record = None
+
+        # The revised, serialized, and compressed datapack entries made so
+        # far, by (loot table file name, revision class, output profile).  A
+        # revised table depends only on the loot table and on the kind of
+        # revision the dropper calls for (see classify_revision), never on
+        # the seed, so each entry is made once and copied into every datapack
+        # using it.
+        self.entries = {}
+
+        # The worker processes (with workers), started when first needed and
+        # kept for the following datapacks (see ensure_process_pool).
+        self.process_pool = None
+
+        # The Generator this one was made from by configured(), if it was;
+        # it shares that Generator's loot tables source, worker processes,
+        # and forensics database, which only that Generator closes.
+        self.configured_from = None
+
+        # The finished datapacks made so far (and in earlier runs), by a hash
+        # of everything they depend on (see pack_key), in the RLT cache
+        # folder.
+        self.pack_cache = None
+        if cache_folder is not None and pack_cache_size > 0:
+            self.pack_cache = PackCache(os.path.join(cache_folder, 'datapacks'), pack_cache_size)
+
+        # The hash of the names and contents of all the loot tables (see
+        # pack_key), worked out when first needed.
+        self.table_set_hash = None
+
+        # The forensics database, if the assignments are to be recorded.
+        self.forensics = ForensicsStore(forensics_db) if forensics_db is not None else None
+
+        self.log(f"Using the {self.codec.name} JSON codec")
+        with self.phase('config'):
+            self.load_configs()
+        with self.phase('scan', 0):
+            self.scan()
+        self.count('scan', len(self.table_names) + len(self.table_names_blockers))
+
+    def log(self, message):
+        """Prints a progress message, unless the Generator is silenced."""
+
+        if self.verbose:
+            print(message)
+
+    def phase(self, name, items=1, table=None):
+        """Returns a context manager timing a pipeline phase with the
+        profiler (or doing nothing, without a profiler).  See Profiler.phase.
+        """
+
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.phase(name, items, table)
+
+    def count(self, name, items):
+        """Adds to the number of items handled in a phase (with a profiler).
+        See Profiler.count.
+        """
+
+        if self.profiler is not None:
+            self.profiler.count(name, items)
+
+    def close(self):
+        """Closes the loot tables folder (or .jar file) and the forensics
+        database, and stops the worker processes.  (For a Generator made by
+        configured(), which shares all of them, this does nothing.)
+        """
+
+        if self.configured_from is not None:
+            return
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+            self.process_pool = None
+        if self.forensics is not None:
+            self.forensics.close()
+            self.forensics = None
+        self.source.close()
+
+    def config_path(self, configpath):
+        """Returns the location of a config file, in config_folder if one was
+        given or in the current folder otherwise.
+        """
+
+        return config_location(configpath, self.config_folder)
+
+    def load_configs(self):
+        """Loads the exclusions, bottlenecks, blockers, and two-block objects
+        lists from the config files, then checks for tables that appear on
+        more than one config list.
+        """
+
+        # Load the config lists (compiled, from the config index file if the
+        # config files haven't changed); blank lines and comment lines are
+        # removed.
+
+        configs = load_config_indexes(self.config_folder)
+        self.config_indexes = {}
+
+        # Load exclusions list.
+
+        exclusions, self.config_indexes['exclusions'], exclusions_hash = configs[exclusionsconfig]
+        if exclusions is not None:
+            self.log("Loading exclusions list")
+            self.exclusions = exclusions
+        else:
+            self.log(f"Warning: No exclusions list; '{self.config_path(exclusionsconfig)}' file not found).")
+
+        # Load bottlenecks list.
+
+        bottlenecks, self.config_indexes['bottlenecks'], bottlenecks_hash = configs[bottlenecksconfig]
+        if bottlenecks is not None:
+            self.log("Loading bottlenecks list")
+            self.bottlenecks = bottlenecks
+        else:
+            self.log(f"Warning: No bottlenecks list; '{self.config_path(bottlenecksconfig)}' file not found).")
+
+        # Load blockers list.
+
+        blockers, self.config_indexes['blockers'], blockers_hash = configs[blockersconfig]
+        if blockers is not None:
+            self.log("Loading blockers list")
+            self.blockers = blockers
+        else:
+            self.log(f"Warning: No blockers list; '{self.config_path(blockersconfig)}' file not found).")
+
+        # Check for tables that appear on more than one config list.  (If
+        # there are duplicates, checkcollisions raises RLTError.  Entries
+        # that are written differently but match the same table are caught
+        # by scan.)
+
+        checkcollisions(self.exclusions, self.bottlenecks, 'exclusions', 'bottlenecks')
+        checkcollisions(self.exclusions, self.blockers, 'exclusions', 'blockers')
+        checkcollisions(self.bottlenecks, self.blockers, 'bottlenecks', 'blockers')
+
+        # Load two-block objects list.
+
+        two_block_objects, self.config_indexes['two-block objects'], two_block_objects_hash = configs[two_block_objectsconfig]
+        if two_block_objects is not None:
+            self.log("Loading two-block objects list")
+            self.two_block_objects = two_block_objects
+        else:
+            self.log(f"Warning: '{self.config_path(two_block_objectsconfig)}' file not found).")
+
+        # Remember the config files' hashes, to tell later whether the config
+        # lists have changed.
+
+        self.config_hashes = {os.path.basename(configpath): configs[configpath][2]
+                              for configpath in (exclusionsconfig, bottlenecksconfig,
+                                                 blockersconfig, two_block_objectsconfig)}
+
+    def scan(self):
+        """Loads the loot tables file names from the loot tables folder tree
+        (including local relative paths), sorting them to the table_names and
+        table_names_blockers lists.
+        """
+
+        if isinstance(self.source, LootTableArchive):
+            self.log(f"Reading the loot table files index from {self.loot_tables_folder}")
+        else:
+            self.log(f"Scanning local {self.loot_tables_folder} folder tree for loot table files")
+
+        # Read the loot tables directory:
+        # First, add all of the blocks tables and entities tables to lists
+        # for use later when revising the tables (stripping out "killed by
+        # player" conditions, or etc.).  Next, build the preliminary sorted
+        # lists of loot tables.  Ignore file names that appear on the
+        # exclusions list, and then assign all remaining file names to the
+        # table_names lists (filtered by blockers) and also to the unassigned
+        # lists (filtered by bottlenecks).
+            # Filtered file names get assigned to either the
+            # table_names_blockers list or the unassigned_bottlenecks list.
+
+        # Load the file names and relative paths for each loot tables
+        # sub-folder into their respective lists.  (Only doing blocks &
+        # entities for now, so we know which tables are in those categories
+        # for the table revision / clean-up step.)  Skip the loot tables in
+        # the exclusions list.  (Report each skipped file to print output.)
+        #
+        # Add bottlenecks files to table_names (allow bottleneck names to have
+        # bottleneck drops), but instead of adding them to unassigned, put
+        # them in the special unassigned_bottlenecks list for priority
+        # assignment.
+        #
+        # Add blockers files to the unassigned list but not the main
+        # table_names list: keep them in the separate table_names_blockers
+        # list until the bottlenecks drops have been assigned.  Then later
+        # we'll return them to the main table_names list for assignment with
+        # the rest.
+        #
+        # Add all other (non-special) tables to both table_names and
+        # unassigned.
+
+        # With the loot tables cache, the folder tree listing comes from the
+        # cache unless the tree has changed since the last run.  (Streaming
+        # skips the cache, which would hold every parsed table in memory.)
+
+        if self.cache_folder is not None and not self.streaming:
+            cache = LootTableCache(self.cache_folder, self.source, self.verify_hashes, self.codec)
+            walk = cache.walk_tree()
+        else:
+            cache = None
+            walk = self.source.walk()
+
+        self.walk = walk
+        self.table_set_hash = None
+
+        # Load every table through the cache (parsing only the new or changed
+        # files), then save the cache for the next run.
+
+        if cache is not None:
+            errors = []
+            for dirpath, filenames in walk:
+                for filename in filenames:
+                    lootfilepath = os.path.join(dirpath, filename)
+                    try:
+                        self.tables[lootfilepath], self.table_hashes[lootfilepath] = cache.load_table(lootfilepath)
+                    except Exception as ex:
+                        errors.append(f"  {lootfilepath}: {ex}\n")
+            if errors:
+                raise RLTError(f"An error occurred with loading the loot tables: {len(errors)} loot table(s) "
+                               "could not be loaded:\n\n" + "".join(errors))
+            try:
+                cache.save()
+            except OSError as ex:
+                self.log(f"Warning: The loot tables cache could not be saved: {ex}")
+            self.log(f"Loot tables cache: {cache.hits} hits, {cache.misses} misses")
+        self.cache = cache
+
+        self.index_tables()
+        self.sort_tables()
+
+    def index_tables(self):
+        """Numbers the scanned loot tables (in walk), making the registry of
+        their records (see TableRegistry): each table's path for the config
+        lists (with its namespace in front, outside of minecraft), its
+        namespace, and its category (see classify_modes).  With
+        classify='type', the tables are read (in scan_threads threads) for
+        their types.
+        """
+
+        roots = {root: namespace for namespace, root in self.source.namespaces}
+        legacy = self.classify == 'legacy'
+        records = []
+        categories = []
+        for dirpath, filenames in self.walk:
+            if dirpath in roots:
+                root = dirpath
+                namespace = roots[dirpath]
+                prefix = '' if namespace == 'minecraft' else namespace + ':'
+            reldir = dirpath[len(root) + 1:].replace(os.sep, '/')
+            category = folder_categories.get(reldir if legacy else reldir.split('/', 1)[0])
+            for filename in filenames:
+                relpath = reldir + '/' + filename if reldir else filename
+                records.append(TableRecord(len(records), os.path.join(dirpath, filename),
+                                           prefix + relpath, namespace, category))
+                categories.append(category)
+
+        if self.classify == 'type':
+            with ThreadPoolExecutor(self.scan_threads) as pool:
+                categories = pool.map(self.table_category, [record.path for record in records], categories)
+                for record, category in zip(records, categories):
+                    record.block = category == 'block'
+                    record.entity = category == 'entity'
+
+        # With the legacy classification, the blocks and entities tables are
+        # known by file name alone, so any table with the same file name as
+        # one of them counts as one too.
+
+        if legacy:
+            blocks = {record.name for record in records if record.block}
+            entities = {record.name for record in records if record.entity}
+            for record in records:
+                record.block = record.name in blocks
+                record.entity = record.name in entities
+        self.registry = TableRegistry(records)
+
+    def table_category(self, lootfilepath, category=None):
+        """Returns a loot table's category by its type: 'block', 'entity',
+        or None for any other type; or category, for a table without a type
+        (or that can't be read).
+
+        :param lootfilepath: The loot table file name (with path)
+        :param category: (Optional) The category by the table's folder
+        """
+
+        try:
+            loottable = self.load_table(lootfilepath)
+        except Exception:
+            return category
+        kind = loottable.get('type') if isinstance(loottable, dict) else None
+        if not isinstance(kind, str):
+            return category
+        return type_categories.get(kind if ':' in kind else 'minecraft:' + kind)
+
+    def sort_tables(self):
+        """Sorts the scanned loot tables (in index) to the table_names,
+        table_names_blockers, and unassigned lists, according to the config
+        lists.  (Called by scan; call it again after changing the config
+        lists, to sort the same tables again without another scan.)
+        """
+
+        # Start the lists over, so the tables can be sorted again (after the
+        # config lists are reloaded, for instance).
+
+        self.table_names = array.array('i')
+        self.unassigned = array.array('i')
+        self.unassigned_bottlenecks = array.array('i')
+        self.table_names_blockers = array.array('i')
+        flags = bytearray(len(self.registry))
+
+        # The blocks and entities tables, listed by file name alone with the
+        # legacy classification (see classify_revision).
+
+        legacy = self.classify == 'legacy'
+        key = operator.attrgetter('name' if legacy else 'path')
+        self.blocks_table_names = list(dict.fromkeys(key(record) for record in self.registry if record.block))
+        self.entity_table_names = list(dict.fromkeys(key(record) for record in self.registry if record.entity))
+
+        # The tables are matched against the compiled config lists (see
+        # ConfigIndex) by their paths under the loot tables folder.  The
+        # tables each list matches are collected too, to check that no table
+        # is on two lists, and that every entry on the lists matches a table.
+
+        exclusions = self.config_indexes['exclusions']
+        bottlenecks = self.config_indexes['bottlenecks']
+        blockers = self.config_indexes['blockers']
+        two_block_objects = self.config_indexes['two-block objects']
+        matched = {'exclusions': [], 'bottlenecks': [], 'blockers': []}
+        relpaths = []
+
+        for record in self.registry:
+            id = record.id
+            relpath = record.relpath
+            relpaths.append(relpath)
+            if two_block_objects.match(relpath):
+                flags[id] |= two_block_flag
+            excluded = exclusions.match(relpath)
+            bottleneck = bottlenecks.match(relpath)
+            blocker = blockers.match(relpath)
+            flags[id] |= ((excluded_flag if excluded else 0) | (bottleneck_flag if bottleneck else 0)
+                          | (blocker_flag if blocker else 0))
+            if excluded + bottleneck + blocker > 1:
+                for listname, on_list in (('exclusions', excluded), ('bottlenecks', bottleneck),
+                                          ('blockers', blocker)):
+                    if on_list:
+                        matched[listname].append(relpath)
+            if excluded:
+                self.log(f"  Skipping excluded loot table: {record.name}")
+            elif bottleneck:
+                self.table_names.append(id)
+                self.unassigned_bottlenecks.append(id)
+            elif blocker:
+                self.table_names_blockers.append(id)
+                self.unassigned.append(id)
+            else:
+                self.table_names.append(id)
+                self.unassigned.append(id)
+        self.table_flags = flags
+
+        checkcollisions(matched['exclusions'], matched['bottlenecks'], 'exclusions', 'bottlenecks')
+        checkcollisions(matched['exclusions'], matched['blockers'], 'exclusions', 'blockers')
+        checkcollisions(matched['bottlenecks'], matched['blockers'], 'bottlenecks', 'blockers')
+
+        # Report the config list entries that match no loot table (most
+        # likely misspelled, or from another Minecraft version).
+
+        self.unknown_config_entries = {}
+        for listname, index in self.config_indexes.items():
+            unknown = index.unknown(relpaths)
+            if unknown:
+                self.unknown_config_entries[listname] = unknown
+                self.log(f"Warning: The {listname} list has entries that match no loot table: "
+                         + ", ".join(unknown))
+
+    def ensure_process_pool(self):
+        """Starts the worker processes (with workers), if they haven't been
+        started already.
+        """
+
+        if self.workers > 1 and self.process_pool is None:
+            self.process_pool = ProcessPoolExecutor(self.workers, initializer=init_worker,
+                                                    initargs=(self.loot_tables_folder,))
+
+    def configured(self, exclusions=None, bottlenecks=None, blockers=None,
+                   two_block_objects=None):
+        """Returns a new Generator with some of the config lists replaced,
+        sharing everything else with this one: the scanned folder tree, the
+        parsed loot tables, the entries made so far, and the worker
+        processes.  (Nothing is read from disk, so this is quick.)
+
+        :param exclusions: (Optional) The exclusions list to use instead
+        :param bottlenecks: (Optional) The bottlenecks list to use instead
+        :param blockers: (Optional) The blockers list to use instead
+        :param two_block_objects: (Optional) The two-block objects list to use
+            instead
+        """
+
+        # Start the worker processes here first, so the new Generator shares
+        # them instead of starting (and never stopping) its own.
+
+        self.ensure_process_pool()
+        generator = copy.copy(self)
+        generator.configured_from = self
+        generator.config_indexes = dict(self.config_indexes)
+        generator.config_hashes = dict(self.config_hashes)
+        generator.build_record = None
+        for listname, attribute, configpath, entries in (
+                ('exclusions', 'exclusions', exclusionsconfig, exclusions),
+                ('bottlenecks', 'bottlenecks', bottlenecksconfig, bottlenecks),
+                ('blockers', 'blockers', blockersconfig, blockers),
+                ('two-block objects', 'two_block_objects', two_block_objectsconfig, two_block_objects)):
+            if entries is not None:
+                setattr(generator, attribute, list(entries))
+                generator.config_indexes[listname] = ConfigIndex(entries)
+                generator.config_hashes[os.path.basename(configpath)] = hashlib.sha1(
+                        '\n'.join(entries).encode('utf-8')).hexdigest()
+        checkcollisions(generator.exclusions, generator.bottlenecks, 'exclusions', 'bottlenecks')
+        checkcollisions(generator.exclusions, generator.blockers, 'exclusions', 'blockers')
+        checkcollisions(generator.bottlenecks, generator.blockers, 'bottlenecks', 'blockers')
+        generator.sort_tables()
+        return generator
+
+    def match_tables(self, entries):
+        """Returns the loot tables (file names with paths) matching any of a
+        list of entries, written as on the config lists: names, paths, or
+        wildcard patterns (see ConfigIndex).
+
+        :param entries: The entries to match
+        """
+
+        index = ConfigIndex(entries)
+        return [record.path for record in self.registry if index.match(record.relpath)]
+
+    def assign(self, rng):
+        """Randomly assigns the loot tables to each other, returning the
+        assignments dict of (dropper) table name: (loot) table name pairs.
+        The Generator's own lists are not consumed, so they remain ready for
+        the next seed.
+
+        :param rng: The seeded random.Random instance to draw from
+        """
+
+        return self.assignment_paths(*self.assign_ids(rng))
+
+    def assign_ids(self, rng):
+        """Randomly assigns the loot tables to each other, as assign does,
+        returning the assignments by table number (see TableRegistry): an
+        array of the droppers, in the order they were assigned, and an array
+        giving the loot table of each table (the number of the table whose
+        loot it drops, or -1 for a table left out).
+
+        :param rng: The seeded random.Random instance to draw from
+        """
+
+        assignments = assign_tables(rng, self.table_names, self.unassigned,
+                                    self.unassigned_bottlenecks, self.table_names_blockers,
+                                    self.assignment_mode, self.log)
+        loot_of = array.array('i', [-1]) * len(self.registry)
+        for dropper, loot in assignments.items():
+            loot_of[dropper] = loot
+        return array.array('i', assignments), loot_of
+
+    def assignment_paths(self, droppers, loot_of):
+        """Returns the assignments dict of (dropper) table name: (loot) table
+        name pairs for assignments by table number (see assign_ids).
+        """
+
+        records = self.registry.records
+        return {records[dropper].path: records[loot_of[dropper]].path for dropper in droppers}
+
+    def load_table(self, lootfilepath):
+        """Returns the parsed contents of a loot table, loading the file the
+        first time the table is needed (or every time, when streaming).
+
+        :param lootfilepath: The loot table file name (with path)
+        """
+
+        loottable = self.tables.get(lootfilepath)
+        if loottable is None:
+            contents = self.source.read(lootfilepath)
+            loottable = self.codec.loads(contents)
+            if not self.streaming:
+                self.tables[lootfilepath] = loottable
+                self.table_hashes[lootfilepath] = hashlib.sha1(contents).hexdigest()
+        return loottable
+
+    def table_hash(self, lootfilepath):
+        """Returns the SHA-1 hash of a loot table file (reading the file if the
+        table hasn't been loaded yet).
+
+        :param lootfilepath: The loot table file name (with path)
+        """
+
+        if lootfilepath not in self.table_hashes:
+            self.table_hashes[lootfilepath] = hashlib.sha1(self.source.read(lootfilepath)).hexdigest()
+        return self.table_hashes[lootfilepath]
+
+    def pack_key(self, seed):
+        """Returns the datapack output cache key for the datapack for a seed
+        (see PackCache): a hash of everything the datapack's contents depend
+        on.  That includes the seed, the RLT and Minecraft versions, the
+        config lists, the names and contents of all the loot tables, and the
+        output profile and assignment mode.
+
+        :param seed: The seed (a number or text string)
+        """
+
+        if self.table_set_hash is None:
+            tables = []
+            for record in self.registry:
+                tables.append((record.relpath, self.table_hash(record.path)))
+            self.table_set_hash = hashlib.sha1(json.dumps(sorted(tables)).encode('utf-8')).hexdigest()
+        key = [RLT_version, Minecraft_version, datapack_format, seed,
+               sorted(self.config_hashes.items()), self.table_set_hash,
+               self.output_profile, self.assignment_mode, self.classify]
+        return hashlib.sha256(json.dumps(key).encode('utf-8')).hexdigest()
+
+    def cacheable(self, seed):
+        """Returns whether the datapack for a seed can come from (and go to)
+        the datapack output cache: it needs the cache, a seed (a random seed
+        gives a different datapack every time), a .zip file, and no profiler
+        report in the datapack.
+        """
+
+        return (self.pack_cache is not None and len(seed) > 0 and self.output_format == 'zip'
+                and not (self.profiler is not None and getattr(self.profiler, 'in_pack', False)))
+
+    def revise_tables(self, assignments, previous=None):
+        """Yields the dropper - table contents assignments with the loot
+        tables cleaned up, one table at a time, so that each table can be
+        written to the datapack as soon as it is ready.  The code takes each
+        dropper (by table number) and assigns it the file contents from the
+        file of its loot table.  The contents are yielded as compressed zip
+        entries (see compress_entry).
+
+        For an incremental rebuild, previous is the earlier build's record and
+        datapack: any entry whose dropper was assigned the same (unchanged)
+        loot table, needing the same revision, is copied from the earlier
+        datapack as it is.
+
+        With compress_threads, the entries are compressed in a thread pool
+        (zlib releases the GIL while it compresses) while the next tables are
+        revised, but they are still yielded in the order of the assignments,
+        so the datapack comes out the same with any number of threads.
+
+        :param assignments: The (droppers, loot_of) assignments returned by
+            assign_ids()
+        :param previous: (Optional) The (build record, PackReader) of the
+            earlier datapack, for an incremental rebuild
+        """
+
+        # Load the default loot tables (the actual JSON content of each
+        # table) from the default files.  Call the function
+        # 'revise_contents' to conditionally alter the loot tables,
+        # correcting problems such as removing checks for certain
+        # impossible drop conditions.
+
+        # For each key in the assignments dict, load the file contents as
+        # JSON, revise those contents as needed, and then convert back to JSON
+        # and pass it along (the newly revised version of the assignments
+        # dict, one entry at a time).  Entries made for earlier datapacks are
+        # reused as they are.
+
+        self.log("Updating the tables to correct broken drop conditions")
+
+        # With worker processes, the tables are handed to the workers in
+        # batches; with compression threads, only the compression is handed
+        # to the threads.  Either way, the entries not yet yielded are kept
+        # in order in pending, as (dropper, entry cache key, entry), where
+        # the entry is a function returning the finished entry if it is still
+        # being made.  Only a limited number of entries (in_flight) are kept
+        # in flight, so the finished entries never pile up in memory.
+
+        batches = threads = None
+        if self.workers > 1:
+            self.ensure_process_pool()
+            batches = (self.process_pool, self.output_profile, self.output_format, self.codec.name)
+            in_flight = 2 * self.workers * table_batch_size
+        elif self.compress_threads > 1:
+            threads = ThreadPoolExecutor(self.compress_threads)
+            in_flight = 4 * self.compress_threads
+        else:
+            in_flight = 1
+        if self.in_flight is not None:
+            in_flight = self.in_flight
+        pending = collections.deque()
+        in_progress = {}
+        errors = []
+
+        def finish():
+            dropper, key, entry = pending.popleft()
+            if key is not None:
+                try:
+                    with self.phase('workers' if batches else 'compress', table=key[0]):
+                        entry = entry()
+                except Exception as ex:
+                    errors.append((self.registry[dropper].path, key[0], ex))
+                    return None
+                in_progress.pop(key, None)
+                if self.cache_entries:
+                    self.entries[key] = entry
+            return dropper, entry
+
+        try:
+            for dropper, key, entry in self.make_entries(assignments, previous, batches, threads,
+                                                         in_progress, errors):
+                pending.append((dropper, key, entry))
+                while len(pending) >= in_flight:
+                    finished = finish()
+                    if finished is not None:
+                        yield finished
+            while pending:
+                finished = finish()
+                if finished is not None:
+                    yield finished
+        finally:
+            if threads is not None:
+                threads.shutdown(cancel_futures=True)
+
+        # Report every table that could not be made (rather than only the
+        # first one).
+
+        if errors:
+            raise RLTError(f"An error occurred with creating new_tables list: {len(errors)} loot table(s) "
+                           "could not be revised:\n\n"
+                           + "".join(f"  {lootfilepath} (for {filename}): {ex}\n"
+                                     for filename, lootfilepath, ex in errors))
+
+    def make_entries(self, assignments, previous, batches, threads, in_progress, errors):
+        """Yields the (dropper, entry cache key, entry) for each dropper in
+        the assignments, for revise_tables.  The key is None for entries that
+        are ready; otherwise the entry is a function that waits for the entry
+        to be finished (by a worker process, with batches, or a compression
+        thread, with threads) and returns it.  Tables that can't be made are
+        added to errors and skipped.
+        """
+
+        profile = entry_profile(self.output_profile, self.output_format)
+        records = self.registry.records
+        flags = self.table_flags
+        batch = None
+        droppers, loot_of = assignments
+        for dropper in droppers:
+            record = records[dropper]
+            loot = records[loot_of[dropper]]
+            filename = record.path
+            lootfilepath = loot.path
+            revision = revision_class(record.name, loot.name, record.entity, loot.entity,
+                                      flags[loot.id] & two_block_flag)
+
+            # Record what went into the entry, for the next incremental
+            # rebuild, and copy the entry from the earlier datapack if
+            # nothing has changed.
+
+            entry = None
+            if self.build_record is not None:
+                made_from = (lootfilepath, revision, self.table_hash(lootfilepath))
+                self.build_record['entries'][filename] = made_from
+                arcname = record.arcname
+                if (previous is not None and previous[0]['entries'].get(filename) == made_from
+                        and arcname in previous[1]):
+                    with self.phase('reuse', table=arcname):
+                        entry = previous[1].read_entry(arcname)
+                    self.build_record['reused'] += 1
+
+            # With passthrough, a table needing no revision is copied as it
+            # is, without parsing it.  (The entry is the same whatever the
+            # revision class.)  For a datapack folder, the entry is the loot
+            # table file itself, if there is one, to be linked in place.
+
+            if entry is None and profile['passthrough'] and revisers[revision] is None:
+                key = (lootfilepath, None, self.output_profile)
+                entry = self.entries.get(key)
+                if entry is None and self.output_format == 'folder':
+                    entry = self.source.file_path(lootfilepath)
+                if entry is None:
+                    try:
+                        with self.phase('passthrough', table=lootfilepath):
+                            entry = self.source.read_entry(lootfilepath, profile['compress_type'],
+                                                           profile['compresslevel'])
+                    except Exception as ex:
+                        errors.append((filename, lootfilepath, ex))
+                        continue
+                    if self.cache_entries:
+                        self.entries[key] = entry
+                yield dropper, None, entry
+                continue
+
+            key = (lootfilepath, revision, self.output_profile)
+            if entry is None:
+                entry = self.entries.get(key)
+            if entry is None and key in in_progress:
+                yield dropper, key, in_progress[key]
+                continue
+            if entry is None and batches is not None:
+                if batch is None or batch.future is not None:
+                    batch = TableBatch(*batches)
+                in_progress[key] = batch.add(lootfilepath, revision)
+                yield dropper, key, in_progress[key]
+                continue
+            if entry is None:
+                try:
+                    with self.phase('load', table=lootfilepath):
+                        loottable = self.load_table(lootfilepath)
+                    with self.phase('revise', table=lootfilepath):
+                        loottable = revise_table(revision, loottable)
+                    with self.phase('serialize', table=lootfilepath):
+                        contents = self.codec.dumps(loottable, indent=profile['indent'],
+                                                    separators=profile['separators'])
+                except Exception as ex:
+                    errors.append((filename, lootfilepath, ex))
+                    continue
+                if threads is not None:
+                    in_progress[key] = threads.submit(compress_entry, contents, profile['compress_type'],
+                                                      profile['compresslevel']).result
+                    yield dropper, key, in_progress[key]
+                    continue
+                with self.phase('compress', table=lootfilepath):
+                    entry = compress_entry(contents, profile['compress_type'],
+                                           profile['compresslevel'])
+                if self.cache_entries:
+                    self.entries[key] = entry
+            yield dropper, None, entry
+        if batch is not None:
+            batch.submit()
+
+    def write_datapack(self, file, seed='', previous=None, record=False):
+        """Generates a datapack for the seed, writing the datapack .zip file
+        contents to file.  The entries are written as they are produced, so
+        the datapack is never held in memory as a whole.
+
+        :param file: A binary file object, open for writing, or a FolderWriter
+            (to write the datapack as a folder tree instead)
+        :param seed: (Optional) The seed (a number or text string); if empty,
+            a random, system-generated seed is used
+        :param previous: (Optional) The (build record, PackReader) of an
+            earlier datapack for the same seed, whose unchanged entries are
+            copied instead of being made again (see generate)
+        :param record: (Optional) Set to True to keep the record of the build
+            (in build_record) for a later incremental rebuild
+        """
+
+        # The PRNG for this datapack: seeded with the input seed, or (for
+        # an empty seed) with a system-determined random seed, which is
+        # different for each datapack.
+
+        rng = random.Random(seed) if len(seed) > 0 else random.Random()
+        datapack_name, datapack_description, datapack_filename = datapack_names(seed)
+
+        with self.phase('assign', 0):
+            assignments = self.assign_ids(rng)
+        droppers, loot_of = assignments
+        records = self.registry.records
+        self.count('assign', len(droppers))
+
+        # The record of this build, kept for incremental rebuilds: what each
+        # datapack entry was made from (filled in by revise_tables), along
+        # with the inputs that affect every entry.  (The assignments are kept
+        # by table name, as the table numbers change if tables are added or
+        # removed.)
+
+        self.build_record = None
+        if record or previous is not None:
+            self.build_record = {'RLT_version': RLT_version, 'seed': seed,
+                                 'config_hashes': self.config_hashes,
+                                 'output_profile': self.output_profile,
+                                 'assignments': self.assignment_paths(droppers, loot_of),
+                                 'entries': {}, 'reused': 0}
+        if previous is not None and (previous[0]['RLT_version'] != RLT_version
+                                     or previous[0]['seed'] != seed
+                                     or previous[0].get('output_profile') != self.output_profile):
+            previous = None
+        same_assignments = (previous is not None
+                            and previous[0]['assignments'] == self.build_record['assignments'])
+
+        ########################################################################
+        # RLT post-game forensics info prep
+
+        # Create new dictionary of assignments by file names only (strip out
+        # the path elements) using a dictionary comprehension.  This will be
+        # used to create a text file with a listing of all assignments sorted
+        # by file name for game post-mortem analysis.
+
+        basename_assignments = {records[dropper].name: records[loot_of[dropper]].name for dropper in droppers}
+
+        ########################################################################
+        # Build the datapack .zip file.
+
+        self.log("Building datapack zip file\n")
+
+        # Build the zip file contents.
+
+        # Assign zf as a PackWriter object, which will handle operations for
+        # writing zipfile contents to file, one entry at a time (or the
+        # FolderWriter given instead of a file).
+
+        profile = output_profiles[self.output_profile]
+        if not isinstance(file, FolderWriter):
+            file = PackWriter(file, profile['compress_type'], profile['compresslevel'])
+        with file as zf:
+
+            # The forensics files depend only on the assignments, so for an
+            # incremental rebuild with unchanged assignments they are copied
+            # from the earlier datapack.
+
+            def write_info(name, text):
+                with self.phase('forensics'):
+                    if same_assignments and name in previous[1]:
+                        zf.write_entry(name, previous[1].read_entry(name))
+                    else:
+                        zf.writestr(name, text)
+
+            # Write the loot tables assignments to two text files (sorted by
+            # loot tables tree; sorted by table file name) for post-game
+            # analysis and troubleshooting (add both to zf).
+
+            # Create fc as a text stream to contain the following text (in the
+            # "with" block), which is stored in a variable and then written to
+            # the text file.
+
+            with io.StringIO() as fc:
+
+                # Write this content at the start of fc (= top of the text
+                # file).
+
+                fc.write(f"RLT datapack: {datapack_name}\n")
+                fc.write(f"Datapack file name: {datapack_filename}\n\n")
+                fc.write("Loot table assignments sorted by loot table tree path:\n\n")
+
+                # For each dropper in assignments, sorted by path + filename,
+                # add its path + filename and its loot table's filename only
+                # to fc. (The file=fc element makes it print to the file.)
+
+                for key, value in sorted((records[dropper].path, records[loot_of[dropper]].name)
+                                         for dropper in droppers): print(
+                        f"{key} --> {value}", file=fc)
+
+                # Assign the value of fc to a variable, so we can write the
+                # file from there.
+
+                assignments_by_tree = fc.getvalue()
+
+            # Write the text file into the .zip file.
+
+            write_info("RLT_info/Loot table assignments by tree.txt", assignments_by_tree)
+
+            # Create fc as a text stream to contain the following text (in the
+            # "with" block), which is stored in a variable and then written to
+            # the text file.
+
+            with io.StringIO() as fc:
+
+                # Write this content at the start of fc (= top of the text
+                # file).
+
+                fc.write(f"RLT datapack: {datapack_name}\n")
+                fc.write(f"Datapack file name: {datapack_filename}\n\n")
+                fc.write("Loot table assignments by file:\n\n")
+
+                # For each dictionary entry in basename_assignments, sorted by
+                # key (filename): add each key (filename only) and its value
+                # (filename only) to fc. (The file=fc element makes it print
+                # to the file.)
+
+                for key, value in sorted(basename_assignments.items()): print(
+                        f"{key} --> {value}", file=fc)
+
+                # Assign the value of fc to a variable, so we can write the
+                # file from there.
+
+                assignments_by_file = fc.getvalue()
+
+            # Write the text file, adding it to the .zip file object.
+
+            write_info('RLT_info/Loot table assignments by file.txt', assignments_by_file)
+
+            # Record the output profile the datapack was made with.
+
+            with self.phase('forensics'):
+                zf.writestr('RLT_info/Output profile.txt',
+                            f"RLT datapack: {datapack_name}\n"
+                            f"Output profile: {self.output_profile} ({profile['description']})\n")
+
+            # For each dropper in the revised tables, add to the zip file a
+            # file with its entry name but with its loot table file's
+            # contents.
+
+            for dropper, entry in self.revise_tables(assignments, previous):
+                with self.phase('zip'):
+                    zf.write_entry(records[dropper].arcname, entry)
+
+            # Write the rest of the Minecraft-required datapack files.
+
+            with self.phase('zip', 3):
+                zf.writestr('pack.mcmeta', self.codec.dumps({'pack':{'pack_format':datapack_format, 'description':datapack_description}}, indent=4))
+                zf.writestr('data/minecraft/tags/functions/load.json', self.codec.dumps({'values':['{}:reset'.format(datapack_name.lower())]}))
+                zf.writestr('data/{}/functions/reset.mcfunction'.format(datapack_name.lower()), 'tellraw @a ["",{"text":"Memetics\' RLT: Random Loot Tables","color":"green"}]')
+
+            # With a profiler, add its report so far (everything but finishing
+            # the .zip file) to the RLT_info folder, if it asks for that.
+
+            if self.profiler is not None and getattr(self.profiler, 'in_pack', False):
+                zf.writestr('RLT_info/Profile.json', self.codec.dumps(self.profiler.report(), indent=2))
+
+        # Add the assignments (the same ones listed in the RLT_info files) to
+        # the forensics database, if there is one.
+
+        if self.forensics is not None:
+            with self.phase('forensics'):
+                self.record_forensics(seed, assignments)
+
+    def record_forensics(self, seed, assignments):
+        """Adds a datapack's assignments to the forensics database (see
+        ForensicsStore).
+
+        :param seed: The seed ('' for a random seed)
+        :param assignments: The (droppers, loot_of) assignments returned by
+            assign_ids()
+        """
+
+        droppers, loot_of = assignments
+        records = self.registry.records
+        self.forensics.record(seed, self.config_hash(), datapack_names(seed)[2],
+                              [(records[dropper].relpath, records[loot_of[dropper]].relpath)
+                               for dropper in sorted(droppers, key=lambda dropper: records[dropper].path)])
+
+    def config_hash(self):
+        """Returns a hash of the config lists (all four together)."""
+
+        return hashlib.sha1(json.dumps(sorted(self.config_hashes.items())).encode('utf-8')).hexdigest()
+
+    def write_cached_datapack(self, file, seed=''):
+        """Writes the datapack for the seed to file, like write_datapack, but
+        if a datapack was made before from the same inputs (see pack_key), it
+        is copied from the datapack output cache instead of being made again;
+        otherwise the new datapack is added to the cache.  Returns True if the
+        datapack came from the cache.
+
+        :param file: A binary file object, open for writing and reading
+        :param seed: (Optional) The seed (a number or text string); if empty,
+            a random, system-generated seed is used (and the cache is skipped)
+        """
+
+        if not self.cacheable(seed):
+            self.write_datapack(file, seed)
+            return False
+
+        key = self.pack_key(seed)
+        cached = self.pack_cache.get(key)
+        if cached is not None:
+            self.log("Copying the datapack from the output cache (made before from the same inputs)\n")
+            with open(cached, 'rb') as cachedfile:
+                shutil.copyfileobj(cachedfile, file, 1 << 20)
+
+            # The assignments are still recorded in the forensics database,
+            # if they aren't there already (from when the datapack was made).
+
+            if self.forensics is not None and not self.forensics.has(seed, self.config_hash()):
+                with self.phase('forensics'):
+                    self.record_forensics(seed, self.assign_ids(random.Random(seed)))
+            return True
+
+        self.write_datapack(file, seed)
+        try:
+            self.pack_cache.put(key, file)
+        except OSError as ex:
+            self.log(f"Warning: The datapack could not be added to the output cache: {ex}")
+        return False
+
+    def build(self, seed=''):
+        """Generates a datapack for the seed in memory and returns the
+        datapack .zip file contents (as bytes).
+
+        :param seed: (Optional) The seed (a number or text string); if empty,
+            a random, system-generated seed is used
+        """
+
+        if self.output_format != 'zip':
+            raise RLTError("A datapack can only be built in memory as a .zip file (the 'zip' output format).")
+        with io.BytesIO() as zipdata:
+            with self.phase('datapack'):
+                self.write_datapack(zipdata, seed)
+            return zipdata.getvalue()
+
+    def generate(self, seed='', as_bytes=False, incremental=False):
+        """Generates a datapack for the seed.  Writes the datapack .zip file
+        (or, with the 'folder' output format, the unpacked datapack folder)
+        to the datapack folder and returns its path, or with as_bytes, returns
+        the .zip file contents instead of writing the file.
+
+        The .zip file is streamed to a temporary file in the datapack folder
+        as it is built, and only renamed to the datapack file name once it is
+        complete, so a failed run never leaves a half-written datapack behind
+        (or damages an existing datapack for the same seed).  A datapack
+        folder is likewise written to a temporary folder beside it and then
+        swapped into place (see replace_folder).
+
+        :param seed: (Optional) The seed (a number or text string); if empty,
+            a random, system-generated seed is used
+        :param as_bytes: (Optional) Set to True to return the .zip file
+            contents (as bytes) instead of writing the file
+        :param incremental: (Optional) Set to True to rebuild the datapack
+            incrementally: only the entries whose inputs (config lists, loot
+            tables, or assignments) changed since the last incremental build
+            of the same datapack are made again, and the rest are copied from
+            the existing datapack.  (Needs a seed and the RLT cache folder.)
+        """
+
+        if as_bytes:
+            return self.build(seed)
+        if incremental and len(seed) == 0:
+            raise RLTError("An incremental rebuild needs a seed; a random seed gives a different datapack every time.")
+        if incremental and self.cache_folder is None:
+            raise RLTError("An incremental rebuild needs the RLT cache folder, where the build records are kept.")
+        if incremental and self.output_format != 'zip':
+            raise RLTError("An incremental rebuild needs the 'zip' output format; it copies entries from the earlier .zip file.")
+        if self.output_format == 'folder':
+            return self.generate_folder(seed)
+
+        # Check for the RLT datapacks folder; if it does not exist, create it.
+
+        self.log(f"Writing datapack file to folder: {self.datapack_folder}\n")
+        datapack_path = os.path.join(self.datapack_folder, datapack_names(seed)[2])
+        try:
+            if not os.path.isdir(self.datapack_folder):
+                os.mkdir(self.datapack_folder)
+        except Exception as ex:
+            raise RLTError(f"An error occurred.  Error message: {ex}\n") from ex
+
+        # Now write the actual .zip file to a temporary file (named uniquely,
+        # in case another run is writing the same datapack), and then move it
+        # into place.  If anything goes wrong, remove the temporary file.
+
+        temppath = os.path.join(self.datapack_folder, '.{}.{}.tmp'.format(
+                datapack_names(seed)[2], os.urandom(4).hex()))
+        # (Incremental rebuilds keep their own build records, so they leave the
+        # datapack output cache alone.)
+
+        previous = self.load_build_record(datapack_path) if incremental else None
+        try:
+            with open(temppath, 'x+b') as file, self.phase('datapack'):
+                if incremental:
+                    self.write_datapack(file, seed, previous, record=True)
+                else:
+                    self.write_cached_datapack(file, seed)
+            if previous is not None:
+                previous[1].close()
+            os.replace(temppath, datapack_path)
+        except BaseException as ex:
+            if previous is not None:
+                previous[1].close()
+            try:
+                os.remove(temppath)
+            except OSError:
+                pass
+            if isinstance(ex, RLTError) or not isinstance(ex, Exception):
+                raise
+            raise RLTError(f"An error occurred.  Error message: {ex}\n") from ex
+
+        if incremental:
+            rebuilt = len(self.build_record['entries']) - self.build_record['reused']
+            self.log(f"Incremental rebuild: {self.build_record['reused']} tables reused, {rebuilt} rebuilt")
+            self.save_build_record(datapack_path)
+        return datapack_path
+
+    def generate_folder(self, seed=''):
+        """Generates a datapack for the seed as an unpacked folder tree (see
+        FolderWriter), in the datapack folder, and returns its path.  (Called
+        by generate with the 'folder' output format.)
+
+        :param seed: (Optional) The seed (a number or text string); if empty,
+            a random, system-generated seed is used
+        """
+
+        self.log(f"Writing datapack folder to folder: {self.datapack_folder}\n")
+        datapack_path = os.path.join(self.datapack_folder, os.path.splitext(datapack_names(seed)[2])[0])
+        try:
+            os.makedirs(self.datapack_folder, exist_ok=True)
+        except Exception as ex:
+            raise RLTError(f"An error occurred.  Error message: {ex}\n") from ex
+
+        # Write the datapack into a temporary folder beside the datapack
+        # folder (on the same file system, so it can be renamed into place),
+        # and remove it if anything goes wrong.
+
+        temppath = os.path.join(self.datapack_folder, '.{}.{}.tmp'.format(
+                os.path.basename(datapack_path), os.urandom(4).hex()))
+        try:
+            with self.phase('datapack'):
+                self.write_datapack(FolderWriter(temppath), seed)
+            replace_folder(temppath, datapack_path)
+        except BaseException as ex:
+            shutil.rmtree(temppath, ignore_errors=True)
+            if isinstance(ex, RLTError) or not isinstance(ex, Exception):
+                raise
+            raise RLTError(f"An error occurred.  Error message: {ex}\n") from ex
+        return datapack_path
+
+    def build_record_path(self, datapack_path):
+        """Returns where the build record for a datapack is kept (in the
+        builds folder of the RLT cache folder).
+
+        :param datapack_path: The datapack .zip file path
+        """
+
+        return os.path.join(self.cache_folder, 'builds', os.path.basename(datapack_path) + '.pickle')
+
+    def load_build_record(self, datapack_path):
+        """Returns the (build record, PackReader) of the existing datapack, or
+        None if there is no usable record: no datapack, no record, or a
+        datapack that has changed since the record was saved.
+
+        :param datapack_path: The datapack .zip file path
+        """
+
+        try:
+            with open(self.build_record_path(datapack_path), 'rb') as file:
+                record = pickle.load(file)
+            stat = os.stat(datapack_path)
+            if record.get('datapack') != (stat.st_mtime_ns, stat.st_size):
+                return None
+            return record, PackReader(datapack_path)
+        except Exception:
+            return None
+
+    def save_build_record(self, datapack_path):
+        """Saves the last build's record for the datapack, along with the
+        datapack's modification time and size (so a datapack replaced by
+        something else isn't mistaken for this one).
+
+        :param datapack_path: The datapack .zip file path
+        """
+
+        stat = os.stat(datapack_path)
+        record = dict(self.build_record, datapack=(stat.st_mtime_ns, stat.st_size))
+        recordpath = self.build_record_path(datapack_path)
+        try:
+            os.makedirs(os.path.dirname(recordpath), exist_ok=True)
+            with open(recordpath + '.tmp', 'wb') as file:
+                pickle.dump(record, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(recordpath + '.tmp', recordpath)
+        except OSError as ex:
+            self.log(f"Warning: The build record could not be saved: {ex}")
+
+
+################################################################################
+# Watch mode
+#
+# While the config lists (or the loot tables) are being tweaked, watch() keeps
+# the datapack for a seed up to date: it checks the config files and the loot
+# tables for changes every few moments, and after each change it reloads them
+# and rebuilds the datapack incrementally (so only the affected entries are
+# made again).  Changed loot tables are re-parsed through the loot tables
+# cache, so the reload costs little more than reading the changed files.
+
+
+def watch_stamp(loot_tables_folder, config_folder=None):
+    """Returns a snapshot of the modification times and sizes of the config
+        files and the loot tables, for telling when any of them has changed.
+
+    :param loot_tables_folder: The loot tables folder (or .jar or .zip file)
+    :param config_folder: (Optional) The folder holding the config files
+    """
+
+    def stat(path):
+        try:
+            result = os.stat(path)
+            return path, result.st_mtime_ns, result.st_size
+        except OSError:
+            return path, None, None
+
+    stamp = [stat(config_location(configpath, config_folder))
+             for configpath in (exclusionsconfig, bottlenecksconfig,
+                                blockersconfig, two_block_objectsconfig)]
+    if os.path.isdir(loot_tables_folder):
+        for dirpath, dirnames, filenames in os.walk(loot_tables_folder):
+            stamp.extend(stat(os.path.join(dirpath, filename)) for filename in filenames)
+    else:
+        stamp.append(stat(loot_tables_folder))
+    return stamp
+
+
+def watch(seed, loot_tables_folder=loot_tables_folder, interval=1.0, **options):
+    """Rebuilds the datapack for a seed whenever the config files or the loot
+        tables change, until interrupted (with Ctrl+C).
+
+    :param seed: The seed (a number or text string)
+    :param loot_tables_folder: (Optional) The loot tables folder (or .jar or
+        .zip file)
+    :param interval: (Optional) How often to check for changes, in seconds
+    :param options: (Optional) Other Generator options (such as config_folder)
+    """
+
+    print(f"Watching the config files and {loot_tables_folder} for changes (press Ctrl+C to stop).\n")
+    stamp = None
+    try:
+        while True:
+            current = watch_stamp(loot_tables_folder, options.get('config_folder'))
+            if current != stamp:
+                stamp = current
+                started = time.perf_counter()
+                try:
+                    generator = Generator(loot_tables_folder, **options)
+                    try:
+                        datapack_path = generator.generate(seed, incremental=True)
+                    finally:
+                        generator.close()
+                    print(f"Datapack '{os.path.basename(datapack_path)}' rebuilt in {time.perf_counter() - started:.2f} seconds.\n")
+                except RLTError as ex:
+                    print(ex)
+                    print("Waiting for the next change...\n")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+
+################################################################################
+# Seed search
+#
+# search() looks for seeds whose assignments meet some drop-chain requirements,
+# such as "blaze rods are dropped by something in the overworld, at most 3
+# steps along the drop chain."  Only the assignments are made for each seed:
+# the loot tables themselves are never read, revised, or written, so a great
+# many seeds can be tried, in worker processes with --workers.
+#
+# The assignments form drop chains: the loot of a table is dropped by its
+# dropper (the table assigned that loot), whose own loot is dropped by its
+# dropper in turn, and so on.  As every table is assigned exactly one other
+# table's loot, each chain eventually loops back on itself, so the tables fall
+# into drop cycles.  A ChainQuery checks the chains of a seed's assignments.
+
+# The number of seeds handed to a search worker at a time.
+search_batch_size = 1000
+
+# The (table lists, assignment mode, ChainQuery) of the search, in a worker
+# process.
+search_state = None
+
+
+def drop_cycles(assignments):
+    """Returns the lengths of the drop cycles in the assignments (see the Seed
+        search notes above), in no particular order.
+
+    :param assignments: The (dropper) table: (loot) table dict, by table
+        name or by table number (see TableRegistry)
+    """
+
+    seen = set()
+    lengths = []
+    for start in assignments:
+        if start in seen:
+            continue
+        path = {}
+        table = start
+        while table is not None and table not in seen:
+            seen.add(table)
+            path[table] = len(path)
+            table = assignments.get(table)
+        if table in path:
+            lengths.append(len(path) - path[table])
+    return lengths
+
+
+class ChainQuery:
+    """The drop-chain requirements a seed's assignments must meet in a seed
+        search (see search).
+
+    :param reach: (Optional) (target tables, source tables, depth) triples:
+        the loot of each target table must be dropped by one of the source
+        tables, at most depth steps along its drop chain (a depth of 1 means
+        by the target's dropper itself)
+    :param avoid: (Optional) (target tables, tables) pairs: the loot of each
+        target table must not be dropped by any of the tables
+    :param min_cycle: (Optional) The fewest tables a drop cycle may have; by
+        default, 1 (any cycles, even a table dropping its own loot, are fine)
+    """
+
+    def __init__(self, reach=(), avoid=(), min_cycle=1):
+        self.reach = [(tuple(targets), frozenset(sources), depth)
+                      for targets, sources, depth in reach]
+        self.avoid = [(tuple(targets), frozenset(tables)) for targets, tables in avoid]
+        self.min_cycle = min_cycle
+
+    def check(self, assignments):
+        """Returns a summary of the drop chains if the assignments meet every
+        requirement, or else None.  The summary is a dict of the chain from
+        each reach target back to its source (as lists of table names), and
+        the number of drop cycles and the length of the shortest one.
+
+        :param assignments: The (dropper) table: (loot) table dict, by table
+            name or by table number (as for the tables of the query)
+        """
+
+        droppers = {loot: dropper for dropper, loot in assignments.items()}
+        for targets, tables in self.avoid:
+            for target in targets:
+                if droppers.get(target) in tables:
+                    return None
+
+        chains = []
+        for targets, sources, depth in self.reach:
+            for target in targets:
+                chain = [target]
+                table = target
+                for _ in range(depth):
+                    table = droppers.get(table)
+                    if table is None:
+                        return None
+                    chain.append(table)
+                    if table in sources:
+                        break
+                else:
+                    return None
+                chains.append(chain)
+
+        cycles = drop_cycles(assignments)
+        shortest = min(cycles, default=0)
+        if shortest < self.min_cycle:
+            return None
+        return {'chains': chains, 'cycles': len(cycles), 'shortest_cycle': shortest}
+
+
+def init_search(lists, assignment_mode, query):
+    """Sets up a search worker process (see search)."""
+
+    global search_state
+    search_state = (lists, assignment_mode, query)
+
+
+def search_batch(seeds, state=None):
+    """Makes the assignments for each of a batch of seeds, returning the
+        (seed, summary) pairs of the seeds meeting the ChainQuery (see
+        ChainQuery.check).  Runs in a search worker process, or in this
+        process, given the state.
+
+    :param seeds: The seeds to try
+    :param state: (Optional) The (table lists, assignment mode, ChainQuery) to
+        use instead of the worker's (see init_search)
+    """
+
+    lists, assignment_mode, query = state or search_state
+    matches = []
+    for seed in seeds:
+        assignments = assign_tables(random.Random(seed), *lists, assignment_mode,
+                                    log=lambda message: None)
+        summary = query.check(assignments)
+        if summary is not None:
+            matches.append((seed, summary))
+    return matches
+
+
+def search_seeds(generator, query, seeds, workers=1):
+    """Yields the (seed, summary) pairs of the seeds whose assignments meet the
+        ChainQuery (see ChainQuery.check), in the order of the seeds.
+
+    :param generator: The Generator, for its table lists and assignment mode
+    :param query: The ChainQuery, with its tables given by number (see
+        TableRegistry), as in the Generator's table lists
+    :param seeds: The seeds to try (an iterable of strings)
+    :param workers: (Optional) The number of worker processes; by default, 1
+        (the seeds are tried in this process)
+    """
+
+    state = ((generator.table_names, generator.unassigned, generator.unassigned_bottlenecks,
+              generator.table_names_blockers), generator.assignment_mode, query)
+    seeds = iter(seeds)
+    batches = iter(lambda: list(itertools.islice(seeds, search_batch_size)), [])
+
+    if workers <= 1:
+        for batch in batches:
+            yield from search_batch(batch, state)
+        return
+
+    # Keep a few batches per worker in flight, taking the results in order.
+
+    with ProcessPoolExecutor(workers, initializer=init_search, initargs=state) as pool:
+        pending = collections.deque()
+        try:
+            for batch in batches:
+                pending.append(pool.submit(search_batch, batch))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def search(loot_tables_folder=loot_tables_folder, count=1000, start=0, reach=(),
+           avoid=(), min_cycle=1, matches=10, output=None, workers=1, **options):
+    """Searches the seeds start, start + 1, ... (count of them) for seeds whose
+        assignments meet some drop-chain requirements, printing each seed
+        found, until enough seeds are found.  Returns the seeds found, as
+        (seed, summary) pairs (see ChainQuery.check).
+
+    :param loot_tables_folder: (Optional) The loot tables folder (or .jar or
+        .zip file)
+    :param count: (Optional) The number of seeds to try
+    :param start: (Optional) The first seed to try
+    :param reach: (Optional) (target, sources, depth) triples, the target and
+        sources each a list of entries written as on the config lists (see
+        ChainQuery and Generator.match_tables)
+    :param avoid: (Optional) (target, tables) pairs, each a list of entries
+        written as on the config lists (see ChainQuery)
+    :param min_cycle: (Optional) The fewest tables a drop cycle may have
+    :param matches: (Optional) Stop after finding this many seeds
+    :param output: (Optional) A file to write the seeds found to, as JSON
+        lines
+    :param workers: (Optional) The number of worker processes
+    :param options: (Optional) Other Generator options (such as config_folder
+        or assignment_mode)
+    """
+
+    # The loot tables themselves aren't needed, so the tables cache (which
+    # would load them all) is skipped.
+
+    # The assignments are made by table number (see TableRegistry), so the
+    # query is too, and the chains found are put back into table names.
+
+    generator = Generator(loot_tables_folder, cache_folder=None, verbose=False, **options)
+    try:
+        def tables(entries, what):
+            found = generator.match_tables(entries)
+            if not found:
+                raise RLTError(f"No loot table matches the {what} {', '.join(entries)}.")
+            return [generator.registry.ids[lootfilepath] for lootfilepath in found]
+
+        query = ChainQuery([(tables(target, 'target'), tables(sources, 'sources'), depth)
+                            for target, sources, depth in reach],
+                           [(tables(target, 'target'), tables(others, 'tables'))
+                            for target, others in avoid],
+                           min_cycle)
+        print(f"Searching {count} seeds from {start} for matching drop chains...\n")
+        found = []
+        started = time.perf_counter()
+        with open(output, 'w', encoding='utf-8') if output else contextlib.nullcontext() as file:
+            for seed, summary in search_seeds(generator, query, map(str, range(start, start + count)),
+                                              workers):
+                summary['chains'] = [generator.registry.paths(chain) for chain in summary['chains']]
+                found.append((seed, summary))
+                chains = '; '.join(' <- '.join(os.path.basename(table) for table in chain)
+                                   for chain in summary['chains'])
+                print(f"Seed '{seed}': {chains + '; ' if chains else ''}{summary['cycles']} drop "
+                      f"cycle{'s' if summary['cycles'] != 1 else ''}, the shortest with "
+                      f"{summary['shortest_cycle']} tables")
+                if file is not None:
+                    print(json.dumps(dict(seed=seed, **summary)), file=file)
+                if len(found) >= matches:
+                    break
+        print(f"\nFound {len(found)} matching seeds in {time.perf_counter() - started:.2f} seconds.")
+        return found
+    finally:
+        generator.close()
+
+
+################################################################################
+# Datapack service
+#
+# serve() runs RLT as a local HTTP service, for generating datapacks on demand
+# (for the players on a server, say).  The config lists and the loot tables are
+# loaded once, when the service starts, and the entries made for one datapack
+# are reused for the next, so each request only costs the randomization and
+# the datapack write.
+#
+#   GET  /datapack?seed=SEED   returns the datapack .zip file for SEED
+#   POST /datapack             the same, for a JSON request body with "seed"
+#                              and (optionally) replacement config lists:
+#                              "exclusions", "bottlenecks", "blockers", and
+#                              "two_block_objects", each a list of entries
+#   GET  /metrics              returns the request counts and timings (JSON)
+#
+# The datapacks are built one at a time (the Generator's workers and
+# compression threads can still be used for each one), into a temporary file
+# that is then streamed back, so a slow download never holds up the next
+# build.  At most queue_size requests are accepted at once; any more get a 503
+# (busy) response right away instead of waiting indefinitely.
+
+# The config lists a request may replace, and the Generator.configured()
+# arguments for them.
+service_config_lists = ('exclusions', 'bottlenecks', 'blockers', 'two_block_objects')
+
+
+class DatapackService:
+    """The state of the datapack service: the loaded Generator, the limit on
+        the requests in progress, and the request metrics.
+
+    :param generator: The Generator (with the default config lists)
+    :param queue_size: (Optional) The most requests accepted at once
+    """
+
+    def __init__(self, generator, queue_size=8):
+        self.generator = generator
+        self.queue_size = queue_size
+        self.slots = threading.BoundedSemaphore(queue_size)
+        self.build_lock = threading.Lock()
+        self.metrics_lock = threading.Lock()
+        self.started = time.time()
+        self.totals = {'requests': 0, 'datapacks': 0, 'cached': 0, 'busy': 0, 'errors': 0,
+                       'in_progress': 0, 'bytes_sent': 0, 'queue_seconds': 0.0,
+                       'build_seconds': 0.0, 'send_seconds': 0.0, 'max_build_seconds': 0.0}
+
+        # The timings of the most recent requests.
+        self.recent = collections.deque(maxlen=50)
+
+    def count(self, name, amount=1):
+        """Adds to one of the metrics totals."""
+
+        with self.metrics_lock:
+            self.totals[name] += amount
+
+    def record(self, timing):
+        """Adds a finished datapack request's timings to the metrics.
+
+        :param timing: A dict of the request's seed, status, size, and queue,
+            build, and send times (in seconds)
+        """
+
+        with self.metrics_lock:
+            self.totals['datapacks'] += 1
+            self.totals['bytes_sent'] += timing['bytes']
+            for phase in ('queue', 'build', 'send'):
+                self.totals[phase + '_seconds'] += timing[phase + '_seconds']
+            self.totals['max_build_seconds'] = max(self.totals['max_build_seconds'],
+                                                   timing['build_seconds'])
+            self.recent.append(timing)
+
+    def metrics(self):
+        """Returns the metrics, as a dict ready to be sent as JSON."""
+
+        with self.metrics_lock:
+            totals = dict(self.totals)
+            recent = list(self.recent)
+        datapacks = totals['datapacks']
+        for phase in ('queue', 'build', 'send'):
+            totals[phase + '_seconds'] = round(totals[phase + '_seconds'], 6)
+            totals['mean_' + phase + '_seconds'] = (round(totals[phase + '_seconds'] / datapacks, 6)
+                                                   if datapacks else None)
+        totals['max_build_seconds'] = round(totals['max_build_seconds'], 6)
+        return {'RLT_version': RLT_version, 'Minecraft_version': Minecraft_version,
+                'uptime_seconds': round(time.time() - self.started, 3),
+                'queue_size': self.queue_size, 'tables': len(self.generator.table_names)
+                + len(self.generator.table_names_blockers),
+                'totals': totals, 'recent': recent}
+
+    def build(self, seed, overrides, file):
+        """Builds a datapack, writing it to file, and returns the time spent
+        waiting for the build to start and the time spent building (seconds).
+
+        :param seed: The seed
+        :param overrides: A dict of the config lists to replace (see
+            Generator.configured)
+        :param file: A binary file object, open for writing and reading
+        """
+
+        queued = time.perf_counter()
+        with self.build_lock:
+            started = time.perf_counter()
+            generator = self.generator.configured(**overrides) if overrides else self.generator
+            if generator.write_cached_datapack(file, seed):
+                self.count('cached')
+        return started - queued, time.perf_counter() - started
+
+
+class DatapackRequestHandler(BaseHTTPRequestHandler):
+    """Handles the datapack service's HTTP requests (see serve)."""
+
+    server_version = f'RLT/{RLT_version}'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/metrics':
+            self.send_json(200, self.server.service.metrics())
+        elif url.path == '/datapack':
+            self.send_datapack(parse_qs(url.query).get('seed', [''])[0], {})
+        else:
+            self.send_json(404, {'error': f"Unknown path: {url.path}"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/datapack':
+            self.send_json(404, {'error': f"Unknown path: {url.path}"})
+            return
+
+        # Read and check the request: a JSON object with the seed and the
+        # replacement config lists (if any).
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length > 1 << 20:
+                raise ValueError("The request body is too large.")
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(request, dict):
+                raise ValueError("The request body must be a JSON object.")
+            seed = request.pop('seed', '')
+            if not isinstance(seed, (str, int)):
+                raise ValueError("The seed must be a string or a number.")
+            for name, entries in request.items():
+                if name not in service_config_lists:
+                    raise ValueError(f"Unknown request field: {name}")
+                if not isinstance(entries, list) or not all(isinstance(entry, str) for entry in entries):
+                    raise ValueError(f"The {name} list must be a list of strings.")
+        except ValueError as ex:
+            self.send_json(400, {'error': str(ex)})
+            return
+        self.send_datapack(str(seed), request)
+
+    def send_datapack(self, seed, overrides):
+        service = self.server.service
+        service.count('requests')
+        if not service.slots.acquire(blocking=False):
+            service.count('busy')
+            self.send_json(503, {'error': "The datapack service is busy; please try again shortly."},
+                           {'Retry-After': '5'})
+            return
+        service.count('in_progress')
+        try:
+            with tempfile.SpooledTemporaryFile(max_size=16 << 20) as file:
+
+                # Build the datapack (one at a time), then stream it back.
+
+                try:
+                    queue_seconds, build_seconds = service.build(seed, overrides, file)
+                except RLTError as ex:
+                    service.count('errors')
+                    self.send_json(400 if overrides else 500, {'error': str(ex).strip()})
+                    return
+                size = file.tell()
+                file.seek(0)
+                started = time.perf_counter()
+                filename = datapack_names(seed)[2]
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/zip')
+                self.send_header('Content-Length', str(size))
+                self.send_header('Content-Disposition', "attachment; filename=\"{}\"; filename*=UTF-8''{}".format(
+                        filename.encode('ascii', 'replace').decode('ascii').replace('"', "'"), quote(filename)))
+                self.send_header('Server-Timing', f'queue;dur={queue_seconds * 1000:.1f}, '
+                                                  f'build;dur={build_seconds * 1000:.1f}')
+                self.end_headers()
+                shutil.copyfileobj(file, self.wfile, 1 << 16)
+                send_seconds = time.perf_counter() - started
+            service.record({'seed': seed, 'overrides': sorted(overrides), 'bytes': size,
+                            'queue_seconds': round(queue_seconds, 6),
+                            'build_seconds': round(build_seconds, 6),
+                            'send_seconds': round(send_seconds, 6)})
+            self.log_message('"%s" datapack for seed %r: %d bytes; queue %.3fs, build %.3fs, send %.3fs',
+                             self.requestline, seed, size, queue_seconds, build_seconds, send_seconds)
+        finally:
+            service.count('in_progress', -1)
+            service.slots.release()
+
+    def send_json(self, status, data, headers=None):
+        headers = headers or {}
+        body = json.dumps(data, indent=2).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_request(self, code='-', size='-'):
+
+        # The datapack requests are logged (with their timings) once they're
+        # done; the rest are logged as usual.
+
+        if urlsplit(self.path).path != '/datapack' or code != 200:
+            super().log_request(code, size)
+
+
+def serve(loot_tables_folder=loot_tables_folder, host='127.0.0.1', port=8000,
+          queue_size=8, **options):
+    """Runs the datapack service (see DatapackService) until interrupted (with
+        Ctrl+C).
+
+    :param loot_tables_folder: (Optional) The loot tables folder (or .jar or
+        .zip file)
+    :param host: (Optional) The address to listen on; by default, only this
+        computer (127.0.0.1)
+    :param port: (Optional) The port to listen on
+    :param queue_size: (Optional) The most requests accepted at once
+    :param options: (Optional) Other Generator options (such as
+        output_profile or workers)
+    """
+
+    generator = Generator(loot_tables_folder, **options)
+    generator.verbose = False
+    server = ThreadingHTTPServer((host, port), DatapackRequestHandler)
+    server.daemon_threads = True
+    server.service = DatapackService(generator, queue_size)
+    print(f"\nServing datapacks at http://{host}:{server.server_port}/datapack?seed=SEED "
+          "(press Ctrl+C to stop).\n")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped serving.")
+    finally:
+        server.server_close()
+        generator.close()
+
+
+################################################################################
+# Begin UI output
+
+
+def pause_and_exit(pause=True):
+    """Pauses for a keystroke (so the console window stays open), and then
+    exits the application.
+
+    :param pause: (Optional) Set to False to exit without pausing (when not
+        running interactively)
+    """
+
+    if pause:
+        os.system('pause')
     sys.exit()
 
-# Report success, pause for keystroke, and then exit.
 
-print(f"Datapack '{datapack_filename}' was created successfully.\n")
+def main(argv=None):
+    """The interactive RLT application: prompts the user for a seed and
+    generates the datapack in the RLT datapacks folder.  (With --seed, the
+    datapack is generated without any prompts.)
+
+    :param argv: (Optional) The command line arguments; by default, sys.argv
+    """
+
+    parser = argparse.ArgumentParser(
+            description="Memetics' Random Loot Tables: a random loot table datapack generator for Minecraft.")
+    parser.add_argument('--seed', help="generate the datapack for SEED without prompting")
+    parser.add_argument('--loot-tables', metavar='PATH',
+                        help="the loot tables folder, or a Minecraft .jar (or .zip) file to read them from")
+    parser.add_argument('--incremental', action='store_true',
+                        help="rebuild only the datapack entries affected by changes since the last incremental build")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep rebuilding the datapack (incrementally) whenever the config files or loot tables change")
+    parser.add_argument('--interval', type=float, default=1.0, metavar='SECONDS',
+                        help="how often --watch checks for changes (default: 1 second)")
+    parser.add_argument('--assignment-mode', choices=assignment_modes, default='legacy',
+                        help="how the tables are assigned: legacy (the default; the same assignments "
+                             "for a seed as all earlier RLT versions) or fast (quicker for very large "
+                             "loot table sets, but gives different assignments for the same seed)")
+    parser.add_argument('--output-profile', choices=output_profiles, default='pretty',
+                        help="how the datapack is formatted and compressed: pretty (the default; indented JSON), "
+                             "compact (compact JSON), fast (compact JSON, fastest compression), "
+                             "small (compact JSON, best compression), or raw (tables needing no revision "
+                             "copied as they are, without parsing them)")
+    parser.add_argument('--compress-threads', type=int, default=1, metavar='N',
+                        help="compress the datapack entries in N threads (default: 1); "
+                             "the datapack comes out the same with any number of threads")
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help="load, revise, and compress the loot tables in N worker processes (default: 1)")
+    parser.add_argument('--classify', choices=classify_modes, default='legacy',
+                        help="sort the loot tables into blocks and entities tables by their folders right under "
+                             "loot_tables ('legacy', the default), by their folders at any depth ('folder'), or by "
+                             "their \"type\" ('type')")
+    parser.add_argument('--scan-threads', type=int, default=scan_threads, metavar='N',
+                        help=f"scan the loot tables folder tree in N threads (default: {scan_threads})")
+    parser.add_argument('--json-codec', choices=('auto', *json_codecs), default='auto',
+                        help="parse and write the loot tables with json or orjson (default: auto, orjson if "
+                             "it is installed); the datapack comes out the same with either")
+    parser.add_argument('--output-format', choices=output_formats, default='zip',
+                        help="write the datapack as a .zip file (the default) or as an unpacked folder")
+    parser.add_argument('--datapacks', metavar='PATH',
+                        help="the folder to write the datapack to, such as a world's datapacks folder "
+                             f"(default: '{datapack_folder}')")
+    parser.add_argument('--streaming', action='store_true',
+                        help="keep the memory use about the same for any number of loot tables, by reading, "
+                             "revising, and writing the tables one at a time without keeping them")
+    parser.add_argument('--in-flight', type=int, metavar='N',
+                        help="make at most N datapack entries at once (see --streaming)")
+    parser.add_argument('--pack-cache-size', type=int, default=pack_cache_size >> 20, metavar='MB',
+                        help="keep up to MB megabytes of finished datapacks in the RLT cache folder, so asking for "
+                             f"the same datapack again just copies it (default: {pack_cache_size >> 20}; 0 turns it off)")
+    parser.add_argument('--forensics-db', nargs='?', const=forensics_database, metavar='FILE',
+                        help="add the assignments of each datapack made to the forensics database FILE "
+                             f"(by default, '{os.path.relpath(forensics_database)}'), for --query-loot "
+                             "and --query-dropper")
+    parser.add_argument('--query-loot', metavar='TABLE',
+                        help="list the seeds and droppers dropping the loot of TABLE, from the forensics database")
+    parser.add_argument('--query-dropper', metavar='TABLE',
+                        help="list the seeds and the loot dropped by TABLE, from the forensics database")
+    parser.add_argument('--query-seed', metavar='SEED',
+                        help="with --query-loot or --query-dropper, list only the datapacks for SEED "
+                             "(alone, list all of SEED's assignments)")
+    parser.add_argument('--profile', metavar='FILE',
+                        help="write a JSON report of the time and memory taken by each step to FILE")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="with --profile, trace each step's memory use (slower)")
+    parser.add_argument('--profile-in-pack', action='store_true',
+                        help="with --profile, also add the report to the datapack (as RLT_info/Profile.json)")
+    parser.add_argument('--search', type=int, metavar='COUNT',
+                        help="search COUNT seeds (0, 1, 2, ...) for assignments meeting the --reach, --avoid, "
+                             "and --min-cycle requirements, without making any datapacks")
+    parser.add_argument('--search-from', type=int, default=0, metavar='N',
+                        help="with --search, start from seed N (default: 0)")
+    parser.add_argument('--reach', nargs=3, action='append', default=[], metavar=('TARGET', 'SOURCES', 'DEPTH'),
+                        help="with --search, the loot of TARGET must be dropped by one of SOURCES (comma-separated "
+                             "config list entries) at most DEPTH steps along its drop chain; may be repeated")
+    parser.add_argument('--avoid', nargs=2, action='append', default=[], metavar=('TARGET', 'TABLES'),
+                        help="with --search, the loot of TARGET must not be dropped by any of TABLES "
+                             "(comma-separated config list entries); may be repeated")
+    parser.add_argument('--min-cycle', type=int, default=1, metavar='N',
+                        help="with --search, every drop cycle must have at least N tables (default: 1)")
+    parser.add_argument('--matches', type=int, default=10, metavar='N',
+                        help="with --search, stop after finding N seeds (default: 10)")
+    parser.add_argument('--search-output', metavar='FILE',
+                        help="with --search, also write the seeds found to FILE, as JSON lines")
+    parser.add_argument('--serve', action='store_true',
+                        help="run as a local HTTP service, generating datapacks on request")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="the address --serve listens on (default: 127.0.0.1, this computer only)")
+    parser.add_argument('--port', type=int, default=8000,
+                        help="the port --serve listens on (default: 8000)")
+    parser.add_argument('--queue', type=int, default=8, metavar='N',
+                        help="the most requests --serve accepts at once (default: 8)")
+    args = parser.parse_args(argv)
+    if args.watch and not args.seed:
+        parser.error("--watch needs a --seed")
+    if args.serve and args.watch:
+        parser.error("--serve and --watch can't be used together")
+    if args.search is not None and (args.seed or args.serve):
+        parser.error("--search can't be used with --seed, --watch, or --serve")
+    if args.output_format == 'folder' and (args.incremental or args.watch or args.serve):
+        parser.error("--output-format folder can't be used with --incremental, --watch, or --serve")
+    for target, sources, depth in args.reach:
+        if not depth.isdigit() or int(depth) < 1:
+            parser.error(f"--reach needs a DEPTH of at least 1 (not '{depth}')")
+
+    # Prompts (and the pause before exiting) are only for interactive use.
+
+    querying = args.query_loot is not None or args.query_dropper is not None or args.query_seed is not None
+    interactive = args.seed is None and not args.serve and args.search is None and not querying
+
+    print(f"\nMemetics\' Random Loot Tables {RLT_version} for (Java) Minecraft {Minecraft_version}")
+    print("(should work with Minecraft 1.14 or later).")
+    print("Copyright (c) 2021-2023 Memetics (GNU General Public License version 3)")
+    print()
+    print("For the latest source code and documentation, visit https://github.com/MemeticsX/RLT .")
+    print("\n")
+    if interactive:
+        print("This application randomizes the default loot tables for Minecraft.  It generates a datapack that the user then")
+        print("places in a savegame\'s datapacks folder.  In Minecraft 1.17 and later, the datapacks folder can be accessed")
+        print("before world creation on the Create New World page using the Data Packs button.  The datapacks folder for an")
+        print("existing savegame can be found in the savegame\'s root folder, which can be opened from within Minecraft by")
+        print("clicking Singleplayer, then on the Select World page, selecting the savegame, clicking the Edit button, and then")
+        print("on the Edit World page clicking the Open World Folder button.")
+        print()
+        print("Before running this application, you must extract the loot tables from the current Minecraft version (the folder")
+        print("called 'loot_tables' and all of its sub-folders and files).  The loot_tables folder must be in the same folder as")
+        print("this application for the application to locate the loot tables and generate the data pack correctly.  In addition,")
+        print("the blockers.config, bottlenecks.config, and exclusions.config files must be in the current folder if customization")
+        print(f"is being used.  (Instead of the loot_tables folder, a copy of the Minecraft {Minecraft_version}.jar file may be placed in")
+        print("the same folder as this application; the loot tables will then be read directly from the .jar file.)\n\n")
+
+    # Queries only need the forensics database.
+
+    if querying:
+        database = args.forensics_db or forensics_database
+        if not os.path.isfile(database):
+            print(f"There is no forensics database '{database}' yet; make some datapacks with --forensics-db first.\n")
+            return
+        store = ForensicsStore(database)
+        try:
+            rows = store.find(args.query_loot, args.query_dropper, args.query_seed)
+        finally:
+            store.close()
+        for seed, config_hash, datapack_filename, dropper, loot in rows:
+            print(f"Seed '{seed}' (config {config_hash[:8]}): {dropper} --> {loot}")
+        print(f"\n{len(rows)} assignment{'s' if len(rows) != 1 else ''} found.\n")
+        return
+
+    # Error check: Test whether the loot_tables_folder exists and
+    # is accessible; if not, fall back to the Minecraft .jar file in the
+    # current folder, if there is one; if not, report error and exit.
+
+    loot_tables = args.loot_tables or loot_tables_folder
+    if args.loot_tables is None and os.path.isdir(loot_tables) == False and os.path.isfile(f'{Minecraft_version}.jar'):
+        loot_tables = f'{Minecraft_version}.jar'
+        print(f"Reading the loot tables from {loot_tables}.\n")
+
+    if os.path.isdir(loot_tables) == False and os.path.isfile(loot_tables) == False:
+        print(f"The loot tables folder '{loot_tables}' is not accessible or does not exist in the current folder.")
+        print("The default loot tables folder and all of its contents (including sub-folders) must be extracted (copied)")
+        print(f"from the Java Minecraft {Minecraft_version} game installation files and must be located in the current working folder")
+        print("where this RLT application is running.\n")
+        print()
+        print(f"To extract the loot tables folder: in %AppData%, go to: \\.minecraft\\versions\\{Minecraft_version} and open {Minecraft_version}.jar")
+        print("using 7zip or another file compression utility.  (This may require opening the .jar file from within the")
+        print("unzip utility or renaming a copy of the .jar file to give it the .zip extension.)  Then in the .jar file,")
+        print("navigate to the data/minecraft/loot_tables folder and extract the folder, copying it to the RLT working folder.")
+        print(f"Or simply copy {Minecraft_version}.jar itself to the RLT working folder.")
+        print("See the documentation for Memetics' RLT for more details.\n")
+        print()
+        print("Exiting...\n")
+        pause_and_exit(interactive)
+
+    datapacks = args.datapacks or datapack_folder
+
+    if args.watch:
+        watch(args.seed, loot_tables, args.interval, output_profile=args.output_profile,
+              compress_threads=args.compress_threads, workers=args.workers,
+              pack_cache_size=args.pack_cache_size << 20, forensics_db=args.forensics_db,
+              streaming=args.streaming, in_flight=args.in_flight, datapack_folder=datapacks,
+              classify=args.classify, scan_threads=args.scan_threads, codec=args.json_codec,
+              assignment_mode=args.assignment_mode)
+        return
+
+    if args.search is not None:
+        def entries(text):
+            return [entry.strip() for entry in text.split(',') if entry.strip()]
+
+        try:
+            search(loot_tables, args.search, args.search_from,
+                   [(entries(target), entries(sources), int(depth)) for target, sources, depth in args.reach],
+                   [(entries(target), entries(tables)) for target, tables in args.avoid],
+                   args.min_cycle, args.matches, args.search_output, args.workers,
+                   classify=args.classify, scan_threads=args.scan_threads, codec=args.json_codec,
+                   assignment_mode=args.assignment_mode)
+        except (RLTError, OSError) as ex:
+            print(ex)
+            print("Exiting...\n")
+        return
+
+    if args.serve:
+        try:
+            serve(loot_tables, args.host, args.port, args.queue, output_profile=args.output_profile,
+                  compress_threads=args.compress_threads, workers=args.workers,
+                  pack_cache_size=args.pack_cache_size << 20, forensics_db=args.forensics_db,
+                  streaming=args.streaming, in_flight=args.in_flight, datapack_folder=datapacks,
+                  classify=args.classify, scan_threads=args.scan_threads, codec=args.json_codec,
+                  assignment_mode=args.assignment_mode)
+        except (RLTError, OSError) as ex:
+            print(ex)
+            print("Exiting...\n")
+        return
+
+    # Prompt user for a PRNG seed
+
+    if interactive:
+        seed = input("Enter a seed (a number or text string). Leave blank for a system-generated random seed: ")
+        print()
+    else:
+        seed = args.seed
+
+    # Report the seed being used.  (The Generator seeds its own PRNG from the
+    # seed, or from a system-determined random seed if the seed is blank.)
+
+    if len(seed) > 0:
+        print(f"Creating RLT datapack using the seed '{seed}'.")
+    else:
+        print("Creating RLT datapack using a random, system-generated seed (different for each run).\n")
+    datapack_filename = datapack_names(seed)[2]
+    if args.output_format == 'folder':
+        datapack_filename = os.path.splitext(datapack_filename)[0]
+
+    # If the data pack already exists, confirm over-writing it.
+
+    if interactive and os.path.exists(os.path.join(datapacks, datapack_filename)):
+        if len(seed) > 0:
+            print(f"Warning: A datapack for seed '{seed}' already exists.")
+            print("Making a new datapack with that seed will over-write the existing one.\n")
+        else:
+            print("Warning: A datapack for a system-generated random seed already exists.")
+            print("Making a new random-seed datapack will over-write the existing one.\n")
+        print("Do you wish to proceed?\n")
+        choice = 'x'
+        while choice[0].lower() != 'y':
+            print("Enter 'Y' (yes) to generate a new datapack, over-writing the current datapack.")
+            choice = input("Enter 'N' (no) to abort and exit the application: ")
+            if choice[0].lower() == 'n':
+                print("\nData pack generation canceled.  Exiting...")
+                pause_and_exit()
+            if choice[0].lower() != 'y':
+                print("\nPlease choose a valid option: (Y) to proceed or (N) to abort and exit.\n")
+
+    print("\nGenerating datapack.  This may take a moment, depending on the size of the loot table set...\n")
+
+    profiler = None
+    if args.profile:
+        profiler = Profiler(args.profile_memory, in_pack=args.profile_in_pack)
+    try:
+        generator = Generator(loot_tables, profiler=profiler, output_profile=args.output_profile,
+                              compress_threads=args.compress_threads, workers=args.workers,
+                              pack_cache_size=args.pack_cache_size << 20, forensics_db=args.forensics_db,
+                              streaming=args.streaming, in_flight=args.in_flight,
+                              datapack_folder=datapacks, output_format=args.output_format,
+                              classify=args.classify, scan_threads=args.scan_threads, codec=args.json_codec,
+                              assignment_mode=args.assignment_mode)
+        generator.generate(seed, incremental=args.incremental)
+        generator.close()
+        if profiler is not None:
+            profiler.save(args.profile)
+            print(f"Profile report written to '{args.profile}'.")
+    except (RLTError, OSError) as ex:
+        print(ex)
+        print("Exiting...\n")
+        pause_and_exit(interactive)
+
+    # Report success, pause for keystroke, and then exit.
+
+    print(f"Datapack '{datapack_filename}' was created successfully.\n")
+
+    pause_and_exit(interactive)
+
 
-os.system('pause')
-sys.exit()
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,476 @@
+################################################################################
+##
+##  Memetics' Random Loot Tables: A random loot table (RLT) datapack generator
+##  for Minecraft.
+##
+##  RLT_benchmark.py: Performance benchmarks for the RLT datapack pipeline,
+##  run on synthetic loot table sets of any size.
+##
+##  Copyright (c) 2021-2023 by Memetics (Minecraft) / Memetics (Twitch) /
+##      MemeticsX (GitHub)
+##
+##  For the latest source code and documentation, visit:
+##  https://github.com/memeticsx/RLT
+##
+##
+##  This file is part of Memetics' Random Loot Tables.
+##
+##  Memetics' Random Loot Tables is free software: you can redistribute it
+##  and/or modify it under the terms of the GNU General Public License as
+##  published by the Free Software Foundation, either version 3 of the License,
+##  or (at your option) any later version.
+##
+##  Memetics' Random Loot Tables is distributed in the hope that it will be
+##  useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+##  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+##  Public License for more details.
+##
+##  You should have received a copy of the GNU General Public License along
+##  with this application.  If not, see https://www.gnu.org/licenses/ .
+##
+################################################################################
+
+
+###----------------> WIDTH MEASUREMENT BAR (80 CHARACTERS) <-----------------###
+
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import tracemalloc
+
+import RLT
+
+
+################################################################################
+# Synthetic loot tables
+#
+# The vanilla loot table set (about 1,100 tables) is too small to show how the
+# pipeline scales, so the benchmarks run on made-up loot table sets of any
+# size.  The tables are shaped like the vanilla ones: pools of item entries,
+# nested alternatives / group entries, functions, and conditions (including
+# the ones RLT revises: killed_by_player, match_tool, the two-block
+# block_state_property checks, the fishing hook check, and glow lichen's
+# set_count functions).  The same parameters always produce the same set.
+
+# The share of the tables in each loot tables sub-folder.
+synthetic_folders = (('blocks', 0.60), ('entities', 0.20), ('chests', 0.10),
+                     ('gameplay', 0.05), ('entities/sheep', 0.03),
+                     ('chests/village', 0.02))
+
+# The ordinary conditions, picked at random (condition_density sets how often).
+synthetic_conditions = (
+    {'condition': 'minecraft:killed_by_player'},
+    {'condition': 'minecraft:survives_explosion'},
+    {'condition': 'minecraft:random_chance', 'chance': 0.1},
+    {'condition': 'minecraft:random_chance_with_looting', 'chance': 0.025,
+     'looting_multiplier': 0.01},
+    {'condition': 'minecraft:match_tool',
+     'predicate': {'enchantments': [{'enchantment': 'minecraft:silk_touch',
+                                     'levels': {'min': 1}}]}},
+    {'condition': 'minecraft:match_tool', 'predicate': {'items': ['minecraft:shears']}},
+    {'condition': 'minecraft:entity_properties', 'entity': 'this',
+     'predicate': {'flags': {'is_on_fire': True}}},
+    {'condition': 'minecraft:table_bonus', 'enchantment': 'minecraft:fortune',
+     'chances': [0.05, 0.0625, 0.083333336, 0.1]},
+)
+
+# The ordinary functions, picked at random.
+synthetic_functions = (
+    {'function': 'minecraft:set_count',
+     'count': {'type': 'minecraft:uniform', 'min': 0.0, 'max': 2.0}, 'add': False},
+    {'function': 'minecraft:looting_enchant',
+     'count': {'type': 'minecraft:uniform', 'min': 0.0, 'max': 1.0}},
+    {'function': 'minecraft:apply_bonus', 'enchantment': 'minecraft:fortune',
+     'formula': 'minecraft:ore_drops'},
+    {'function': 'minecraft:explosion_decay'},
+    {'function': 'minecraft:furnace_smelt',
+     'conditions': [{'condition': 'minecraft:entity_properties', 'entity': 'this',
+                     'predicate': {'flags': {'is_on_fire': True}}}]},
+)
+
+
+def synthetic_entry(rng, name, depth, condition_density):
+    """Returns a random loot table entry: an item, or (while depth allows) an
+        alternatives or group entry holding more entries.
+
+    :param rng: The random.Random instance to draw from
+    :param name: The item name stem
+    :param depth: How many more levels of nested entries are allowed
+    :param condition_density: The chance of each entry, pool, and function
+        having conditions (0.0 to 1.0)
+    """
+
+    if depth > 0 and rng.random() < 0.15:
+        entry = {'type': rng.choice(('minecraft:alternatives', 'minecraft:group')),
+                 'children': [synthetic_entry(rng, f'{name}_{i}', depth - 1, condition_density)
+                              for i in range(2)]}
+    else:
+        entry = {'type': 'minecraft:item', 'name': f'minecraft:{name}'}
+        if rng.random() < 0.5:
+            entry['functions'] = [dict(rng.choice(synthetic_functions))
+                                  for i in range(rng.randint(1, 2))]
+    if rng.random() < condition_density:
+        entry['conditions'] = [rng.choice(synthetic_conditions)
+                               for i in range(rng.randint(1, 2))]
+    return entry
+
+
+def synthetic_table(rng, folder, name, depth, condition_density):
+    """Returns a random loot table for a loot tables sub-folder.
+
+    :param rng: The random.Random instance to draw from
+    :param folder: The sub-folder (such as 'blocks') the table belongs to
+    :param name: The loot table's name (without .json)
+    :param depth: How deeply entries may be nested
+    :param condition_density: The chance of each entry, pool, and function
+        having conditions (0.0 to 1.0)
+    """
+
+    kind = {'blocks': 'block', 'chests': 'chest', 'gameplay': 'gift'}.get(
+            folder.split('/')[0], 'entity')
+    pools = []
+    for p in range(rng.choice((1, 1, 1, 2, 2, 3))):
+        pool = {'rolls': float(rng.randint(1, 3)), 'bonus_rolls': 0.0,
+                'entries': [synthetic_entry(rng, f'{name}_{p}_{e}', depth, condition_density)
+                            for e in range(rng.choice((1, 1, 1, 2, 3, 4)))]}
+        if rng.random() < condition_density:
+            pool['conditions'] = [rng.choice(synthetic_conditions)]
+        if rng.random() < 0.1:
+            pool['functions'] = []
+        pools.append(pool)
+    return {'type': f'minecraft:{kind}', 'pools': pools}
+
+
+def make_loot_tables(folder, count, condition_density=0.3, depth=3, seed=0):
+    """Writes a synthetic loot tables folder tree with count tables, along
+        with config files (exclusions, bottlenecks, blockers, and two-block
+        objects) for it, and returns the config files folder.
+
+    :param folder: The folder to write the loot_tables folder and the config
+        files to
+    :param count: The number of loot tables
+    :param condition_density: (Optional) The chance of each entry, pool, and
+        function having conditions (0.0 to 1.0)
+    :param depth: (Optional) How deeply entries may be nested
+    :param seed: (Optional) The seed for the random tables
+    """
+
+    rng = random.Random(seed)
+    root = os.path.join(folder, 'loot_tables')
+    names = {subfolder: [] for subfolder, share in synthetic_folders}
+
+    def write(subfolder, name, table):
+        with open(os.path.join(root, subfolder, name + '.json'), 'w') as file:
+            json.dump(table, file, indent=2)
+        names[subfolder].append(name + '.json')
+
+    for subfolder, share in synthetic_folders:
+        os.makedirs(os.path.join(root, subfolder))
+
+    # The tables RLT treats specially, then the rest, spread over the
+    # sub-folders.
+
+    two_block_count = max(1, count // 100)
+    for i in range(two_block_count):
+        table = synthetic_table(rng, 'blocks', f'bed_{i}', depth, condition_density)
+        table['pools'][0]['entries'][0]['conditions'] = [
+                {'condition': 'minecraft:block_state_property', 'block': f'minecraft:bed_{i}',
+                 'properties': {'part': 'head'}}]
+        write('blocks', f'bed_{i}', table)
+    table = synthetic_table(rng, 'blocks', 'glow_lichen', depth, condition_density)
+    table['pools'][0]['entries'][0]['functions'] = [
+            {'function': 'minecraft:set_count', 'add': True, 'count': 1.0,
+             'conditions': [{'condition': 'minecraft:block_state_property',
+                             'block': 'minecraft:glow_lichen', 'properties': {'down': 'true'}}]}]
+    write('blocks', 'glow_lichen', table)
+    write('entities', 'armor_stand', synthetic_table(rng, 'entities', 'armor_stand', depth, condition_density))
+    table = synthetic_table(rng, 'gameplay', 'fishing', depth, condition_density)
+    table['pools'][0]['entries'].append(
+            {'type': 'minecraft:loot_table', 'name': 'minecraft:gameplay/fishing/treasure',
+             'conditions': [{'condition': 'minecraft:entity_properties', 'entity': 'this',
+                             'predicate': {'type_specific': {'type': 'fishing_hook',
+                                                             'in_open_water': True}}}]})
+    write('gameplay', 'fishing', table)
+
+    remaining = count - two_block_count - 3
+    for subfolder, share in synthetic_folders:
+        stem = os.path.basename(subfolder)
+        for i in range(round(remaining * share) if subfolder != 'blocks' else
+                       remaining - sum(round(remaining * s) for f, s in synthetic_folders[1:])):
+            name = f'{stem}_{i}'
+            write(subfolder, name, synthetic_table(rng, subfolder, name, depth, condition_density))
+
+    # The config lists: a few of the tables on each list (never on two lists).
+
+    config_folder = os.path.join(folder, 'config')
+    os.makedirs(config_folder)
+    pool = sorted(name for subfolder in ('blocks', 'entities', 'chests')
+                  for name in names[subfolder] if not name.startswith('bed_'))
+    rng.shuffle(pool)
+    lists = {RLT.exclusionsconfig: pool[:count // 200],
+             RLT.bottlenecksconfig: pool[count // 200:count // 200 + count // 100],
+             RLT.blockersconfig: pool[count // 200 + count // 100:count // 200 + count // 25],
+             RLT.two_block_objectsconfig: [f'bed_{i}.json' for i in range(two_block_count)]}
+    for configpath, names_list in lists.items():
+        with open(RLT.config_location(configpath, config_folder), 'w') as file:
+            file.write('# Synthetic config list for RLT_benchmark\n\n')
+            file.write(''.join(name + '\n' for name in names_list))
+    return config_folder
+
+
+################################################################################
+# The benchmark
+#
+# Each phase of the datapack pipeline is timed on its own, in the order the
+# Generator runs them: the config lists (including checkcollisions), the
+# folder tree scan, the assignments, loading (parsing) the loot tables,
+# revising them, serializing them back to JSON, compressing them, and writing
+# the .zip file.  Then a complete run (a new Generator plus generate()) is
+# timed from start to finish, for comparison with the sum of the phases.
+
+
+def timed(function, *args):
+    """Calls function, returning its result and the time it took (seconds)."""
+
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def benchmark(folder, config_folder, seed='benchmark', assignment_mode='legacy',
+              output_profile='pretty', compress_threads=1, workers=1, codec='auto'):
+    """Runs the datapack pipeline on a loot tables folder one phase at a time,
+        returning a dict of the time taken by each phase (in seconds), a dict
+        of the number of items handled, and the Profiler report of the
+        complete run.
+
+    :param folder: The folder holding the loot_tables folder
+    :param config_folder: The folder holding the config files
+    :param seed: (Optional) The seed for the assignments
+    :param assignment_mode: (Optional) The Generator's assignment mode
+    :param output_profile: (Optional) The Generator's output profile
+    :param compress_threads: (Optional) The Generator's compression threads
+        (for the complete run; the compress phase is always timed on one
+        thread)
+    :param workers: (Optional) The Generator's worker processes (for the
+        complete run; the other phases are always timed in this process)
+    :param codec: (Optional) The Generator's JSON codec
+    """
+
+    phases = {}
+    settings = RLT.output_profiles[output_profile]
+    loot_tables = os.path.join(folder, 'loot_tables')
+    datapacks = os.path.join(folder, 'RLT datapacks')
+    options = dict(config_folder=config_folder, datapack_folder=datapacks,
+                   cache_folder=None, assignment_mode=assignment_mode,
+                   output_profile=output_profile, codec=codec,
+                   cache_entries=False, verbose=False)
+    generator = RLT.Generator(loot_tables, **options)
+
+    # Load the config lists and scan the folder tree again, this time timed
+    # (the Generator did both when it was created).
+
+    _, phases['config'] = timed(generator.load_configs)
+    _, phases['scan'] = timed(generator.scan)
+    assignments, phases['assign'] = timed(generator.assign, random.Random(seed))
+
+    def load():
+        for lootfilepath in set(assignments.values()):
+            generator.load_table(lootfilepath)
+
+    def revise():
+        entity_table_names = set(generator.entity_table_names)
+        two_block_objects = set(generator.two_block_objects)
+        return [(filename, RLT.revise_contents(
+                        filename, lootfilepath, generator.load_table(lootfilepath),
+                        entity_table_names, two_block_objects))
+                for filename, lootfilepath in assignments.items()]
+
+    def serialize():
+        return [(filename, generator.codec.dumps(loottable, indent=settings['indent'],
+                                                 separators=settings['separators']))
+                for filename, loottable in revised]
+
+    def compress():
+        return [(filename, RLT.compress_entry(contents, settings['compress_type'],
+                                              settings['compresslevel']))
+                for filename, contents in serialized]
+
+    def write():
+        os.makedirs(datapacks, exist_ok=True)
+        with open(os.path.join(datapacks, 'phases.zip'), 'wb') as file:
+            with RLT.PackWriter(file) as zf:
+                for filename, entry in entries:
+                    zf.write_entry(generator.registry.record(filename).arcname, entry)
+
+    _, phases['load'] = timed(load)
+    revised, phases['revise'] = timed(revise)
+    serialized, phases['serialize'] = timed(serialize)
+    entries, phases['compress'] = timed(compress)
+    _, phases['zip'] = timed(write)
+    counts = {'tables': len(generator.table_names) + len(generator.table_names_blockers),
+              'assignments': len(assignments),
+              'json_bytes': sum(len(contents) for filename, contents in serialized),
+              'zip_bytes': os.path.getsize(os.path.join(datapacks, 'phases.zip'))}
+    generator.close()
+    del revised, serialized, entries
+
+    def end_to_end():
+        profiler = RLT.Profiler(slowest=5)
+        generator = RLT.Generator(loot_tables, profiler=profiler,
+                                  compress_threads=compress_threads, workers=workers,
+                                  **options)
+        generator.generate(seed)
+        generator.close()
+        return profiler.report()
+
+    profile, phases['end_to_end'] = timed(end_to_end)
+    return phases, counts, profile
+
+
+def measure_memory(folder, config_folder, seed='benchmark', streaming=False, **options):
+    """Makes one datapack (with a new Generator, and a new loot tables cache)
+        while tracing the memory allocated, returning the peak traced memory
+        (bytes) and the time taken (seconds).  Comparing the peaks for
+        different loot table set sizes shows how the memory use grows with
+        the number of tables, with and without streaming.
+
+    :param folder: The folder holding the loot_tables folder
+    :param config_folder: The folder holding the config files
+    :param seed: (Optional) The seed for the assignments
+    :param streaming: (Optional) The Generator's streaming option
+    :param options: (Optional) Other Generator options
+    """
+
+    cache = tempfile.mkdtemp(prefix='cache ', dir=folder)
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        generator = RLT.Generator(os.path.join(folder, 'loot_tables'), config_folder=config_folder,
+                                  datapack_folder=os.path.join(folder, 'RLT datapacks'),
+                                  cache_folder=cache, pack_cache_size=0, verbose=False,
+                                  streaming=streaming, **options)
+        generator.generate(seed)
+        generator.close()
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak, seconds
+
+
+def run_benchmarks(sizes, condition_density=0.3, depth=3, repeat=1,
+                   assignment_mode='legacy', output_profile='pretty',
+                   compress_threads=1, workers=1, memory=False, in_flight=None,
+                   codec='auto', log=print):
+    """Benchmarks the pipeline on a synthetic loot tables set of each size,
+        returning the results (ready to save as JSON).  With repeat, each
+        phase's time is the best of that many runs.
+
+    :param sizes: The loot table set sizes (numbers of tables)
+    :param condition_density: (Optional) See make_loot_tables
+    :param depth: (Optional) See make_loot_tables
+    :param repeat: (Optional) The number of runs for each size
+    :param assignment_mode: (Optional) The Generator's assignment mode
+    :param output_profile: (Optional) The Generator's output profile
+    :param compress_threads: (Optional) The Generator's compression threads
+    :param workers: (Optional) The Generator's worker processes
+    :param memory: (Optional) Set to True to also measure the peak memory
+        use of making a datapack, with and without streaming (see
+        measure_memory)
+    :param in_flight: (Optional) The Generator's in_flight bound
+    :param codec: (Optional) The Generator's JSON codec
+    :param log: (Optional) The function for progress messages
+    """
+
+    results = {'RLT_version': RLT.RLT_version,
+               'Minecraft_version': RLT.Minecraft_version,
+               'python': platform.python_version(),
+               'platform': platform.platform(),
+               'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'parameters': {'condition_density': condition_density, 'depth': depth,
+                              'repeat': repeat, 'assignment_mode': assignment_mode,
+                              'output_profile': output_profile,
+                              'compress_threads': compress_threads, 'workers': workers,
+                              'in_flight': in_flight, 'json_codec': RLT.json_codec(codec).name},
+               'runs': []}
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix='RLT benchmark ') as folder:
+            log(f"Writing {size} synthetic loot tables")
+            config_folder = make_loot_tables(folder, size, condition_density, depth)
+            best = None
+            for i in range(repeat):
+                phases, counts, profile = benchmark(folder, config_folder, assignment_mode=assignment_mode,
+                                                    output_profile=output_profile,
+                                                    compress_threads=compress_threads,
+                                                    workers=workers, codec=codec)
+                best = phases if best is None else {
+                        phase: min(seconds, best[phase]) for phase, seconds in phases.items()}
+            log("  " + ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in best.items()))
+            run = {'size': size, 'counts': counts,
+                   'phases': {phase: round(seconds, 6) for phase, seconds in best.items()},
+                   'profile': profile}
+            if memory:
+                run['memory'] = {}
+                for mode, streaming in (('default', False), ('streaming', True)):
+                    peak, seconds = measure_memory(folder, config_folder, assignment_mode=assignment_mode,
+                                                   output_profile=output_profile,
+                                                   compress_threads=compress_threads, workers=workers,
+                                                   streaming=streaming, in_flight=in_flight,
+                                                   codec=codec)
+                    run['memory'][mode] = {'peak_traced_bytes': peak, 'seconds': round(seconds, 6)}
+                log("  peak memory: " + ", ".join(f"{mode} {result['peak_traced_bytes'] / 2**20:.1f} MB"
+                                                  for mode, result in run['memory'].items()))
+            results['runs'].append(run)
+    return results
+
+
+def main(argv=None):
+    """Runs the benchmarks from the command line, writing the results as JSON
+    (to a file, or to standard output).
+    """
+
+    parser = argparse.ArgumentParser(
+            description="Benchmarks the RLT datapack pipeline on synthetic loot table sets.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        metavar='N', help="the loot table set sizes (default: 1000 10000 100000)")
+    parser.add_argument('--condition-density', type=float, default=0.3, metavar='P',
+                        help="the chance of each entry or pool having conditions (default: 0.3)")
+    parser.add_argument('--depth', type=int, default=3,
+                        help="how deeply entries may be nested (default: 3)")
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="keep the best time of this many runs (default: 1)")
+    parser.add_argument('--assignment-mode', choices=RLT.assignment_modes, default='legacy')
+    parser.add_argument('--output-profile', choices=RLT.output_profiles, default='pretty')
+    parser.add_argument('--compress-threads', type=int, default=1, metavar='N')
+    parser.add_argument('--workers', type=int, default=1, metavar='N')
+    parser.add_argument('--memory', action='store_true',
+                        help="also measure the peak memory use of making a datapack, with and without streaming")
+    parser.add_argument('--in-flight', type=int, metavar='N',
+                        help="the Generator's bound on the datapack entries being made at once")
+    parser.add_argument('--json-codec', choices=('auto', *RLT.json_codecs), default='auto',
+                        help="the Generator's JSON codec (default: auto, orjson if it is installed)")
+    parser.add_argument('--output', metavar='FILE',
+                        help="write the JSON results to FILE (default: standard output)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.condition_density, args.depth,
+                             args.repeat, args.assignment_mode, args.output_profile,
+                             args.compress_threads, args.workers, args.memory, args.in_flight,
+                             args.json_codec, log=lambda message: print(message, file=sys.stderr))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
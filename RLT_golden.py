@@ -0,0 +1,427 @@
+################################################################################
+##
+##  Memetics' Random Loot Tables: A random loot table (RLT) datapack generator
+##  for Minecraft.
+##
+##  RLT_golden.py: Seed compatibility checks: golden fingerprints of the
+##  datapacks made for a fixed set of seeds and settings, and how long they
+##  took to make.
+##
+##  Copyright (c) 2021-2023 by Memetics (Minecraft) / Memetics (Twitch) /
+##      MemeticsX (GitHub)
+##
+##  For the latest source code and documentation, visit:
+##  https://github.com/memeticsx/RLT
+##
+##
+##  This file is part of Memetics' Random Loot Tables.
+##
+##  Memetics' Random Loot Tables is free software: you can redistribute it
+##  and/or modify it under the terms of the GNU General Public License as
+##  published by the Free Software Foundation, either version 3 of the License,
+##  or (at your option) any later version.
+##
+##  Memetics' Random Loot Tables is distributed in the hope that it will be
+##  useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+##  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+##  Public License for more details.
+##
+##  You should have received a copy of the GNU General Public License along
+##  with this application.  If not, see https://www.gnu.org/licenses/ .
+##
+################################################################################
+
+
+###----------------> WIDTH MEASUREMENT BAR (80 CHARACTERS) <-----------------###
+
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import zipfile
+import hashlib
+import argparse
+import platform
+import tempfile
+
+import RLT
+import RLT_benchmark
+
+
+################################################################################
+# The golden corpus
+#
+# Players share seeds, so a seed has to go on making the same datapack: the
+# same loot table assignments, and the same loot tables in them.  The golden
+# file records, for each seed and settings variant below, a fingerprint of
+# the datapack RLT makes: a hash of its assignments, and a hash of each of
+# its entries.  Any change that makes a different datapack for one of them
+# (a faster shuffle that draws the random numbers differently, a revision
+# that writes a condition differently, ...) shows up as a mismatch.
+#
+# The loot tables are a synthetic set (see RLT_benchmark.make_loot_tables),
+# so the corpus is the same everywhere.  It is read from a .jar file (made
+# on the spot), as RLT lists the tables in a .jar file in the same order on
+# every system.  (A loot tables folder is listed in whatever order the file
+# system gives, which the assignments depend on.)
+
+# The golden file, next to this script.
+golden_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'RLT_golden.json')
+
+# The synthetic loot tables set (the make_loot_tables parameters).
+golden_corpus = {'size': 200, 'condition_density': 0.3, 'depth': 3, 'seed': 0}
+
+# The seeds, and the settings variants each seed is made with (Generator
+# options; 'config_lists': False leaves out the config lists).
+golden_seeds = ('12345', 'abc', 'Memetics RLT')
+golden_variants = {
+    'default': {},
+    'compact': {'output_profile': 'compact'},
+    'raw': {'output_profile': 'raw'},
+    'fast assignment': {'assignment_mode': 'fast'},
+    'folder classify': {'classify': 'folder'},
+    'no config lists': {'config_lists': False},
+    'json codec': {'codec': 'json'},
+    'compact, json codec': {'output_profile': 'compact', 'codec': 'json'},
+}
+
+
+def make_corpus(folder, size=200, condition_density=0.3, depth=3, seed=0):
+    """Writes the synthetic loot tables set into a .jar file, along with its
+        config files, returning the .jar file path and the config files
+        folder.
+
+    :param folder: The folder to write the corpus to
+    :param size: (Optional) See RLT_benchmark.make_loot_tables
+    :param condition_density: (Optional) See RLT_benchmark.make_loot_tables
+    :param depth: (Optional) See RLT_benchmark.make_loot_tables
+    :param seed: (Optional) See RLT_benchmark.make_loot_tables
+    """
+
+    config_folder = RLT_benchmark.make_loot_tables(folder, size, condition_density, depth, seed)
+    loot_tables = os.path.join(folder, 'loot_tables')
+    jarpath = os.path.join(folder, 'corpus.jar')
+    with zipfile.ZipFile(jarpath, 'w', zipfile.ZIP_DEFLATED) as jar:
+        for dirpath, dirnames, filenames in sorted(os.walk(loot_tables)):
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                relpath = os.path.relpath(path, loot_tables).replace(os.sep, '/')
+                jar.write(path, 'data/minecraft/loot_tables/' + relpath)
+    return jarpath, config_folder
+
+
+def corpus_hash(loot_tables, config_folder):
+    """Returns a hash of the loot tables and config files the fingerprints
+        are made from, to tell whether they are still the same ones.
+
+    :param loot_tables: The loot tables .jar file (or folder)
+    :param config_folder: The folder holding the config files
+    """
+
+    digest = hashlib.sha256()
+    source = RLT.open_loot_tables(loot_tables)
+    try:
+        paths = [os.path.join(dirpath, filename) for dirpath, filenames in source.walk()
+                 for filename in filenames]
+        for path in sorted(paths):
+            name = os.path.relpath(path, loot_tables) if source.file_path(path) else path
+            digest.update(name.replace(os.sep, '/').encode() + b'\0')
+            digest.update(hashlib.sha256(source.read(path)).digest())
+    finally:
+        source.close()
+    for configpath in (RLT.exclusionsconfig, RLT.bottlenecksconfig,
+                       RLT.blockersconfig, RLT.two_block_objectsconfig):
+        path = RLT.config_location(configpath, config_folder)
+        digest.update(os.path.basename(configpath).encode() + b'\0')
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                digest.update(hashlib.sha256(file.read()).digest())
+    return digest.hexdigest()
+
+
+################################################################################
+# Fingerprints
+
+
+def entry_hash(contents):
+    """Returns the (shortened) hash of a datapack entry's contents."""
+
+    return hashlib.sha256(contents).hexdigest()[:12]
+
+
+def fingerprint(generator, seed, datapack):
+    """Returns the fingerprint of the datapack a Generator made for a seed:
+        the hash of its assignments (by datapack entry name, so the hash
+        doesn't depend on where the loot tables are), the hash of its entry
+        names, and the hash of each of its entries (uncompressed, so it
+        doesn't depend on the compression either), in entry name order.  The
+        entry names themselves are returned alongside, to report which
+        entries differ (see compare), but are not part of the fingerprint.
+
+    :param generator: The Generator that made the datapack
+    :param seed: The seed the datapack was made for
+    :param datapack: The datapack .zip file contents
+    """
+
+    arcname = lambda lootfilepath: generator.registry.record(lootfilepath).arcname
+    assignments = sorted(f"{arcname(dropper)} --> {arcname(loot)}\n" for dropper, loot
+                         in generator.assign(random.Random(seed)).items())
+    with zipfile.ZipFile(io.BytesIO(datapack)) as zf:
+        names = sorted(zf.namelist())
+        entries = ' '.join(entry_hash(zf.read(name)) for name in names)
+    return {'assignments': hashlib.sha256(''.join(assignments).encode()).hexdigest(),
+            'names': hashlib.sha256('\n'.join(names).encode()).hexdigest(),
+            'entries': entries}, names
+
+
+def compare(golden, result, names):
+    """Returns the list of differences between a golden fingerprint and a
+        new one (an empty list if they match exactly).
+
+    :param golden: The golden fingerprint
+    :param result: The new fingerprint
+    :param names: The new fingerprint's entry names
+    """
+
+    differences = []
+    if golden['assignments'] != result['assignments']:
+        differences.append("the assignments are different")
+    if golden['names'] != result['names']:
+        differences.append("the datapack entries are not the same ones")
+    elif golden['entries'] != result['entries']:
+        differences.extend(f"{name} is different" for name, before, after
+                           in zip(names, golden['entries'].split(), result['entries'].split())
+                           if before != after)
+    return differences
+
+
+def make_fingerprints(loot_tables, config_folder, seeds=golden_seeds,
+                      variants=golden_variants, repeat=3, log=print):
+    """Makes the datapack for each seed and settings variant, returning
+        {variant: {seed: {'fingerprint': ..., 'seconds': ...}}} (see
+        fingerprint), where seconds is the best time of repeat runs of
+        Generator.build, along with {variant: {seed: entry names}}.
+
+    :param loot_tables: The loot tables .jar file (or folder)
+    :param config_folder: The folder holding the config files
+    :param seeds: (Optional) The seeds
+    :param variants: (Optional) The settings variants (see golden_variants)
+    :param repeat: (Optional) The number of times each datapack is made
+    :param log: (Optional) The function for progress messages
+    """
+
+    results = {}
+    entry_names = {}
+    with tempfile.TemporaryDirectory(prefix='RLT golden ') as folder:
+        empty_config_folder = os.path.join(folder, 'no config')
+        os.makedirs(empty_config_folder)
+        for variant, options in variants.items():
+            log(f"Making the '{variant}' datapacks")
+            options = dict(options)
+            config_lists = options.pop('config_lists', True)
+            generator = RLT.Generator(loot_tables,
+                                      config_folder=config_folder if config_lists else empty_config_folder,
+                                      datapack_folder=folder, cache_folder=None,
+                                      cache_entries=False, verbose=False, **options)
+            try:
+                results[variant] = {}
+                entry_names[variant] = {}
+                for seed in seeds:
+                    best = None
+                    for i in range(max(1, repeat)):
+                        started = time.perf_counter()
+                        datapack = generator.build(seed)
+                        seconds = time.perf_counter() - started
+                        best = seconds if best is None else min(best, seconds)
+                    result, entry_names[variant][seed] = fingerprint(generator, seed, datapack)
+                    results[variant][seed] = {'fingerprint': result, 'seconds': round(best, 6)}
+            finally:
+                generator.close()
+    return results, entry_names
+
+
+################################################################################
+# Recording and checking
+
+
+def machine():
+    """Returns a description of this computer, to tell whether timing
+    baselines were recorded on it.
+    """
+
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'processor': platform.processor(), 'cpus': os.cpu_count()}
+
+
+def with_corpus(loot_tables, config_folder, function):
+    """Calls function(loot_tables, config_folder, corpus) with the loot
+        tables to fingerprint: the given ones, or (if loot_tables is None)
+        the synthetic corpus, made in a temporary folder for the call.
+    """
+
+    if loot_tables is not None:
+        corpus = {'loot_tables': os.path.basename(os.path.normpath(loot_tables))}
+        return function(loot_tables, config_folder, corpus)
+    with tempfile.TemporaryDirectory(prefix='RLT golden corpus ') as folder:
+        loot_tables, config_folder = make_corpus(folder, **golden_corpus)
+        return function(loot_tables, config_folder, {'synthetic': golden_corpus})
+
+
+def record(path=golden_file, loot_tables=None, config_folder=None, repeat=3, log=print):
+    """Makes the golden datapacks and writes their fingerprints and timing
+        baselines to the golden file.
+
+    :param path: (Optional) The golden file
+    :param loot_tables: (Optional) A loot tables folder or .jar file to use
+        instead of the synthetic corpus
+    :param config_folder: (Optional) The config files folder for loot_tables
+    :param repeat: (Optional) The number of times each datapack is made
+    :param log: (Optional) The function for progress messages
+    """
+
+    def run(loot_tables, config_folder, corpus):
+        golden = {'RLT_version': RLT.RLT_version,
+                  'Minecraft_version': RLT.Minecraft_version,
+                  'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                  'corpus': corpus,
+                  'corpus_hash': corpus_hash(loot_tables, config_folder),
+                  'variants': golden_variants,
+                  'machine': machine(),
+                  'repeat': repeat,
+                  'results': make_fingerprints(loot_tables, config_folder, golden_seeds,
+                                               golden_variants, repeat, log)[0]}
+        with open(path, 'w') as file:
+            json.dump(golden, file, indent=1)
+            file.write('\n')
+        log(f"Recorded {sum(map(len, golden['results'].values()))} golden datapacks in {path}")
+
+    with_corpus(loot_tables, config_folder, run)
+
+
+def check(path=golden_file, loot_tables=None, config_folder=None, repeat=None,
+          tolerance=0.25, timings=True, update_timings=False, log=print):
+    """Makes the golden datapacks again and checks them against the golden
+        file, returning True if they all match exactly (and, with timings,
+        none of them took longer to make than its baseline allows).
+
+        Timing baselines are only compared on the computer they were recorded
+        on (see machine); with update_timings, this computer's timings
+        replace them (when the fingerprints all match).
+
+    :param path: (Optional) The golden file
+    :param loot_tables: (Optional) A loot tables folder or .jar file to use
+        instead of the synthetic corpus (the one the golden file was recorded
+        from)
+    :param config_folder: (Optional) The config files folder for loot_tables
+    :param repeat: (Optional) The number of times each datapack is made (by
+        default, as many as when the golden file was recorded)
+    :param tolerance: (Optional) How much longer (as a fraction of the
+        baseline) making a datapack may take before it counts as slower
+    :param timings: (Optional) Set to False to skip the timing comparison
+    :param update_timings: (Optional) Set to True to record this computer's
+        timings as the new baselines
+    :param log: (Optional) The function for progress messages
+    """
+
+    try:
+        with open(path) as file:
+            golden = json.load(file)
+    except FileNotFoundError:
+        raise RLT.RLTError(f"No golden file ('{path}' not found); make one with 'record'.")
+    if repeat is None:
+        repeat = golden.get('repeat', 3)
+
+    def run(loot_tables, config_folder, corpus):
+        if corpus != golden['corpus'] or corpus_hash(loot_tables, config_folder) != golden['corpus_hash']:
+            raise RLT.RLTError(f"The loot tables or config files are not the ones the golden file was "
+                               f"recorded from ({golden['corpus']}), so the datapacks can't be compared.")
+        seeds = list(next(iter(golden['results'].values()), {}))
+        return make_fingerprints(loot_tables, config_folder, seeds, golden['variants'], repeat, log)
+
+    results, entry_names = with_corpus(loot_tables, config_folder, run)
+    same_machine = golden.get('machine') == machine()
+    compare_timings = timings and same_machine and not update_timings
+    if timings and not same_machine and not update_timings:
+        log("The timing baselines were recorded on a different computer (or Python version), "
+            "so the timings are not compared; use --update-timings to record this computer's.")
+
+    passed = True
+    for variant, seeds in golden['results'].items():
+        for seed, baseline in seeds.items():
+            result = results[variant][seed]
+            differences = compare(baseline['fingerprint'], result['fingerprint'],
+                                  entry_names[variant][seed])
+            timing = f"{result['seconds']:.3f}s (baseline {baseline['seconds']:.3f}s)"
+            if differences:
+                passed = False
+                log(f"MISMATCH  {variant}, seed '{seed}': {len(differences)} differences")
+                for difference in differences[:10]:
+                    log(f"    {difference}")
+                if len(differences) > 10:
+                    log(f"    ... and {len(differences) - 10} more")
+            elif compare_timings and result['seconds'] > baseline['seconds'] * (1 + tolerance) + 0.005:
+                passed = False
+                log(f"SLOWER    {variant}, seed '{seed}': {timing}")
+            else:
+                log(f"ok        {variant}, seed '{seed}': {timing}")
+
+    if update_timings:
+        if not passed:
+            log("The fingerprints don't all match, so the timing baselines were not updated.")
+        else:
+            for variant, seeds in golden['results'].items():
+                for seed, baseline in seeds.items():
+                    baseline['seconds'] = results[variant][seed]['seconds']
+            golden['machine'] = machine()
+            golden['repeat'] = repeat
+            with open(path, 'w') as file:
+                json.dump(golden, file, indent=1)
+                file.write('\n')
+            log(f"Updated the timing baselines in {path}")
+    return passed
+
+
+def main(argv=None):
+    """Records or checks the golden fingerprints from the command line,
+    exiting with status 1 if the check finds a difference (or a slowdown).
+    """
+
+    parser = argparse.ArgumentParser(
+            description="Checks that RLT still makes the same datapacks for a fixed set of seeds "
+                        "(and makes them as fast as before).")
+    parser.add_argument('command', choices=('check', 'record'),
+                        help="check the datapacks against the golden file, or record a new golden file")
+    parser.add_argument('--golden', default=golden_file, metavar='FILE',
+                        help="the golden file (default: RLT_golden.json, next to this script)")
+    parser.add_argument('--loot-tables', metavar='PATH',
+                        help="a loot tables folder or Minecraft .jar file to use instead of the synthetic corpus")
+    parser.add_argument('--config-folder', metavar='FOLDER',
+                        help="the config files folder for --loot-tables (default: the current folder)")
+    parser.add_argument('--repeat', type=int, metavar='N',
+                        help="keep the best time of N runs for each datapack (default: 3, or as recorded)")
+    parser.add_argument('--tolerance', type=float, default=0.25, metavar='FRACTION',
+                        help="how much slower than its baseline a datapack may be made (default: 0.25)")
+    parser.add_argument('--no-timings', action='store_true',
+                        help="only check the fingerprints, not the timings")
+    parser.add_argument('--update-timings', action='store_true',
+                        help="record this computer's timings as the new baselines (if the fingerprints match)")
+    args = parser.parse_args(argv)
+
+    log = lambda message: print(message, file=sys.stderr)
+    try:
+        if args.command == 'record':
+            record(args.golden, args.loot_tables, args.config_folder,
+                   3 if args.repeat is None else args.repeat, log)
+        elif not check(args.golden, args.loot_tables, args.config_folder, args.repeat,
+                       args.tolerance, not args.no_timings, args.update_timings, log):
+            sys.exit(1)
+    except RLT.RLTError as e:
+        log(str(e))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()